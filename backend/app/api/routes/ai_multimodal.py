@@ -92,6 +92,9 @@ class BrandMemeRequest(BaseModel):
     platform: Platform = Platform.INSTAGRAM
     count: int = 5
 
+class BrandMemeBatchRequest(BrandMemeRequest):
+    urgent: bool = False
+
 class MemeSeriesRequest(BaseModel):
     theme: str
     series_count: int = 3
@@ -449,6 +452,41 @@ async def generate_brand_relevant_memes(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Brand meme generation failed: {str(e)}")
 
+@router.post("/enhanced-memes/brand-relevant/batch")
+async def generate_brand_relevant_memes_batch(
+    request: BrandMemeBatchRequest,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Queue brand-relevant memes on the OpenAI Batch API, or generate them now if urgent"""
+    try:
+        meme_service = EnhancedMemeGeneratorService(db)
+        result = await meme_service.generate_brand_relevant_memes_batch(
+            current_user.id,
+            request.brand_info,
+            request.current_trends,
+            request.platform,
+            request.count,
+            request.urgent
+        )
+        return result
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Brand meme batch submission failed: {str(e)}")
+
+@router.get("/enhanced-memes/batches/{batch_id}")
+async def get_brand_meme_batch(
+    batch_id: str,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Check a brand meme batch, rendering its memes once the batch has completed"""
+    try:
+        meme_service = EnhancedMemeGeneratorService(db)
+        result = await meme_service.complete_brand_meme_batch(current_user.id, batch_id)
+        return result
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Brand meme batch check failed: {str(e)}")
+
 @router.post("/enhanced-memes/series")
 async def create_meme_series(
     request: MemeSeriesRequest,
@@ -2,7 +2,7 @@
 API routes for automation and engagement features
 """
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional, List
 
@@ -12,7 +12,7 @@ from app.models.user import User
 from app.schemas.automation import (
     # Direct Messages
     DirectMessageCreate, DirectMessageUpdate, DirectMessageResponse,
-    DirectMessageLogResponse, DirectMessageStatsResponse,
+    DirectMessageListItem, DirectMessageLogResponse, DirectMessageStatsResponse,
     # Comment Management
     CommentManagementCreate, CommentManagementUpdate, CommentManagementResponse,
     CommentAnalysisResponse,
@@ -49,21 +49,27 @@ async def create_dm_campaign(
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
 
-@router.get("/direct-messages", response_model=List[DirectMessageResponse])
+@router.get("/direct-messages", response_model=List[DirectMessageListItem])
 async def list_dm_campaigns(
+    response: Response,
     social_account_id: Optional[int] = Query(None),
     message_type: Optional[str] = Query(None),
     is_active: Optional[bool] = Query(None),
-    page: int = Query(1, ge=1),
+    cursor: Optional[str] = Query(None),
     size: int = Query(20, ge=1, le=100),
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
-    """List direct message campaigns"""
+    """List direct message campaigns; the next page's cursor is sent in X-Next-Cursor"""
     service = DirectMessageService(db)
-    campaigns, total = await service.list_dm_campaigns(
-        current_user.id, social_account_id, message_type, is_active, page, size
-    )
+    try:
+        campaigns, next_cursor = await service.list_dm_campaigns(
+            current_user.id, social_account_id, message_type, is_active, cursor, size
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     return campaigns
 
 
@@ -75,7 +81,7 @@ async def get_dm_campaign(
 ):
     """Get a specific direct message campaign"""
     service = DirectMessageService(db)
-    campaign = await service.get_dm_campaign(campaign_id, current_user.id)
+    campaign = await service.get_dm_campaign_summary(campaign_id, current_user.id)
     if not campaign:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Campaign not found")
     return campaign
@@ -122,16 +128,23 @@ async def get_dm_stats(
 
 @router.get("/direct-messages/logs", response_model=List[DirectMessageLogResponse])
 async def get_dm_logs(
+    response: Response,
     campaign_id: Optional[int] = Query(None),
     status: Optional[str] = Query(None),
-    page: int = Query(1, ge=1),
+    cursor: Optional[str] = Query(None),
     size: int = Query(20, ge=1, le=100),
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
-    """Get direct message sending logs"""
+    """Get direct message sending logs; the next page's cursor is sent in X-Next-Cursor"""
     service = DirectMessageService(db)
-    logs, total = await service.get_dm_logs(current_user.id, campaign_id, status, page, size)
+    try:
+        logs, next_cursor = await service.get_dm_logs(current_user.id, campaign_id, status, cursor, size)
+    except ValueError as e:
+        # The status query parameter shadows fastapi.status here
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     return logs
 
 
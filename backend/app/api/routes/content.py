@@ -90,6 +90,21 @@ async def search_trending_topics(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch trends: {str(e)}")
 
+@router.get("/search/trending/all")
+async def search_trending_topics_all(
+    platforms: List[Platform] = Query(...),
+    region: str = "global",
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Search for trending topics on several platforms at once"""
+    try:
+        search_service = ContentSearchService(db)
+        trends = await search_service.search_trending_topics_all(platforms, region)
+        return {"trends": {platform.value: items for platform, items in trends.items()}, "region": region}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to fetch trends: {str(e)}")
+
 @router.post("/search/ideas")
 async def generate_content_ideas(
     request: ContentSearchRequest,
@@ -570,12 +585,9 @@ async def upload_content(
     try:
         content_service = ContentService(db)
         
-        # Read file content
-        file_content = await file.read()
-        
-        # Save uploaded file
+        # Stream uploaded file to disk
         file_path = await content_service.save_uploaded_file(
-            file_content, file.filename or "unknown", current_user.id
+            file, file.filename or "unknown", current_user.id
         )
         
         # Parse tags and hashtags
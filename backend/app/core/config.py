@@ -23,6 +23,9 @@ class Settings(BaseSettings):
     
     # Database
     DATABASE_URL: str = "sqlite+aiosqlite:///./social_media_bot.db"
+    DATABASE_POOL_SIZE: int = 20  # PostgreSQL only
+    DATABASE_MAX_OVERFLOW: int = 30
+    DATABASE_POOL_RECYCLE: int = 300  # Seconds
     
     # Redis (for Celery)
     REDIS_URL: str = "redis://localhost:6379/0"
@@ -56,6 +59,7 @@ class Settings(BaseSettings):
     # File Upload
     MAX_FILE_SIZE: int = 100 * 1024 * 1024  # 100MB
     UPLOAD_DIR: str = "uploads"
+    SCENE_DETECTION_WORKERS: int = 2  # Processes per API worker for long-video scene scans
     
     # AI Services
     OPENAI_API_KEY: Optional[str] = None
@@ -24,7 +24,13 @@ else:
     engine = create_async_engine(
         settings.DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://"),
         echo=settings.DEBUG,
-        future=True
+        future=True,
+        pool_size=settings.DATABASE_POOL_SIZE,
+        max_overflow=settings.DATABASE_MAX_OVERFLOW,
+        pool_recycle=settings.DATABASE_POOL_RECYCLE,
+        pool_pre_ping=True,
+        # Reuse server-side prepared statements across checkouts
+        connect_args={"statement_cache_size": 1024, "prepared_statement_cache_size": 256}
     )
 
 # Create session factory
@@ -48,6 +54,13 @@ async def get_db() -> AsyncSession:
             await session.close()
 
 
+def _create_missing_indexes(sync_conn) -> None:
+    """Add indexes declared after a table was first created (create_all skips existing tables)"""
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(sync_conn, checkfirst=True)
+
+
 async def create_tables():
     """Create all database tables"""
     try:
@@ -62,6 +75,7 @@ async def create_tables():
             from app.models.growth_recommendations import GrowthRecommendation, ContentRecommendation, TimingRecommendation, HashtagRecommendation
             
             await conn.run_sync(Base.metadata.create_all)
+            await conn.run_sync(_create_missing_indexes)
             logger.info("Database tables created successfully")
     except Exception as e:
         logger.error(f"Error creating database tables: {e}")
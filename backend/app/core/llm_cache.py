@@ -0,0 +1,193 @@
+"""
+Two-tier response cache for OpenAI chat completions.
+
+Tier 1 is an exact match on a BLAKE2b hash of the whole request, stored in
+Redis (or an in-process dict while Redis is unreachable; Redis is retried
+after a short cooldown). Tier 2, opt-in per
+call, embeds only the non-system messages and reuses the response of a recent
+request with the same system prompt and parameters whose embedding is nearly
+identical, which catches user content that differs only in whitespace or
+wording.
+"""
+
+import hashlib
+import json
+import logging
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:
+    aioredis = None
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "llm:cache:"
+EMBEDDING_MODEL = "text-embedding-3-small"
+SIMILARITY_THRESHOLD = 0.95
+MAX_SEMANTIC_ENTRIES = 512
+MAX_LOCAL_ENTRIES = 1024
+REDIS_RETRY_SECONDS = 30
+
+
+def _digest(text: str) -> str:
+    return hashlib.blake2b(text.encode(), digest_size=20).hexdigest()
+
+
+class LLMCache:
+    """
+    Process-wide LLM response cache; obtain it with get_llm_cache().
+    """
+
+    def __init__(self, redis_url: Optional[str] = None):
+        self.redis_available = aioredis is not None
+        self.redis_client = None
+        if self.redis_available:
+            try:
+                self.redis_client = aioredis.from_url(
+                    redis_url or settings.REDIS_URL, decode_responses=True
+                )
+            except (ValueError, AttributeError):
+                self.redis_available = False
+        self._redis_retry_at = 0.0
+        # key -> (expires_at, content), used while Redis is unavailable
+        self._local: Dict[str, Tuple[float, str]] = {}
+        # namespace -> (unit-norm embedding matrix, [(expires_at, key)])
+        self._semantic: Dict[str, Tuple[np.ndarray, List[Tuple[float, str]]]] = {}
+
+    async def complete(
+        self,
+        client: Any,
+        *,
+        ttl: int,
+        semantic: bool = False,
+        **request: Any,
+    ) -> str:
+        """
+        Return the message content for a chat completion request, calling
+        client.chat.completions.create(**request) only on a cache miss.
+        Pass semantic=True only where a near-identical user message may
+        safely reuse another's response.
+        """
+        messages = request.get("messages") or []
+        user_messages = [m for m in messages if m.get("role") != "system"]
+        # Everything but the user content (model, sampling and output
+        # parameters, system prompt) must match exactly for any reuse
+        namespace = _digest(json.dumps(
+            {
+                "params": {k: v for k, v in request.items() if k != "messages"},
+                "system": [m for m in messages if m.get("role") == "system"],
+            },
+            sort_keys=True,
+            default=str,
+        ))
+        prompt = json.dumps(user_messages, sort_keys=True)
+        key = KEY_PREFIX + _digest(f"{namespace}:{prompt}")
+
+        cached = await self._get(key)
+        if cached is not None:
+            return cached
+
+        embedding = None
+        if semantic:
+            embedding = await self._embed(
+                client, "\n".join(str(m.get("content")) for m in user_messages)
+            )
+            if embedding is not None:
+                similar_key = self._nearest(namespace, embedding)
+                if similar_key:
+                    cached = await self._get(similar_key)
+                    if cached is not None:
+                        return cached
+
+        response = await client.chat.completions.create(**request)
+        content = response.choices[0].message.content
+        if content:
+            await self._set(key, content, ttl)
+            if embedding is not None:
+                self._remember(namespace, embedding, key, ttl)
+        return content
+
+    def _use_redis(self) -> bool:
+        return self.redis_available and time.monotonic() >= self._redis_retry_at
+
+    def _redis_failed(self, e: Exception) -> None:
+        logger.warning(
+            "LLM cache Redis unavailable, using in-process cache for %ss: %s", REDIS_RETRY_SECONDS, e
+        )
+        self._redis_retry_at = time.monotonic() + REDIS_RETRY_SECONDS
+
+    async def _get(self, key: str) -> Optional[str]:
+        if self._use_redis():
+            try:
+                cached = await self.redis_client.get(key)
+                # Redis is back: drop what was cached locally during the outage
+                self._local.clear()
+                return cached
+            except Exception as e:
+                self._redis_failed(e)
+        entry = self._local.get(key)
+        if entry and entry[0] > time.monotonic():
+            return entry[1]
+        self._local.pop(key, None)
+        return None
+
+    async def _set(self, key: str, content: str, ttl: int) -> None:
+        if self._use_redis():
+            try:
+                await self.redis_client.set(key, content, ex=ttl)
+                return
+            except Exception as e:
+                self._redis_failed(e)
+        if len(self._local) >= MAX_LOCAL_ENTRIES:
+            # Dicts keep insertion order, so this drops the oldest entry
+            self._local.pop(next(iter(self._local)))
+        self._local[key] = (time.monotonic() + ttl, content)
+
+    async def _embed(self, client: Any, prompt: str) -> Optional[np.ndarray]:
+        try:
+            response = await client.embeddings.create(model=EMBEDDING_MODEL, input=prompt)
+        except Exception as e:
+            logger.warning("Prompt embedding failed, skipping semantic cache: %s", e)
+            return None
+        vector = np.asarray(response.data[0].embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else None
+
+    def _nearest(self, namespace: str, embedding: np.ndarray) -> Optional[str]:
+        index = self._semantic.get(namespace)
+        if index is None:
+            return None
+        matrix, entries = index
+        similarities = matrix @ embedding
+        best = int(np.argmax(similarities))
+        expires_at, key = entries[best]
+        if similarities[best] >= SIMILARITY_THRESHOLD and expires_at > time.monotonic():
+            return key
+        return None
+
+    def _remember(self, namespace: str, embedding: np.ndarray, key: str, ttl: int) -> None:
+        entry = (time.monotonic() + ttl, key)
+        index = self._semantic.get(namespace)
+        if index is None:
+            self._semantic[namespace] = (embedding[np.newaxis, :], [entry])
+            return
+        matrix, entries = index
+        matrix = np.vstack([matrix, embedding])[-MAX_SEMANTIC_ENTRIES:]
+        entries = (entries + [entry])[-MAX_SEMANTIC_ENTRIES:]
+        self._semantic[namespace] = (matrix, entries)
+
+
+_llm_cache: Optional[LLMCache] = None
+
+
+def get_llm_cache() -> LLMCache:
+    global _llm_cache
+    if _llm_cache is None:
+        _llm_cache = LLMCache()
+    return _llm_cache
@@ -0,0 +1,47 @@
+"""
+Process-wide OpenAI client shared by the AI services.
+
+Services are instantiated per request, so a client built in each
+constructor would open a fresh connection pool (and TLS handshake) for
+every request. Sharing one client keeps connections alive across them.
+"""
+
+from typing import Optional
+
+import httpx
+
+try:
+    import openai
+except ImportError:
+    openai = None
+
+from app.core.config import settings
+
+# The SDK retries 408/409/429/5xx and connection errors itself, with
+# jittered exponential backoff that honours Retry-After
+OPENAI_MAX_RETRIES = 3
+
+_openai_client: Optional["openai.AsyncOpenAI"] = None
+
+
+def get_openai_client() -> "openai.AsyncOpenAI":
+    """Process-wide OpenAI client, so every request reuses one keep-alive pool"""
+    global _openai_client
+    if _openai_client is None:
+        _openai_client = openai.AsyncOpenAI(
+            api_key=settings.OPENAI_API_KEY,
+            max_retries=OPENAI_MAX_RETRIES,
+            http_client=httpx.AsyncClient(
+                limits=httpx.Limits(max_keepalive_connections=50, max_connections=100),
+                timeout=30,
+            ),
+        )
+    return _openai_client
+
+
+async def close_openai_client() -> None:
+    """Close the shared OpenAI client's connection pool on application shutdown"""
+    global _openai_client
+    if _openai_client is not None:
+        await _openai_client.close()
+        _openai_client = None
@@ -36,6 +36,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Cursor-paginated list endpoints return the next page's cursor here
+    expose_headers=["X-Next-Cursor"],
 )
 
 # Create upload directories
@@ -93,6 +95,13 @@ async def startup_event():
         logger.info("Content autopilot started")
     except Exception as e:
         logger.warning(f"Content autopilot failed to start: {e}")
+    try:
+        # Resumes DM campaign sends left pending by the previous run
+        from app.services.direct_message_service import get_dm_send_scheduler
+        await get_dm_send_scheduler()
+        logger.info("DM send scheduler started")
+    except Exception as e:
+        logger.warning(f"DM send scheduler failed to start: {e}")
 
 
 @app.on_event("shutdown")
@@ -114,6 +123,15 @@ async def shutdown_event():
             _content_autopilot.stop()
         except Exception:
             pass
+    try:
+        from app.services.direct_message_service import shutdown_dm_send_scheduler
+        await shutdown_dm_send_scheduler()
+    except Exception:
+        pass
+    from app.services.content_processing import shutdown_scene_detection_pool
+    shutdown_scene_detection_pool()
+    from app.core.openai_client import close_openai_client
+    await close_openai_client()
 
 
 # ==================== ROOT ENDPOINT ====================
@@ -2,7 +2,7 @@
 Automation and Engagement models for direct messaging, comment management, and moderation
 """
 
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Enum as SQLEnum, Text, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Enum as SQLEnum, Text, ForeignKey, JSON, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from datetime import datetime
@@ -85,6 +85,16 @@ class DirectMessage(Base):
     user = relationship("User", back_populates="direct_messages")
     social_account = relationship("SocialAccount", back_populates="direct_messages")
     message_logs = relationship("DirectMessageLog", back_populates="direct_message", cascade="all, delete-orphan")
+    
+    # Serves keyset pagination of a user's campaigns, newest first
+    __table_args__ = (
+        Index("ix_direct_messages_user_created", user_id, created_at.desc(), id.desc()),
+        # Only active campaigns are scanned by process_dm_triggers
+        Index(
+            "ix_direct_messages_active_user", user_id,
+            postgresql_where=is_active == True, sqlite_where=is_active == True
+        ),
+    )
 
 
 class DirectMessageLog(Base):
@@ -112,6 +122,11 @@ class DirectMessageLog(Base):
     
     # Relationships
     direct_message = relationship("DirectMessage", back_populates="message_logs")
+    
+    # Serves keyset pagination of a campaign's logs, newest first
+    __table_args__ = (
+        Index("ix_direct_message_logs_campaign_sent", direct_message_id, sent_at.desc(), id.desc()),
+    )
 
 
 class CommentManagement(Base):
@@ -2,7 +2,7 @@
 Content models for content management and scheduling
 """
 
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, JSON, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, JSON, Enum as SQLEnum, DDL, Index, event
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
@@ -78,10 +78,31 @@ class Content(Base):
     created_by_user = relationship("User", back_populates="content")
     schedules = relationship("ContentSchedule", back_populates="content")
     
+    # Composite indexes for the per-user content listing filters and sort
+    __table_args__ = (
+        Index("ix_content_user_created", created_by, created_at.desc()),
+        Index("ix_content_user_type", created_by, content_type),
+        Index("ix_content_user_status", created_by, status),
+    )
+    
     def __repr__(self):
         return f"<Content(id={self.id}, title='{self.title}', type='{self.content_type}')>"
 
 
+# Trigram index so PostgreSQL can serve the ILIKE '%term%' title search
+content_title_trgm_index = Index(
+    "ix_content_title_trgm",
+    Content.title,
+    postgresql_using="gin",
+    postgresql_ops={"title": "gin_trgm_ops"},
+).ddl_if(dialect="postgresql")
+event.listen(
+    content_title_trgm_index,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
+
+
 class ContentSchedule(Base):
     """Scheduled content posting to social media platforms"""
     
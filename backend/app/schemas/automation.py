@@ -58,6 +58,22 @@ class DirectMessageResponse(BaseModel):
     last_sent_at: Optional[datetime]
 
 
+class DirectMessageListItem(BaseModel):
+    """Schema for a direct message campaign in list views"""
+    id: int
+    social_account_id: int
+    platform: str
+    message_type: DirectMessageType
+    subject: Optional[str]
+    status: DirectMessageStatus
+    sent_count: int
+    success_count: int
+    failure_count: int
+    is_active: bool
+    created_at: datetime
+    last_sent_at: Optional[datetime]
+
+
 class DirectMessageLogResponse(BaseModel):
     """Schema for direct message log response"""
     model_config = ConfigDict(from_attributes=True)
@@ -330,7 +330,7 @@ class AutomationConfigService:
         activities = []
         
         # Get recent DM sends
-        dm_logs, _ = await self.dm_service.get_dm_logs(user_id, page=1, size=5)
+        dm_logs, _ = await self.dm_service.get_dm_logs(user_id, size=5)
         for log in dm_logs:
             activities.append({
                 "activity_type": "dm_sent",
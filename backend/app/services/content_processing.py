@@ -3,30 +3,258 @@ Enhanced Content Processing Service
 Handles video clipping, image editing, and AI content generation
 """
 
-import os
 import json
-from typing import Optional, List, Dict, Any
+import asyncio
+import contextlib
+import logging
+import functools
+import itertools
+import multiprocessing
+import threading
+from typing import Optional, List, Dict, Any, Union, Iterator, AsyncIterator, Generator, Tuple
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 import subprocess
-import tempfile
 import shutil
+import uuid
 
 import cv2
+import httpx
 import numpy as np
 from fastapi import UploadFile, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
+import groq
 from groq import Groq
 
 from app.models.content import Content, ContentType, ContentStatus
 from app.core.config import settings
 
+logger = logging.getLogger(__name__)
+
+# Number of frames scored per vectorized scene-detection batch
+SCENE_BATCH_SIZE = 64
+
+# Videos at least this long are scene-scanned across a process pool
+PARALLEL_SCENE_DETECTION_MIN_SECONDS = 600
+
+# Number of scenes analyzed per Groq request
+SCENE_ANALYSIS_BATCH_SIZE = 10
+
+# Run filter/resize pipelines through OpenCV's T-API (OpenCL) when a device
+# is available; without one, images stay as plain numpy arrays
+USE_OPENCL = cv2.ocl.haveOpenCL()
+if USE_OPENCL:
+    cv2.ocl.setUseOpenCL(True)
+
+
+def _to_device(img):
+    return cv2.UMat(img) if USE_OPENCL else img
+
+
+def _from_device(img) -> np.ndarray:
+    return img.get() if isinstance(img, cv2.UMat) else img
+
+
+# Structuring element for the vintage filter's morphological close
+VINTAGE_KERNEL = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (5, 5))
+
+# How much the band behind overlay text is darkened (1.0 = solid black)
+TEXT_BAND_OPACITY = 0.6
+
+
+@functools.lru_cache(maxsize=1024)
+def _text_size(text: str, font: int, font_scale: float, thickness: int) -> Tuple[int, int]:
+    """Cached cv2.getTextSize, since batch overlays reuse the same template text"""
+    return cv2.getTextSize(text, font, font_scale, thickness)[0]
+
+
+# Platform-specific output dimensions (width, height)
+PLATFORM_DIMENSIONS = {
+    'instagram_post': (1080, 1080),
+    'instagram_story': (1080, 1920),
+    'tiktok': (1080, 1920),
+    'facebook': (1200, 628),
+    'twitter': (1200, 675),
+}
+
+
+def _platform_dimensions(platform: str) -> Tuple[int, int]:
+    return (
+        PLATFORM_DIMENSIONS.get(f'{platform}_post')
+        or PLATFORM_DIMENSIONS.get(platform, (1080, 1080))
+    )
+
+
+# Shared across service instances so scene analyses reuse pooled keep-alive
+# connections instead of paying a TLS handshake per Groq call
+_groq_client: Optional[Groq] = None
+
+
+def _get_groq_client() -> Groq:
+    global _groq_client
+    if _groq_client is None:
+        _groq_client = Groq(
+            api_key=settings.GROQ_API_KEY,
+            http_client=httpx.Client(
+                limits=httpx.Limits(max_keepalive_connections=32, max_connections=64),
+                timeout=30,
+            ),
+        )
+    return _groq_client
+
+
+_scene_detection_pool: Optional[ProcessPoolExecutor] = None
+_scene_detection_pool_lock = threading.Lock()
+
+
+def _get_scene_detection_pool() -> ProcessPoolExecutor:
+    """Process pool shared by all long-video scene scans in this process.
+    
+    Workers are spawned rather than forked: scans start from a worker thread
+    of a process holding a running event loop, database pool and HTTP clients,
+    none of which are safe to copy into a forked child.
+    """
+    global _scene_detection_pool
+    with _scene_detection_pool_lock:
+        if _scene_detection_pool is None:
+            _scene_detection_pool = ProcessPoolExecutor(
+                max_workers=settings.SCENE_DETECTION_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _scene_detection_pool
+
+
+def shutdown_scene_detection_pool() -> None:
+    """Stop the scene detection workers on application shutdown"""
+    global _scene_detection_pool
+    with _scene_detection_pool_lock:
+        if _scene_detection_pool is not None:
+            _scene_detection_pool.shutdown(wait=False, cancel_futures=True)
+            _scene_detection_pool = None
+
+
+def _scan_scene_cuts(
+    video_path: str,
+    threshold: float,
+    start_frame: int = 0,
+    end_frame: Optional[int] = None,
+    stop: Optional[threading.Event] = None,
+) -> Generator[int, None, int]:
+    """
+    Yield the index of every frame in [start_frame, end_frame) that starts a
+    new scene; returns the index one past the last frame read.
+
+    Grayscale frames are decoded into a reusable (K+1, H, W) buffer and
+    scored a batch at a time, so the per-frame Python work is only the
+    decode itself. Setting stop ends the scan at the next batch boundary.
+    """
+    cap = cv2.VideoCapture(video_path)
+    
+    # Decode one frame before the range so its first frame is compared too
+    first_idx = max(start_frame - 1, 0)
+    if first_idx:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, first_idx)
+    
+    # Slot 0 carries the last frame of the previous batch so that
+    # consecutive diffs span batch boundaries.
+    batch = None
+    filled = 0
+    base_idx = first_idx
+    frame_idx = first_idx
+    try:
+        while True:
+            ret = end_frame is None or frame_idx < end_frame
+            if ret:
+                ret, frame = cap.read()
+            if ret:
+                if batch is None:
+                    height, width = frame.shape[:2]
+                    batch = np.empty((SCENE_BATCH_SIZE + 1, height, width), dtype=np.uint8)
+                    # Compare summed pixel differences instead of per-frame means
+                    threshold_l1 = threshold * height * width
+                cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=batch[filled])
+                filled += 1
+                frame_idx += 1
+            
+            if filled == SCENE_BATCH_SIZE + 1 or (not ret and filled > 1):
+                scores = _score_frame_batch(batch[:filled])
+                for offset in np.flatnonzero(scores > threshold_l1):
+                    yield base_idx + int(offset) + 1
+                
+                batch[0] = batch[filled - 1]
+                base_idx += filled - 1
+                filled = 1
+            
+            if not ret or (stop is not None and stop.is_set()):
+                break
+    finally:
+        cap.release()
+    
+    return frame_idx
+
+
+def _score_frame_batch(frames: np.ndarray) -> np.ndarray:
+    """
+    Summed absolute difference (L1 norm) between each pair of consecutive
+    grayscale frames; cv2.norm is a single SIMD pass with no temporaries
+    """
+    return np.array([
+        cv2.norm(frames[i], frames[i + 1], cv2.NORM_L1)
+        for i in range(len(frames) - 1)
+    ])
+
+
+def _collect_scene_cuts(
+    video_path: str,
+    threshold: float,
+    start_frame: int,
+    end_frame: Optional[int],
+) -> Tuple[List[int], int]:
+    """Process-pool entry point: scene cuts for one frame range, plus frames read"""
+    cuts = []
+    scan = _scan_scene_cuts(video_path, threshold, start_frame, end_frame)
+    while True:
+        try:
+            cuts.append(next(scan))
+        except StopIteration as stop:
+            return cuts, stop.value
+
+
+def _scenes_from_cuts(cuts: Generator[int, None, int], fps: float) -> Iterator[Dict]:
+    """Turn ordered cut frame indices into scenes, dropping any of 2 seconds or less"""
+    scene_start = 0
+    while True:
+        try:
+            cut = next(cuts)
+        except StopIteration as stop:
+            frame_count = stop.value
+            break
+        
+        # Scene change detected
+        scene_end = cut / fps
+        if scene_end - scene_start > 2:  # Minimum clip length: 2 seconds
+            yield {
+                'start': scene_start,
+                'end': scene_end,
+                'keyframes': [scene_start, (scene_start + scene_end) / 2, scene_end],
+            }
+        scene_start = scene_end
+    
+    # Add final scene
+    if frame_count / fps - scene_start > 2:
+        yield {
+            'start': scene_start,
+            'end': frame_count / fps,
+            'keyframes': [scene_start, (scene_start + frame_count / fps) / 2, frame_count / fps],
+        }
+
 
 class VideoProcessingService:
     """Service for video processing and clip detection"""
     
     def __init__(self):
-        self.groq_client = Groq(api_key=settings.GROQ_API_KEY)
+        self.groq_client = _get_groq_client()
         self.upload_dir = Path(settings.UPLOAD_DIR) / "videos"
         self.upload_dir.mkdir(parents=True, exist_ok=True)
     
@@ -59,23 +287,52 @@ class VideoProcessingService:
         try:
             # Step 1: Extract metadata and audio
             metadata = self._get_video_metadata(file_path)
-            audio_path = await self._extract_audio(file_path)
+            audio_bytes = await self._extract_audio(file_path)
             
             # Step 2: Transcribe audio with Whisper
-            transcript = await self._transcribe_audio(audio_path)
+            transcript = await self._transcribe_audio(audio_bytes)
             
-            # Step 3: Detect scenes using OpenCV
-            scenes = self._detect_scenes(file_path)
+            # Step 3: Detect scenes using OpenCV, and
+            # Step 4: analyze scenes with Groq in batches as soon as they are
+            # detected, so decoding overlaps with the in-flight API calls
+            scenes = []
+            pending = []
+            analysis_tasks = []
+            long_video = metadata['duration'] >= PARALLEL_SCENE_DETECTION_MIN_SECONDS
+            analyses = []
+            summary = None
+            try:
+                async with contextlib.aclosing(
+                    self._detect_scenes_stream(file_path, parallel=long_video)
+                ) as scene_stream:
+                    async for scene in scene_stream:
+                        scenes.append(scene)
+                        pending.append(scene)
+                        if len(pending) == SCENE_ANALYSIS_BATCH_SIZE:
+                            analysis_tasks.append(asyncio.create_task(
+                                self._analyze_scenes(pending, transcript, len(scenes) - len(pending))
+                            ))
+                            pending = []
+                # The final batch also asks for the video summary, saving a round-trip
+                if pending:
+                    analysis_tasks.append(asyncio.create_task(
+                        self._analyze_scenes(
+                            pending, transcript, len(scenes) - len(pending), include_summary=True
+                        )
+                    ))
+                
+                for task in analysis_tasks:
+                    batch_analyses, batch_summary = await task
+                    analyses.extend(batch_analyses)
+                    summary = batch_summary or summary
+            except BaseException:
+                # Don't leave Groq calls running for a video that already failed
+                for task in analysis_tasks:
+                    task.cancel()
+                raise
             
-            # Step 4: Analyze each scene with Groq
             clips = []
-            for i, scene in enumerate(scenes):
-                clip_analysis = await self._analyze_scene(
-                    scene, 
-                    transcript,
-                    i
-                )
-                
+            for i, (scene, clip_analysis) in enumerate(zip(scenes, analyses)):
                 clip_data = {
                     'id': f"{content_id}_clip_{i}",
                     'start_time': scene['start'],
@@ -89,14 +346,20 @@ class VideoProcessingService:
                 }
                 clips.append(clip_data)
             
-            # Step 5: Generate video summary
-            summary = await self._generate_video_summary(transcript, clips)
+            # Step 5: Generate video summary if the combined request didn't return one
+            if not summary:
+                if pending:
+                    logger.warning(
+                        "Final scene analysis batch returned no video summary for %s, "
+                        "requesting it separately", content_id
+                    )
+                summary = await self._generate_video_summary(transcript['text'], clips)
             
             return {
                 'clips': clips,
                 'total_duration': metadata['duration'],
                 'analysis': {
-                    'transcript': transcript,
+                    'transcript': transcript['text'],
                     'summary': summary,
                     'scene_count': len(scenes),
                     'recommended_clip_count': min(len(clips), 5),
@@ -109,139 +372,268 @@ class VideoProcessingService:
     def _get_video_metadata(self, file_path: str) -> Dict[str, Any]:
         """Extract video metadata using ffprobe"""
         cmd = [
-            'ffprobe', '-v', 'error', '-show_format', '-show_streams',
-            '-print_json', file_path
+            'ffprobe', '-v', 'error', '-select_streams', 'v:0',
+            '-show_format', '-show_streams', '-print_json', file_path
         ]
         result = subprocess.run(cmd, capture_output=True, text=True)
         data = json.loads(result.stdout)
-        
-        duration = float(data['format'].get('duration', 0))
-        width = int(data['streams'][0].get('width', 1920))
-        height = int(data['streams'][0].get('height', 1080))
-        fps = eval(data['streams'][0].get('r_frame_rate', '30/1'))
+        stream = data['streams'][0] if data.get('streams') else {}
         
         return {
-            'duration': duration,
-            'width': width,
-            'height': height,
-            'fps': fps,
-            'codec': data['streams'][0].get('codec_name', 'h264'),
+            'duration': float(data['format'].get('duration', 0)),
+            'width': int(stream.get('width', 1920)),
+            'height': int(stream.get('height', 1080)),
+            'fps': self._parse_frame_rate(stream.get('r_frame_rate', '30/1')),
+            'codec': stream.get('codec_name', 'h264'),
         }
     
-    async def _extract_audio(self, video_path: str) -> str:
-        """Extract audio from video using FFmpeg"""
-        with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as tmp:
-            audio_path = tmp.name
-        
+    @staticmethod
+    def _parse_frame_rate(rate: str, default: float = 30.0) -> float:
+        """Parse an ffprobe frame rate such as '30000/1001' without eval()"""
+        num, _, den = rate.partition('/')
+        try:
+            numerator = float(num)
+            denominator = float(den) if den else 1.0
+        except ValueError:
+            return default
+        return numerator / denominator if denominator else default
+    
+    async def _extract_audio(self, video_path: str) -> bytes:
+        """Extract mono 16 kHz WAV audio from video, piped from FFmpeg stdout"""
         cmd = [
-            'ffmpeg', '-i', video_path, '-q:a', '9', '-n',
-            audio_path
+            'ffmpeg', '-i', video_path, '-vn', '-ac', '1', '-ar', '16000',
+            '-f', 'wav', 'pipe:1'
         ]
-        subprocess.run(cmd, capture_output=True, check=True)
-        return audio_path
-    
-    async def _transcribe_audio(self, audio_path: str) -> str:
-        """Transcribe audio using Groq Whisper integration"""
-        with open(audio_path, 'rb') as f:
-            transcript_obj = self.groq_client.audio.transcriptions.create(
-                file=(os.path.basename(audio_path), f, 'audio/wav'),
-                model='whisper-large-v3-turbo',
-            )
-        return transcript_obj.text
+        proc = subprocess.run(cmd, capture_output=True, check=True)
+        return proc.stdout
+    
+    async def _transcribe_audio(self, audio_bytes: bytes) -> Dict[str, Any]:
+        """
+        Transcribe audio using Groq Whisper integration
+        Returns {'text': str, 'segments': [{'start', 'end', 'text'}, ...]}
+        """
+        transcript_obj = self.groq_client.audio.transcriptions.create(
+            file=('audio.wav', audio_bytes, 'audio/wav'),
+            model='whisper-large-v3-turbo',
+            response_format='verbose_json',
+        )
+        segments = [
+            {'start': float(seg['start']), 'end': float(seg['end']), 'text': seg['text']}
+            for seg in (getattr(transcript_obj, 'segments', None) or [])
+        ]
+        return {'text': transcript_obj.text, 'segments': segments}
     
     def _detect_scenes(self, video_path: str, threshold: float = 27.0) -> List[Dict]:
         """
         Detect scene changes in video using OpenCV
         Returns list of detected scenes with start/end times
         """
-        cap = cv2.VideoCapture(video_path)
-        fps = cap.get(cv2.CAP_PROP_FPS)
-        frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        return list(self._iter_scenes(video_path, threshold))
+    
+    async def _detect_scenes_stream(
+        self,
+        video_path: str,
+        threshold: float = 27.0,
+        parallel: bool = False,
+    ) -> AsyncIterator[Dict]:
+        """
+        Detect scenes on a worker thread, yielding each one as soon as it is found.
+        The bounded queue keeps decoding at most a few scenes ahead of the consumer.
+        With parallel=True the video is scanned by a process pool first and the
+        scenes are yielded once all shards finish.
+        """
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=4)
+        stop = threading.Event()
+        done = object()
         
-        scenes = []
-        prev_frame = None
-        scene_start = 0
+        def produce():
+            try:
+                if parallel:
+                    scenes = self._detect_scenes_parallel(video_path, threshold)
+                else:
+                    scenes = self._iter_scenes(video_path, threshold, stop)
+                for scene in scenes:
+                    if stop.is_set():
+                        break
+                    asyncio.run_coroutine_threadsafe(queue.put(scene), loop).result()
+            finally:
+                asyncio.run_coroutine_threadsafe(queue.put(done), loop).result()
         
-        frame_idx = 0
-        while True:
-            ret, frame = cap.read()
-            if not ret:
-                break
-            
-            if prev_frame is not None:
-                # Compare frames for scene change
-                diff = cv2.absdiff(cv2.cvtColor(prev_frame, cv2.COLOR_BGR2GRAY),
-                                  cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY))
-                mean_diff = np.mean(diff)
-                
-                if mean_diff > threshold:
-                    # Scene change detected
-                    scene_end = frame_idx / fps
-                    if scene_end - scene_start > 2:  # Minimum clip length: 2 seconds
-                        scenes.append({
-                            'start': scene_start,
-                            'end': scene_end,
-                            'keyframes': [scene_start, (scene_start + scene_end) / 2, scene_end],
-                        })
-                    scene_start = scene_end
-            
-            prev_frame = frame.copy()
-            frame_idx += 1
+        producer = asyncio.create_task(asyncio.to_thread(produce))
+        try:
+            while True:
+                scene = await queue.get()
+                if scene is done:
+                    break
+                yield scene
+        finally:
+            # If the consumer stopped early, end the scan at its next frame batch.
+            # Emptying the queue once frees any put the producer is blocked on;
+            # after that it checks stop before queueing anything but `done`
+            stop.set()
+            while not queue.empty():
+                queue.get_nowait()
+            await asyncio.wait([producer])
         
+        # Re-raise any decode error from the worker thread
+        producer.result()
+    
+    def _iter_scenes(
+        self,
+        video_path: str,
+        threshold: float,
+        stop: Optional[threading.Event] = None,
+    ) -> Iterator[Dict]:
+        """Yield detected scenes in order"""
+        cap = cv2.VideoCapture(video_path)
+        fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
         cap.release()
         
-        # Add final scene
-        if frame_idx / fps - scene_start > 2:
-            scenes.append({
-                'start': scene_start,
-                'end': frame_idx / fps,
-                'keyframes': [scene_start, (scene_start + frame_idx / fps) / 2, frame_idx / fps],
-            })
+        yield from _scenes_from_cuts(_scan_scene_cuts(video_path, threshold, stop=stop), fps)
+    
+    def _detect_scenes_parallel(
+        self,
+        video_path: str,
+        threshold: float = 27.0,
+        workers: Optional[int] = None,
+    ) -> List[Dict]:
+        """
+        Detect scenes by scanning contiguous frame ranges of the video on the
+        shared scene detection pool, then merging the cut points in order.
+        Produces the same scenes as _detect_scenes.
+        """
+        cap = cv2.VideoCapture(video_path)
+        fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+        frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        cap.release()
+        
+        workers = workers or settings.SCENE_DETECTION_WORKERS
+        shard_size = frame_count // workers
+        if workers < 2 or shard_size <= SCENE_BATCH_SIZE:
+            return self._detect_scenes(video_path, threshold)
+        
+        # The last shard reads to EOF, since CAP_PROP_FRAME_COUNT is an estimate
+        bounds = [i * shard_size for i in range(workers)] + [None]
+        results = list(_get_scene_detection_pool().map(
+            _collect_scene_cuts,
+            itertools.repeat(video_path),
+            itertools.repeat(threshold),
+            bounds[:-1],
+            bounds[1:],
+        ))
         
-        return scenes
+        def merged_cuts():
+            for shard_cuts, _ in results:
+                yield from shard_cuts
+            return results[-1][1]
+        
+        return list(_scenes_from_cuts(merged_cuts(), fps))
     
-    async def _analyze_scene(
-        self, 
-        scene: Dict, 
-        transcript: str,
-        scene_idx: int
-    ) -> Dict[str, Any]:
-        """Analyze scene with Groq AI to determine viral potential and title"""
-        prompt = f"""Analyze this video scene (#{scene_idx + 1}, from {scene['start']:.1f}s to {scene['end']:.1f}s):
+    @staticmethod
+    def _scene_excerpt(scene: Dict, transcript: Dict[str, Any], limit: int = 500) -> str:
+        """Transcript text spoken during the scene, from Whisper's timed segments"""
+        segments = transcript.get('segments') or []
+        if not segments:
+            return transcript['text'][:limit]
+        excerpt = ' '.join(
+            seg['text'].strip() for seg in segments
+            if seg['start'] <= scene['end'] and seg['end'] >= scene['start']
+        )
+        return excerpt[:limit]
+    
+    async def _analyze_scenes(
+        self,
+        scenes: List[Dict],
+        transcript: Dict[str, Any],
+        first_idx: int,
+        include_summary: bool = False,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Analyze a batch of scenes with a single Groq call to determine viral
+        potential and title, optionally summarizing the whole video in the
+        same request. Returns (one analysis per scene in order, summary or None).
+        """
+        scene_payload = [
+            {
+                'idx': first_idx + offset,
+                'start': round(scene['start'], 1),
+                'end': round(scene['end'], 1),
+                'excerpt': self._scene_excerpt(scene, transcript),
+            }
+            for offset, scene in enumerate(scenes)
+        ]
+        summary_instructions = ''
+        summary_field = ''
+        if include_summary:
+            summary_instructions = f"""
+Also summarize the whole video in 2-3 sentences, highlighting the main topic and why it would be engaging on social media. Full transcript:
+{transcript['text'][:2000]}
+"""
+            summary_field = '\n    "summary": "string",'
+        
+        prompt = f"""Analyze each of these video scenes. Each has an idx, start/end time in seconds, and the transcript excerpt spoken during it:
 
-Transcript excerpt: "{transcript[:500]}"
+{json.dumps(scene_payload)}
 
-Based on the timing and transcript, determine:
+For every scene, based on the timing and transcript, determine:
 1. A catchy 5-10 word title for this clip (make it viral-friendly)
 2. Viral potential score (1-10, where 10 is extremely viral)
 3. Best aspect ratio: vertical (9:16), horizontal (16:9), or square (1:1)
 4. One sentence description of key content
-
-Return JSON:
-{{
-    "title": "string",
-    "viral_score": number,
-    "aspect_ratio": "9:16|16:9|1:1",
-    "description": "string"
+{summary_instructions}
+Return JSON with one entry per scene:
+{{{summary_field}
+    "clips": [
+        {{
+            "idx": number,
+            "title": "string",
+            "viral_score": number,
+            "aspect_ratio": "9:16|16:9|1:1",
+            "description": "string"
+        }}
+    ]
 }}"""
         
+        by_idx = {}
+        summary = None
         try:
-            response = self.groq_client.chat.completions.create(
+            response = await asyncio.to_thread(
+                self.groq_client.chat.completions.create,
                 model="llama-3.3-70b-versatile",
                 messages=[{"role": "user", "content": prompt}],
                 temperature=0.7,
                 response_format={"type": "json_object"}
             )
             
-            return json.loads(response.choices[0].message.content)
-        except Exception as e:
-            # Fallback response
-            return {
-                'title': f'Clip {scene_idx + 1}',
-                'viral_score': 5.0,
-                'aspect_ratio': '9:16',
-                'description': 'Video clip'
-            }
+            data = json.loads(response.choices[0].message.content)
+            if not isinstance(data, dict):
+                raise TypeError(f"expected a JSON object, got {type(data).__name__}")
+            for item in data.get('clips', []):
+                if isinstance(item, dict) and 'idx' in item:
+                    by_idx[int(item['idx'])] = item
+            if include_summary and isinstance(data.get('summary'), str):
+                summary = data['summary']
+        except (groq.APIError, json.JSONDecodeError, ValueError, TypeError) as e:
+            logger.warning(
+                "Scene analysis failed for scenes %d-%d, using fallback analysis: %s",
+                first_idx, first_idx + len(scenes) - 1, e
+            )
+        
+        analyses = [
+            by_idx.get(item['idx']) or self._fallback_scene_analysis(item['idx'])
+            for item in scene_payload
+        ]
+        return analyses, summary
+    
+    @staticmethod
+    def _fallback_scene_analysis(scene_idx: int) -> Dict[str, Any]:
+        return {
+            'title': f'Clip {scene_idx + 1}',
+            'viral_score': 5.0,
+            'aspect_ratio': '9:16',
+            'description': 'Video clip'
+        }
     
     async def _generate_video_summary(
         self, 
@@ -256,7 +648,8 @@ Transcript:
 
 Return only the summary, no JSON."""
         
-        response = self.groq_client.chat.completions.create(
+        response = await asyncio.to_thread(
+            self.groq_client.chat.completions.create,
             model="llama-3.3-70b-versatile",
             messages=[{"role": "user", "content": prompt}],
             temperature=0.7,
@@ -274,11 +667,18 @@ class ImageProcessingService:
     
     async def apply_filter(
         self,
-        image_path: str,
+        image_path: Union[str, np.ndarray],
         filter_name: str,
-    ) -> str:
-        """Apply trending filter to image"""
-        img = cv2.imread(image_path)
+        *,
+        return_array: bool = False,
+    ) -> Union[str, np.ndarray]:
+        """
+        Apply trending filter to image
+
+        Accepts a file path or a decoded BGR array (modified in place); pass
+        return_array=True to chain further edits without a JPEG round-trip.
+        """
+        img = _to_device(self._load_image(image_path))
         
         if filter_name == 'vintage':
             img = self._apply_vintage_filter(img)
@@ -291,65 +691,60 @@ class ImageProcessingService:
         elif filter_name == 'cool':
             img = self._apply_cool_filter(img)
         
-        output_path = image_path.replace('.jpg', f'_{filter_name}.jpg')
-        cv2.imwrite(output_path, img)
-        return output_path
+        return self._save_image(_from_device(img), image_path, f'_{filter_name}', return_array)
     
     def _apply_vintage_filter(self, img):
         """Apply vintage film filter"""
-        kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (5, 5))
-        img = cv2.morphologyEx(img, cv2.MORPH_CLOSE, kernel)
+        img = cv2.morphologyEx(img, cv2.MORPH_CLOSE, VINTAGE_KERNEL)
         img = cv2.GaussianBlur(img, (3, 3), 0)
-        img[:, :, 0] = cv2.add(img[:, :, 0], 20)  # Increase blue channel
+        cv2.add(img, (20, 0, 0, 0), dst=img)  # Increase blue channel
         return img
     
     def _apply_neon_filter(self, img):
         """Apply neon/vibrant filter"""
         lab = cv2.cvtColor(img, cv2.COLOR_BGR2LAB)
-        l, a, b = cv2.split(lab)
-        a = cv2.add(a, 20)
-        b = cv2.add(b, 20)
-        img = cv2.merge([l, a, b])
-        img = cv2.cvtColor(img, cv2.COLOR_LAB2BGR)
+        cv2.add(lab, (0, 20, 20, 0), dst=lab)  # Boost a and b channels
+        img = cv2.cvtColor(lab, cv2.COLOR_LAB2BGR)
         return cv2.convertScaleAbs(img, alpha=1.2, beta=0)
     
     def _apply_cinematic_filter(self, img):
         """Apply cinematic/desaturated look"""
-        img_hsv = cv2.cvtColor(img, cv2.COLOR_BGR2HSV).astype(np.float32)
-        img_hsv[:, :, 1] = img_hsv[:, :, 1] * 0.7  # Reduce saturation
-        img = cv2.cvtColor(cv2.convertScaleAbs(img_hsv), cv2.COLOR_HSV2BGR)
-        return img
+        img_hsv = cv2.cvtColor(img, cv2.COLOR_BGR2HSV)
+        cv2.multiply(img_hsv, (1, 0.7, 1, 1), dst=img_hsv)  # Reduce saturation
+        return cv2.cvtColor(img_hsv, cv2.COLOR_HSV2BGR)
     
     def _apply_warm_filter(self, img):
         """Apply warm color filter"""
-        img[:, :, 0] = cv2.subtract(img[:, :, 0], 20)  # Reduce blue
-        img[:, :, 2] = cv2.add(img[:, :, 2], 20)  # Increase red
+        cv2.subtract(img, (20, 0, 0, 0), dst=img)  # Reduce blue
+        cv2.add(img, (0, 0, 20, 0), dst=img)  # Increase red
         return img
     
     def _apply_cool_filter(self, img):
         """Apply cool color filter"""
-        img[:, :, 0] = cv2.add(img[:, :, 0], 20)  # Increase blue
-        img[:, :, 2] = cv2.subtract(img[:, :, 2], 20)  # Reduce red
+        cv2.add(img, (20, 0, 0, 0), dst=img)  # Increase blue
+        cv2.subtract(img, (0, 0, 20, 0), dst=img)  # Reduce red
         return img
     
     async def add_text_overlay(
         self,
-        image_path: str,
+        image_path: Union[str, np.ndarray],
         text: str,
         position: str = 'center',
         font_size: int = 48,
         color: tuple = (255, 255, 255),
-    ) -> str:
-        """Add text overlay to image"""
-        img = cv2.imread(image_path)
+        *,
+        return_array: bool = False,
+    ) -> Union[str, np.ndarray]:
+        """Add text overlay to image (path or BGR array, see apply_filter)"""
+        img = self._load_image(image_path)
         height, width = img.shape[:2]
         
-        font = cv2.FONT_HERSHEY_BOLD
+        font = cv2.FONT_HERSHEY_DUPLEX
         font_scale = font_size / 30
         thickness = int(font_scale * 2)
         
         # Calculate text position
-        text_size = cv2.getTextSize(text, font, font_scale, thickness)[0]
+        text_size = _text_size(text, font, font_scale, thickness)
         
         if position == 'center':
             x = (width - text_size[0]) // 2
@@ -361,57 +756,88 @@ class ImageProcessingService:
             x = (width - text_size[0]) // 2
             y = 20 + text_size[1]
         
-        # Add text with background for better readability
-        cv2.rectangle(img, (x - 5, y - text_size[1] - 5),
-                     (x + text_size[0] + 5, y + 5),
-                     (0, 0, 0), -1)
-        cv2.putText(img, text, (x, y), font, font_scale, color, thickness)
+        # Darken a band behind the text for readability, in a single pass
+        band = img[max(y - text_size[1] - 5, 0):min(y + 5, height),
+                   max(x - 5, 0):min(x + text_size[0] + 5, width)]
+        cv2.convertScaleAbs(band, dst=band, alpha=1 - TEXT_BAND_OPACITY)
+        cv2.putText(img, text, (x, y), font, font_scale, color, thickness, cv2.LINE_AA)
         
-        output_path = image_path.replace('.jpg', '_text.jpg')
-        cv2.imwrite(output_path, img)
-        return output_path
+        return self._save_image(img, image_path, '_text', return_array)
     
     async def optimize_for_platform(
         self,
-        image_path: str,
+        image_path: Union[str, np.ndarray],
         platform: str,
-    ) -> str:
+        *,
+        return_array: bool = False,
+    ) -> Union[str, np.ndarray]:
         """Optimize image for specific platform (resize, crop, etc)"""
-        img = cv2.imread(image_path)
-        
-        # Platform-specific dimensions
-        dimensions = {
-            'instagram_post': (1080, 1080),
-            'instagram_story': (1080, 1920),
-            'tiktok': (1080, 1920),
-            'facebook': (1200, 628),
-            'twitter': (1200, 675),
-        }
+        img = self._load_image(image_path)
+        img = self._resize_crop(img, *_platform_dimensions(platform))
         
-        target_width, target_height = dimensions.get(f'{platform}_post', (1080, 1080))
+        return self._save_image(img, image_path, f'_{platform}', return_array)
+    
+    async def optimize_for_platforms(
+        self,
+        image_path: Union[str, np.ndarray],
+        platforms: List[str],
+    ) -> Dict[str, str]:
+        """
+        Optimize one image for several platforms, decoding it only once.
+        Per-platform resize and JPEG encode run in worker threads (OpenCV
+        releases the GIL). Returns {platform: output_path}.
+        """
+        img = self._load_image(image_path)
         
-        # Resize with aspect ratio preservation
-        height, width = img.shape[:2]
-        aspect = width / height
-        target_aspect = target_width / target_height
+        def render(platform: str) -> str:
+            out = self._resize_crop(img, *_platform_dimensions(platform))
+            return self._save_image(out, image_path, f'_{platform}', False)
         
-        if aspect > target_aspect:
-            new_width = int(target_height * aspect)
-            new_height = target_height
+        paths = await asyncio.gather(*(asyncio.to_thread(render, p) for p in platforms))
+        return dict(zip(platforms, paths))
+    
+    @staticmethod
+    def _load_image(image: Union[str, np.ndarray]) -> np.ndarray:
+        """Decode an image path, or pass an already-decoded array through"""
+        if isinstance(image, np.ndarray):
+            return image
+        return cv2.imread(image)
+    
+    def _save_image(
+        self,
+        img: np.ndarray,
+        source: Union[str, np.ndarray],
+        suffix: str,
+        return_array: bool,
+    ) -> Union[str, np.ndarray]:
+        """Return the array for chaining, or encode it next to the source image"""
+        if return_array:
+            return img
+        if isinstance(source, np.ndarray):
+            output_path = str(self.upload_dir / f"{uuid.uuid4().hex}{suffix}.jpg")
         else:
-            new_width = target_width
-            new_height = int(target_width / aspect)
-        
-        img = cv2.resize(img, (new_width, new_height))
-        
-        # Center crop to target dimensions
-        x = (new_width - target_width) // 2
-        y = (new_height - target_height) // 2
-        img = img[y:y+target_height, x:x+target_width]
-        
-        output_path = image_path.replace('.jpg', f'_{platform}.jpg')
-        cv2.imwrite(output_path, img)
+            output_path = source.replace('.jpg', f'{suffix}.jpg')
+        cv2.imwrite(output_path, img, [cv2.IMWRITE_JPEG_QUALITY, 90])
         return output_path
+    
+    @staticmethod
+    def _resize_crop(img, target_width: int, target_height: int):
+        """
+        Center-crop to the target aspect ratio, then resize to the exact target size.
+        Cropping the source region first avoids allocating an oversized resized image.
+        """
+        height, width = img.shape[:2]
+        scale = max(target_width / width, target_height / height)
+        crop_width = min(width, round(target_width / scale))
+        crop_height = min(height, round(target_height / scale))
+        x = (width - crop_width) // 2
+        y = (height - crop_height) // 2
+        roi = _to_device(img[y:y+crop_height, x:x+crop_width])
+        
+        interpolation = cv2.INTER_AREA if scale < 1 else cv2.INTER_LINEAR
+        return _from_device(
+            cv2.resize(roi, (target_width, target_height), interpolation=interpolation)
+        )
 
 
 def get_video_service() -> VideoProcessingService:
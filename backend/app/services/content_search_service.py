@@ -3,22 +3,190 @@ Advanced content search and ideation service with AI-powered trend analysis
 """
 
 import asyncio
-from typing import List, Dict, Any, Optional
+import logging
+from types import MappingProxyType
+from typing import List, Dict, Any, Mapping, Optional
 import httpx
+import orjson
 from datetime import datetime, timedelta
-import json
 import re
 try:
     import openai
 except ImportError:
     openai = None
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
 from app.core.config import settings
+from app.core.llm_cache import get_llm_cache
+from app.core.openai_client import get_openai_client
 from app.models.content import Content, ContentType
 from app.models.social_account import SocialAccount, SocialPlatform as Platform
 
+logger = logging.getLogger(__name__)
+
+# LLM response cache lifetimes, in seconds
+TREND_CACHE_TTL = 24 * 3600
+IDEAS_CACHE_TTL = 24 * 3600
+HASHTAG_CACHE_TTL = 7 * 24 * 3600
+
+# OpenAI ideation model; JSON mode guarantees a parseable object reply
+OPENAI_IDEAS_MODEL = "gpt-4o-mini"
+JSON_OBJECT_FORMAT = {"type": "json_object"}
+
+# Larger trend prompts are split in half and enhanced concurrently rather than
+# risking a context_length_exceeded round-trip
+TREND_PROMPT_TOKEN_BUDGET = 14000
+
+# Failures the search/ideation paths degrade on; anything else (including
+# cancellation) propagates to the caller
+_SERVICE_ERRORS = (
+    httpx.HTTPError,
+    asyncio.TimeoutError,
+    orjson.JSONDecodeError,
+    *((openai.OpenAIError,) if openai else ()),
+)
+
+# Competitor profile fetches: max in flight per service, per-call timeout (s)
+COMPETITOR_FETCH_CONCURRENCY = 10
+COMPETITOR_FETCH_TIMEOUT = 5.0
+
+# Read-only platform lookup tables, shared safely across requests and coroutines
+_EMPTY_MAPPING: Mapping[str, Any] = MappingProxyType({})
+
+_PLATFORM_SPECS: Mapping[Platform, Mapping[str, Any]] = MappingProxyType({
+    Platform.TIKTOK: MappingProxyType({
+        "max_duration": "60 seconds",
+        "dimensions": "9:16 vertical",
+        "features": ("effects", "filters", "sounds", "text_overlay"),
+        "best_practices": ("hook_in_3s", "trending_sounds", "hashtag_challenges")
+    }),
+    Platform.INSTAGRAM: MappingProxyType({
+        "max_duration": "90 seconds (Reels)",
+        "dimensions": "9:16 (Reels), 1:1 (Posts)",
+        "features": ("reels", "stories", "carousel", "igtv"),
+        "best_practices": ("high_quality_visuals", "story_engagement", "reel_trends")
+    }),
+    Platform.YOUTUBE: MappingProxyType({
+        "max_duration": "60 seconds (Shorts)",
+        "dimensions": "9:16 (Shorts), 16:9 (regular)",
+        "features": ("shorts", "long_form", "live", "community"),
+        "best_practices": ("strong_thumbnails", "seo_titles", "engagement_hooks")
+    }),
+    Platform.TWITTER: MappingProxyType({
+        "max_duration": "140 seconds",
+        "dimensions": "16:9 or 1:1",
+        "features": ("threads", "spaces", "polls", "moments"),
+        "best_practices": ("timely_content", "hashtag_strategy", "engagement")
+    }),
+    Platform.LINKEDIN: MappingProxyType({
+        "max_duration": "30 minutes",
+        "dimensions": "16:9 or 1:1",
+        "features": ("articles", "polls", "documents", "events"),
+        "best_practices": ("professional_tone", "industry_insights", "networking")
+    }),
+})
+
+_VIRAL_THRESHOLDS: Mapping[Platform, Mapping[str, int]] = MappingProxyType({
+    Platform.TIKTOK: MappingProxyType({"views": 100000, "likes": 10000, "shares": 1000}),
+    Platform.INSTAGRAM: MappingProxyType({"likes": 10000, "comments": 500, "saves": 1000}),
+    Platform.YOUTUBE: MappingProxyType({"views": 50000, "likes": 1000, "comments": 100}),
+    Platform.TWITTER: MappingProxyType({"likes": 5000, "retweets": 1000, "replies": 500}),
+    Platform.LINKEDIN: MappingProxyType({"likes": 1000, "comments": 100, "shares": 200}),
+})
+
+_HASHTAG_RULES: Mapping[Platform, Mapping[str, Any]] = MappingProxyType({
+    Platform.TIKTOK: MappingProxyType({"max_count": 5, "char_limit": 100, "style": "trending_focused"}),
+    Platform.INSTAGRAM: MappingProxyType({"max_count": 30, "char_limit": 2200, "style": "mix_popular_niche"}),
+    Platform.YOUTUBE: MappingProxyType({"max_count": 15, "char_limit": 500, "style": "seo_focused"}),
+    Platform.TWITTER: MappingProxyType({"max_count": 3, "char_limit": 280, "style": "conversation_starters"}),
+    Platform.LINKEDIN: MappingProxyType({"max_count": 5, "char_limit": 3000, "style": "professional_industry"}),
+})
+
+_DEFAULT_HASHTAG_RULES: Mapping[str, Any] = MappingProxyType(
+    {"max_count": 10, "char_limit": 500, "style": "balanced"}
+)
+
+# OpenAI prompt templates. The per-platform blocks are rendered once at import,
+# so prompts for the same inputs are byte-identical (and hit the LLM cache).
+_IDEAS_PROMPT_TEMPLATE = """Generate 10 creative and viral content ideas for {platform} about '{topic}'.
+
+Platform specifications:
+{spec_block}
+
+Target audience: {audience}
+
+For each idea, provide:
+1. Content type (video, image, carousel, etc.)
+2. Hook/opening line
+3. Key talking points
+4. Visual elements suggestions
+5. Hashtag recommendations
+6. Call-to-action
+7. Virality score prediction (1-10)
+
+Return a JSON object of the form {{"ideas": [...]}}."""
+
+_HASHTAG_PROMPT_TEMPLATE = """Generate optimal hashtags for {platform} content: "{description}"
+
+Platform rules:
+{rules_block}
+
+Mix of:
+- 3-5 trending/popular hashtags
+- 3-5 niche/specific hashtags
+- 2-3 branded/unique hashtags
+
+Return a JSON object of the form {{"hashtags": ["#example", ...]}}."""
+
+
+def _render_spec_block(specs: Mapping[str, Any]) -> str:
+    return (
+        f"- Max duration: {specs['max_duration']}\n"
+        f"- Optimal dimensions: {specs['dimensions']}\n"
+        f"- Key features: {', '.join(specs['features'])}\n"
+        f"- Best practices: {', '.join(specs['best_practices'])}"
+    )
+
+
+def _render_rules_block(rules: Mapping[str, Any]) -> str:
+    return (
+        f"- Max hashtags: {rules['max_count']}\n"
+        f"- Character limit: {rules['char_limit']}\n"
+        f"- Style: {rules['style']}"
+    )
+
+
+_IDEAS_SPEC_BLOCKS: Mapping[Platform, str] = MappingProxyType(
+    {platform: _render_spec_block(specs) for platform, specs in _PLATFORM_SPECS.items()}
+)
+_HASHTAG_RULES_BLOCKS: Mapping[Platform, str] = MappingProxyType(
+    {platform: _render_rules_block(rules) for platform, rules in _HASHTAG_RULES.items()}
+)
+_DEFAULT_HASHTAG_RULES_BLOCK = _render_rules_block(_DEFAULT_HASHTAG_RULES)
+
+# tiktoken encoding for the ideation model, or False once loading it has failed
+_token_encoding = None
+
+
+def _count_tokens(text: str) -> int:
+    """Token count for the ideation model, estimated at ~4 chars/token without tiktoken"""
+    global _token_encoding
+    if _token_encoding is None:
+        _token_encoding = False
+        if tiktoken is not None:
+            try:
+                _token_encoding = tiktoken.encoding_for_model(OPENAI_IDEAS_MODEL)
+            except Exception:  # unknown model, or the BPE file could not be fetched
+                logger.warning("tiktoken encoding unavailable, estimating prompt tokens")
+    if not _token_encoding:
+        return len(text) // 4
+    return len(_token_encoding.encode(text))
+
 
 class ContentSearchService:
     """Service for intelligent content search, ideation, and trend analysis"""
@@ -28,9 +196,10 @@ class ContentSearchService:
         # Only init OpenAI if a real key is configured
         _oai_key = settings.OPENAI_API_KEY or ""
         if _oai_key and _oai_key not in ("your-openai-api-key", "sk-placeholder"):
-            self.openai_client = openai.AsyncOpenAI(api_key=_oai_key)
+            self.openai_client = get_openai_client()
         else:
             self.openai_client = None
+        self.llm_cache = get_llm_cache()
         # Gemini fallback
         self._gemini = None
         try:
@@ -38,33 +207,55 @@ class ContentSearchService:
             self._gemini = GeminiAIService()
         except Exception:
             pass
+        # Platform -> trend fetcher dispatch table
+        self._trend_fetchers = {
+            Platform.TWITTER: self._get_twitter_trends,
+            Platform.TIKTOK: self._get_tiktok_trends,
+            Platform.INSTAGRAM: self._get_instagram_trends,
+            Platform.YOUTUBE: self._get_youtube_trends,
+            Platform.LINKEDIN: self._get_linkedin_trends,
+        }
+        # Platform -> viral content fetcher dispatch table
+        self._viral_fetchers = {
+            Platform.TIKTOK: self._get_viral_tiktok_content,
+            Platform.INSTAGRAM: self._get_viral_instagram_content,
+            Platform.YOUTUBE: self._get_viral_youtube_content,
+            Platform.TWITTER: self._get_viral_twitter_content,
+        }
+        self._competitor_semaphore = asyncio.Semaphore(COMPETITOR_FETCH_CONCURRENCY)
     
     async def search_trending_topics(self, platform: Platform, region: str = "global") -> List[Dict[str, Any]]:
         """Search for trending topics on specific platforms"""
         trends = []
         
         try:
-            if platform == Platform.TWITTER:
-                trends.extend(await self._get_twitter_trends(region))
-            elif platform == Platform.TIKTOK:
-                trends.extend(await self._get_tiktok_trends(region))
-            elif platform == Platform.INSTAGRAM:
-                trends.extend(await self._get_instagram_trends(region))
-            elif platform == Platform.YOUTUBE:
-                trends.extend(await self._get_youtube_trends(region))
-            elif platform == Platform.LINKEDIN:
-                trends.extend(await self._get_linkedin_trends(region))
+            fetcher = self._trend_fetchers.get(platform)
+            if fetcher:
+                trends.extend(await fetcher(region))
             
             # Add AI-powered trend enhancement
             if self.openai_client and trends:
                 enhanced_trends = await self._enhance_trends_with_ai(trends, platform)
                 return enhanced_trends
                 
-        except Exception as e:
-            print(f"Error fetching trends for {platform}: {e}")
+        except _SERVICE_ERRORS:
+            logger.exception("Error fetching trends for %s", platform)
         
         return trends
     
+    async def search_trending_topics_all(
+        self, platforms: List[Platform], region: str = "global"
+    ) -> Dict[Platform, List[Dict[str, Any]]]:
+        """Search trending topics on several platforms concurrently, including AI enhancement"""
+        results = await asyncio.gather(
+            *(self.search_trending_topics(platform, region) for platform in platforms),
+            return_exceptions=True,
+        )
+        return {
+            platform: [] if isinstance(result, BaseException) else result
+            for platform, result in zip(platforms, results)
+        }
+    
     async def generate_content_ideas(self, topic: str, platform: Platform, target_audience: str = None) -> List[Dict[str, Any]]:
         """Generate AI-powered content ideas based on topics and platform"""
         # Try Gemini first (configured and available)
@@ -108,68 +299,46 @@ class ContentSearchService:
                     text = text[4:].strip()
                 ideas = None
                 try:
-                    ideas = json.loads(text)
-                except json.JSONDecodeError:
+                    ideas = orjson.loads(text)
+                except orjson.JSONDecodeError:
                     m = re.search(r'\[[\s\S]*\]', text)
                     if m:
                         try:
-                            ideas = json.loads(m.group())
-                        except json.JSONDecodeError:
+                            ideas = orjson.loads(m.group())
+                        except orjson.JSONDecodeError:
                             pass
                 if ideas is None:
                     return []
                 if isinstance(ideas, dict):
                     ideas = ideas.get("ideas", [])
                 return ideas if isinstance(ideas, list) else []
-            except Exception as e:
-                print(f"Gemini content ideas error: {e}")
+            except Exception:
+                logger.exception("Gemini content ideas error, falling back to OpenAI")
 
         if not self.openai_client:
             return []
         
         try:
-            platform_specs = self._get_platform_specifications(platform)
-            
-            prompt = f"""
-            Generate 10 creative and viral content ideas for {platform.value} about '{topic}'.
-            
-            Platform specifications:
-            - Max duration: {platform_specs['max_duration']}
-            - Optimal dimensions: {platform_specs['dimensions']}
-            - Key features: {platform_specs['features']}
-            - Best practices: {platform_specs['best_practices']}
-            
-            Target audience: {target_audience or 'General audience'}
-            
-            For each idea, provide:
-            1. Content type (video, image, carousel, etc.)
-            2. Hook/opening line
-            3. Key talking points
-            4. Visual elements suggestions
-            5. Hashtag recommendations
-            6. Call-to-action
-            7. Virality score prediction (1-10)
-            
-            Format as JSON array.
-            """
+            prompt = _IDEAS_PROMPT_TEMPLATE.format(
+                platform=platform.value,
+                topic=topic,
+                audience=target_audience or 'General audience',
+                spec_block=_IDEAS_SPEC_BLOCKS[platform]
+            )
             
-            response = await self.openai_client.chat.completions.create(
-                model="gpt-4",
+            content = await self.llm_cache.complete(
+                self.openai_client,
+                ttl=IDEAS_CACHE_TTL,
+                model=OPENAI_IDEAS_MODEL,
                 messages=[{"role": "user", "content": prompt}],
-                temperature=0.8
+                temperature=0.8,
+                response_format=JSON_OBJECT_FORMAT
             )
             
-            content = response.choices[0].message.content
-            # Try to parse JSON, fall back to structured text if needed
-            try:
-                ideas = json.loads(content)
-            except:
-                ideas = self._parse_text_ideas(content)
-            
-            return ideas
+            return self._json_list(content, "ideas")
             
-        except Exception as e:
-            print(f"Error generating content ideas: {e}")
+        except (*_SERVICE_ERRORS, KeyError):
+            logger.exception("Error generating content ideas for %s", platform)
             return []
     
     async def search_viral_content(self, platform: Platform, timeframe: int = 7) -> List[Dict[str, Any]]:
@@ -180,14 +349,9 @@ class ContentSearchService:
             # Get viral metrics thresholds for each platform
             thresholds = self._get_viral_thresholds(platform)
             
-            if platform == Platform.TIKTOK:
-                viral_content.extend(await self._get_viral_tiktok_content(timeframe, thresholds))
-            elif platform == Platform.INSTAGRAM:
-                viral_content.extend(await self._get_viral_instagram_content(timeframe, thresholds))
-            elif platform == Platform.YOUTUBE:
-                viral_content.extend(await self._get_viral_youtube_content(timeframe, thresholds))
-            elif platform == Platform.TWITTER:
-                viral_content.extend(await self._get_viral_twitter_content(timeframe, thresholds))
+            fetcher = self._viral_fetchers.get(platform)
+            if fetcher:
+                viral_content.extend(await fetcher(timeframe, thresholds))
             
             # Analyze patterns with AI
             if self.openai_client and viral_content:
@@ -198,8 +362,8 @@ class ContentSearchService:
                     "recommendations": await self._generate_viral_recommendations(patterns, platform)
                 }
                 
-        except Exception as e:
-            print(f"Error searching viral content: {e}")
+        except _SERVICE_ERRORS:
+            logger.exception("Error searching viral content for %s", platform)
         
         return viral_content
     
@@ -233,14 +397,14 @@ class ContentSearchService:
                 raw = response.text.strip()
                 hashtags = None
                 try:
-                    parsed = json.loads(raw)
-                except json.JSONDecodeError:
+                    parsed = orjson.loads(raw)
+                except orjson.JSONDecodeError:
                     parsed = None
                     m = re.search(r'\[[\s\S]*\]', raw)
                     if m:
                         try:
-                            parsed = json.loads(m.group())
-                        except json.JSONDecodeError:
+                            parsed = orjson.loads(m.group())
+                        except orjson.JSONDecodeError:
                             pass
                 if isinstance(parsed, list):
                     hashtags = parsed
@@ -252,48 +416,33 @@ class ContentSearchService:
                             break
                 if hashtags:
                     return [str(t) for t in hashtags][:platform_hashtag_rules['max_count']]
-            except Exception as e:
-                print(f"Gemini hashtag error: {e}")
+            except Exception:
+                logger.exception("Gemini hashtag error, falling back to OpenAI")
 
         if not self.openai_client:
             return []
         
         try:
-            platform_hashtag_rules = self._get_hashtag_rules(platform)
-            
-            prompt = f"""
-            Generate optimal hashtags for {platform.value} content: "{content_description}"
-            
-            Platform rules:
-            - Max hashtags: {platform_hashtag_rules['max_count']}
-            - Character limit: {platform_hashtag_rules['char_limit']}
-            - Style: {platform_hashtag_rules['style']}
-            
-            Mix of:
-            - 3-5 trending/popular hashtags
-            - 3-5 niche/specific hashtags  
-            - 2-3 branded/unique hashtags
-            
-            Return as JSON array of strings.
-            """
+            prompt = _HASHTAG_PROMPT_TEMPLATE.format(
+                platform=platform.value,
+                description=content_description,
+                rules_block=_HASHTAG_RULES_BLOCKS.get(platform, _DEFAULT_HASHTAG_RULES_BLOCK)
+            )
             
-            response = await self.openai_client.chat.completions.create(
-                model="gpt-3.5-turbo",
+            content = await self.llm_cache.complete(
+                self.openai_client,
+                ttl=HASHTAG_CACHE_TTL,
+                model=OPENAI_IDEAS_MODEL,
                 messages=[{"role": "user", "content": prompt}],
-                temperature=0.7
+                temperature=0.7,
+                response_format=JSON_OBJECT_FORMAT
             )
             
-            content = response.choices[0].message.content
-            try:
-                hashtags = json.loads(content)
-            except:
-                # Extract hashtags from text
-                hashtags = [tag.strip() for tag in content.split() if tag.startswith('#')]
-            
+            hashtags = self._json_list(content, "hashtags")
             return hashtags[:platform_hashtag_rules['max_count']]
             
-        except Exception as e:
-            print(f"Error generating hashtags: {e}")
+        except _SERVICE_ERRORS:
+            logger.exception("Error generating hashtags for %s", platform)
             return []
     
     async def analyze_competitor_content(self, competitor_handles: List[str], platform: Platform) -> Dict[str, Any]:
@@ -307,9 +456,12 @@ class ContentSearchService:
         }
         
         try:
-            for handle in competitor_handles:
-                competitor_data = await self._get_competitor_data(handle, platform)
-                if competitor_data:
+            results = await asyncio.gather(
+                *(self._fetch_competitor_data(handle, platform) for handle in competitor_handles),
+                return_exceptions=True,
+            )
+            for handle, competitor_data in zip(competitor_handles, results):
+                if competitor_data and not isinstance(competitor_data, BaseException):
                     analysis["posting_frequency"][handle] = competitor_data.get("posting_frequency")
                     analysis["content_types"][handle] = competitor_data.get("content_types")
                     analysis["engagement_patterns"][handle] = competitor_data.get("engagement_patterns")
@@ -320,8 +472,8 @@ class ContentSearchService:
                 insights = await self._generate_competitor_insights(analysis, platform)
                 analysis["recommendations"] = insights
                 
-        except Exception as e:
-            print(f"Error analyzing competitors: {e}")
+        except _SERVICE_ERRORS:
+            logger.exception("Error analyzing competitors for %s", platform)
         
         return analysis
     
@@ -369,119 +521,65 @@ class ContentSearchService:
     
     async def _enhance_trends_with_ai(self, trends: List[Dict], platform: Platform) -> List[Dict]:
         """Enhance trend data with AI insights"""
+        prompt = f"""
+        Analyze these trending topics for {platform.value} and enhance each with:
+        1. Content angle suggestions
+        2. Target audience insights
+        3. Optimal posting times
+        4. Content format recommendations
+        5. Engagement tactics
+        
+        Trends: {orjson.dumps(trends, option=orjson.OPT_NON_STR_KEYS).decode()}
+        
+        Return a JSON object of the form {{"trends": [...]}} where each trend
+        keeps its original fields plus the additional ones.
+        """
+        
+        if len(trends) > 1 and _count_tokens(prompt) > TREND_PROMPT_TOKEN_BUDGET:
+            middle = len(trends) // 2
+            first, second = await asyncio.gather(
+                self._enhance_trends_with_ai(trends[:middle], platform),
+                self._enhance_trends_with_ai(trends[middle:], platform),
+            )
+            return first + second
+        
         try:
-            prompt = f"""
-            Analyze these trending topics for {platform.value} and enhance each with:
-            1. Content angle suggestions
-            2. Target audience insights
-            3. Optimal posting times
-            4. Content format recommendations
-            5. Engagement tactics
-            
-            Trends: {json.dumps(trends)}
-            
-            Return enhanced JSON with additional fields.
-            """
-            
-            response = await self.openai_client.chat.completions.create(
-                model="gpt-3.5-turbo",
+            content = await self.llm_cache.complete(
+                self.openai_client,
+                ttl=TREND_CACHE_TTL,
+                model=OPENAI_IDEAS_MODEL,
                 messages=[{"role": "user", "content": prompt}],
-                temperature=0.6
+                temperature=0.6,
+                response_format=JSON_OBJECT_FORMAT
             )
             
-            enhanced = json.loads(response.choices[0].message.content)
-            return enhanced
+            return self._json_list(content, "trends") or trends
             
-        except Exception as e:
-            print(f"Error enhancing trends: {e}")
+        except _SERVICE_ERRORS:
+            logger.exception("Error enhancing trends for %s", platform)
             return trends
     
-    def _get_platform_specifications(self, platform: Platform) -> Dict[str, Any]:
+    @staticmethod
+    def _get_platform_specifications(platform: Platform) -> Mapping[str, Any]:
         """Get platform-specific content specifications"""
-        specs = {
-            Platform.TIKTOK: {
-                "max_duration": "60 seconds",
-                "dimensions": "9:16 vertical",
-                "features": ["effects", "filters", "sounds", "text_overlay"],
-                "best_practices": ["hook_in_3s", "trending_sounds", "hashtag_challenges"]
-            },
-            Platform.INSTAGRAM: {
-                "max_duration": "90 seconds (Reels)",
-                "dimensions": "9:16 (Reels), 1:1 (Posts)",
-                "features": ["reels", "stories", "carousel", "igtv"],
-                "best_practices": ["high_quality_visuals", "story_engagement", "reel_trends"]
-            },
-            Platform.YOUTUBE: {
-                "max_duration": "60 seconds (Shorts)",
-                "dimensions": "9:16 (Shorts), 16:9 (regular)",
-                "features": ["shorts", "long_form", "live", "community"],
-                "best_practices": ["strong_thumbnails", "seo_titles", "engagement_hooks"]
-            },
-            Platform.TWITTER: {
-                "max_duration": "140 seconds",
-                "dimensions": "16:9 or 1:1",
-                "features": ["threads", "spaces", "polls", "moments"],
-                "best_practices": ["timely_content", "hashtag_strategy", "engagement"]
-            },
-            Platform.LINKEDIN: {
-                "max_duration": "30 minutes",
-                "dimensions": "16:9 or 1:1",
-                "features": ["articles", "polls", "documents", "events"],
-                "best_practices": ["professional_tone", "industry_insights", "networking"]
-            }
-        }
-        
-        return specs.get(platform, {})
+        return _PLATFORM_SPECS.get(platform, _EMPTY_MAPPING)
     
-    def _get_viral_thresholds(self, platform: Platform) -> Dict[str, int]:
+    @staticmethod
+    def _get_viral_thresholds(platform: Platform) -> Mapping[str, int]:
         """Get viral content thresholds for each platform"""
-        thresholds = {
-            Platform.TIKTOK: {"views": 100000, "likes": 10000, "shares": 1000},
-            Platform.INSTAGRAM: {"likes": 10000, "comments": 500, "saves": 1000},
-            Platform.YOUTUBE: {"views": 50000, "likes": 1000, "comments": 100},
-            Platform.TWITTER: {"likes": 5000, "retweets": 1000, "replies": 500},
-            Platform.LINKEDIN: {"likes": 1000, "comments": 100, "shares": 200}
-        }
-        
-        return thresholds.get(platform, {})
+        return _VIRAL_THRESHOLDS.get(platform, _EMPTY_MAPPING)
     
-    def _get_hashtag_rules(self, platform: Platform) -> Dict[str, Any]:
+    @staticmethod
+    def _get_hashtag_rules(platform: Platform) -> Mapping[str, Any]:
         """Get hashtag best practices for each platform"""
-        rules = {
-            Platform.TIKTOK: {"max_count": 5, "char_limit": 100, "style": "trending_focused"},
-            Platform.INSTAGRAM: {"max_count": 30, "char_limit": 2200, "style": "mix_popular_niche"},
-            Platform.YOUTUBE: {"max_count": 15, "char_limit": 500, "style": "seo_focused"},
-            Platform.TWITTER: {"max_count": 3, "char_limit": 280, "style": "conversation_starters"},
-            Platform.LINKEDIN: {"max_count": 5, "char_limit": 3000, "style": "professional_industry"}
-        }
-        
-        return rules.get(platform, {"max_count": 10, "char_limit": 500, "style": "balanced"})
+        return _HASHTAG_RULES.get(platform, _DEFAULT_HASHTAG_RULES)
     
-    def _parse_text_ideas(self, text: str) -> List[Dict[str, Any]]:
-        """Parse AI-generated text into structured content ideas"""
-        # Basic parsing logic for when JSON parsing fails
-        ideas = []
-        lines = text.split('\n')
-        current_idea = {}
-        
-        for line in lines:
-            line = line.strip()
-            if line.startswith(('1.', '2.', '3.', '4.', '5.', '6.', '7.', '8.', '9.', '10.')):
-                if current_idea:
-                    ideas.append(current_idea)
-                current_idea = {"title": line, "type": "mixed", "virality_score": 7}
-            elif line and current_idea:
-                if "hook" in line.lower():
-                    current_idea["hook"] = line
-                elif "hashtag" in line.lower():
-                    current_idea["hashtags"] = line
-                elif "call" in line.lower() and "action" in line.lower():
-                    current_idea["cta"] = line
-        
-        if current_idea:
-            ideas.append(current_idea)
-        
-        return ideas[:10]  # Limit to 10 ideas
+    @staticmethod
+    def _json_list(content: str, key: str) -> List[Any]:
+        """Unwrap the list under key from a JSON-mode object response"""
+        parsed = orjson.loads(content)
+        items = parsed.get(key) if isinstance(parsed, dict) else parsed
+        return items if isinstance(items, list) else []
     
     # Placeholder methods for viral content analysis
     async def _get_viral_tiktok_content(self, timeframe: int, thresholds: Dict) -> List[Dict]:
@@ -502,6 +600,13 @@ class ContentSearchService:
     async def _generate_viral_recommendations(self, patterns: Dict, platform: Platform) -> List[str]:
         return ["Use trending audio", "Hook viewers in first 3 seconds", "Include clear call-to-action"]
     
+    async def _fetch_competitor_data(self, handle: str, platform: Platform) -> Dict:
+        """Fetch one competitor's data, bounded by the concurrency limit and timeout"""
+        async with self._competitor_semaphore:
+            return await asyncio.wait_for(
+                self._get_competitor_data(handle, platform), timeout=COMPETITOR_FETCH_TIMEOUT
+            )
+    
     async def _get_competitor_data(self, handle: str, platform: Platform) -> Dict:
         return {"posting_frequency": "2x daily", "content_types": ["video", "image"], "engagement_patterns": "peak_evening"}
     
@@ -3,14 +3,20 @@ Content management service with database operations
 """
 
 from typing import Optional, List, Dict, Any
+from fastapi import UploadFile
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, func, desc
+from sqlalchemy import select, delete, and_, func, desc
 from sqlalchemy.orm import selectinload
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+import asyncio
 import os
+import secrets
+import time
 import shutil
 from pathlib import Path
 
+import aiofiles
+
 from app.models.content import Content, ContentSchedule, ContentType, ContentStatus, ScheduleStatus
 from app.models.user import User
 from app.models.social_account import SocialAccount
@@ -20,6 +26,25 @@ from app.schemas.content import (
 )
 from app.core.config import settings
 
+# Uploads are copied to disk in chunks of this many bytes
+UPLOAD_CHUNK_SIZE = 1 << 20
+
+
+def _file_size(path: str) -> Optional[int]:
+    """Size of the file at path, or None if it does not exist"""
+    try:
+        return os.path.getsize(path)
+    except FileNotFoundError:
+        return None
+
+
+def _remove_file(path: str) -> None:
+    """Remove the file at path if it exists"""
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
 
 class ContentService:
     """Service for content management operations"""
@@ -40,8 +65,8 @@ class ContentService:
             content.thumbnail_path = await self._generate_thumbnail(file_path, content.content_type)
         
         # Get file size if file exists
-        if file_path and os.path.exists(file_path):
-            content.file_size = os.path.getsize(file_path)
+        if file_path:
+            content.file_size = await asyncio.to_thread(_file_size, file_path)
         
         self.db.add(content)
         await self.db.commit()
@@ -68,30 +93,44 @@ class ContentService:
     ) -> tuple[List[Content], int]:
         """List user's content with pagination and filters"""
         
-        query = select(Content).where(Content.created_by == user_id)
+        criteria = self._content_filter(user_id, content_type, status, search)
         
-        # Apply filters
-        if content_type:
-            query = query.where(Content.content_type == content_type)
+        # Total rides along on every row as a window count, saving a round-trip
+        query = select(Content, func.count().over().label("total")).where(*criteria)
         
-        if status:
-            query = query.where(Content.status == status)
+        # Apply pagination and ordering
+        page_query = query.order_by(desc(Content.created_at)).offset((page - 1) * size).limit(size)
         
-        if search:
-            query = query.where(Content.title.ilike(f"%{search}%"))
+        rows = (await self.db.execute(page_query)).all()
+        if rows:
+            return [content for content, _ in rows], rows[0].total
         
-        # Get total count
-        count_query = select(func.count()).select_from(query.subquery())
-        total_result = await self.db.execute(count_query)
-        total = total_result.scalar()
+        # A page past the end has no rows to carry the total, so count separately
+        if page > 1:
+            count_query = select(func.count(Content.id)).where(*criteria)
+            return [], (await self.db.execute(count_query)).scalar()
+        return [], 0
+    
+    @staticmethod
+    def _content_filter(
+        user_id: int,
+        content_type: Optional[ContentType] = None,
+        status: Optional[ContentStatus] = None,
+        search: Optional[str] = None
+    ) -> List[Any]:
+        """Build the WHERE criteria shared by content listing and counting"""
+        criteria = [Content.created_by == user_id]
         
-        # Apply pagination and ordering
-        query = query.order_by(desc(Content.created_at)).offset((page - 1) * size).limit(size)
+        if content_type:
+            criteria.append(Content.content_type == content_type)
         
-        result = await self.db.execute(query)
-        content_list = result.scalars().all()
+        if status:
+            criteria.append(Content.status == status)
         
-        return list(content_list), total
+        if search:
+            criteria.append(Content.title.ilike(f"%{search}%"))
+        
+        return criteria
     
     async def update_content(self, content_id: int, content_data: ContentUpdate, user_id: int) -> Optional[Content]:
         """Update content (user must own it)"""
@@ -109,19 +148,26 @@ class ContentService:
     
     async def delete_content(self, content_id: int, user_id: int) -> bool:
         """Delete content and associated files"""
-        content = await self.get_content_by_id(content_id, user_id)
-        if not content:
-            return False
+        owned = and_(Content.id == content_id, Content.created_by == user_id)
         
-        # Delete associated files
-        if content.file_path and os.path.exists(content.file_path):
-            os.remove(content.file_path)
-        
-        if content.thumbnail_path and os.path.exists(content.thumbnail_path):
-            os.remove(content.thumbnail_path)
-        
-        await self.db.delete(content)
+        # Schedules reference the content row, so remove them first
+        await self.db.execute(
+            delete(ContentSchedule).where(
+                ContentSchedule.content_id.in_(select(Content.id).where(owned))
+            )
+        )
+        result = await self.db.execute(
+            delete(Content).where(owned).returning(Content.file_path, Content.thumbnail_path)
+        )
+        row = result.first()
+        if row is None:
+            await self.db.rollback()
+            return False
         await self.db.commit()
+        
+        # Delete associated files once the rows are gone
+        paths = {path for path in row if path}
+        await asyncio.gather(*(asyncio.to_thread(_remove_file, path) for path in paths))
         return True
     
     async def schedule_content(self, schedule_data: ContentScheduleCreate, user_id: int) -> Optional[ContentSchedule]:
@@ -172,7 +218,38 @@ class ContentService:
         query = query.options(selectinload(ContentSchedule.content), selectinload(ContentSchedule.social_account))
         
         result = await self.db.execute(query)
-        return list(result.scalars().all())
+        return result.scalars().all()
+    
+    async def get_calendar_rows(
+        self, 
+        user_id: int, 
+        start_date: datetime, 
+        end_date: datetime
+    ) -> List[Any]:
+        """Get the columns needed for calendar events, without loading ORM objects"""
+        
+        query = select(
+            ContentSchedule.id,
+            ContentSchedule.scheduled_time,
+            ContentSchedule.status,
+            ContentSchedule.content_id,
+            ContentSchedule.social_account_id,
+            Content.title,
+            Content.content_type,
+            Content.thumbnail_path,
+            SocialAccount.platform
+        ).join(Content, ContentSchedule.content_id == Content.id).join(
+            SocialAccount, ContentSchedule.social_account_id == SocialAccount.id
+        ).where(
+            and_(
+                Content.created_by == user_id,
+                ContentSchedule.scheduled_time >= start_date,
+                ContentSchedule.scheduled_time <= end_date
+            )
+        ).order_by(ContentSchedule.scheduled_time)
+        
+        result = await self.db.execute(query)
+        return result.all()
     
     async def get_calendar_events(
         self, 
@@ -182,23 +259,8 @@ class ContentService:
     ) -> List[CalendarEventResponse]:
         """Get calendar events for the dashboard"""
         
-        schedules = await self.get_scheduled_content(user_id, start_date, end_date)
-        
-        events = []
-        for schedule in schedules:
-            events.append(CalendarEventResponse(
-                id=schedule.id,
-                title=schedule.content.title,
-                content_type=schedule.content.content_type,
-                scheduled_time=schedule.scheduled_time,
-                status=schedule.status,
-                platform=schedule.social_account.platform,
-                content_id=schedule.content_id,
-                social_account_id=schedule.social_account_id,
-                thumbnail_path=schedule.content.thumbnail_path
-            ))
-        
-        return events
+        rows = await self.get_calendar_rows(user_id, start_date, end_date)
+        return [CalendarEventResponse(**row._mapping) for row in rows]
     
     async def update_schedule(self, schedule_id: int, schedule_data: ContentScheduleUpdate, user_id: int) -> Optional[ContentSchedule]:
         """Update a content schedule"""
@@ -224,51 +286,43 @@ class ContentService:
     async def delete_schedule(self, schedule_id: int, user_id: int) -> bool:
         """Delete a content schedule"""
         
-        query = select(ContentSchedule).join(Content).where(
-            and_(ContentSchedule.id == schedule_id, Content.created_by == user_id)
-        )
+        query = delete(ContentSchedule).where(
+            and_(
+                ContentSchedule.id == schedule_id,
+                ContentSchedule.content_id.in_(select(Content.id).where(Content.created_by == user_id))
+            )
+        ).returning(ContentSchedule.id)
         result = await self.db.execute(query)
-        schedule = result.scalar_one_or_none()
         
-        if not schedule:
+        if result.first() is None:
+            await self.db.rollback()
             return False
         
-        await self.db.delete(schedule)
         await self.db.commit()
         return True
     
     async def get_content_stats(self, user_id: int) -> ContentStatsResponse:
         """Get content statistics for dashboard"""
         
-        # Total content count
-        total_query = select(func.count()).select_from(Content).where(Content.created_by == user_id)
-        total_result = await self.db.execute(total_query)
-        total_content = total_result.scalar()
+        # Total, recent (last 30 days) and AI-generated counts in one scan
+        thirty_days_ago = datetime.now(timezone.utc) - timedelta(days=30)
+        counts_query = select(
+            func.count(Content.id),
+            func.count(Content.id).filter(Content.created_at >= thirty_days_ago),
+            func.count(Content.id).filter(Content.ai_generated == True)
+        ).where(Content.created_by == user_id)
+        counts_result = await self.db.execute(counts_query)
+        total_content, recent_uploads, ai_generated_count = counts_result.one()
         
         # Content by type
         type_query = select(Content.content_type, func.count()).where(Content.created_by == user_id).group_by(Content.content_type)
         type_result = await self.db.execute(type_query)
-        by_type = {content_type: count for content_type, count in type_result.fetchall()}
+        by_type = dict(type_result.tuples().all())
         
         # Content by status
         status_query = select(Content.status, func.count()).where(Content.created_by == user_id).group_by(Content.status)
         status_result = await self.db.execute(status_query)
-        by_status = {status: count for status, count in status_result.fetchall()}
-        
-        # Recent uploads (last 30 days)
-        thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-        recent_query = select(func.count()).select_from(Content).where(
-            and_(Content.created_by == user_id, Content.created_at >= thirty_days_ago)
-        )
-        recent_result = await self.db.execute(recent_query)
-        recent_uploads = recent_result.scalar()
-        
-        # AI generated content count
-        ai_query = select(func.count()).select_from(Content).where(
-            and_(Content.created_by == user_id, Content.ai_generated == True)
-        )
-        ai_result = await self.db.execute(ai_query)
-        ai_generated_count = ai_result.scalar()
+        by_status = dict(status_result.tuples().all())
         
         return ContentStatsResponse(
             total_content=total_content,
@@ -286,21 +340,21 @@ class ContentService:
         # For now, just return the original path
         return file_path
     
-    async def save_uploaded_file(self, file_content: bytes, filename: str, user_id: int) -> str:
-        """Save uploaded file to storage"""
+    async def save_uploaded_file(self, upload: UploadFile, filename: str, user_id: int) -> str:
+        """Stream an uploaded file to storage without buffering it in memory"""
         
         # Create user-specific upload directory
         upload_dir = Path(settings.UPLOAD_DIR) / str(user_id)
-        upload_dir.mkdir(parents=True, exist_ok=True)
+        await asyncio.to_thread(upload_dir.mkdir, parents=True, exist_ok=True)
         
-        # Generate unique filename
-        timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
-        file_extension = Path(filename).suffix
-        unique_filename = f"{timestamp}_{filename}"
+        # Generate unique filename; the random suffix keeps concurrent uploads
+        # apart and Path.name drops any directory components from the client
+        unique_filename = f"{time.time_ns()}_{secrets.token_hex(4)}_{Path(filename).name}"
         file_path = upload_dir / unique_filename
         
         # Save file
-        with open(file_path, "wb") as f:
-            f.write(file_content)
+        async with aiofiles.open(file_path, "wb") as f:
+            while chunk := await upload.read(UPLOAD_CHUNK_SIZE):
+                await f.write(chunk)
         
         return str(file_path)
\ No newline at end of file
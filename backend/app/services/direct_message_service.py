@@ -2,26 +2,383 @@
 Direct messaging automation service
 """
 
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, func, desc
+from sqlalchemy import select, insert, update, delete, and_, bindparam, func, desc, tuple_
 from sqlalchemy.orm import selectinload
-from datetime import datetime, timedelta
+from sqlalchemy.orm.attributes import set_committed_value
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from apscheduler.schedulers.base import STATE_PAUSED
+from apscheduler.triggers.date import DateTrigger
+from datetime import datetime, timedelta, timezone
 import asyncio
+import base64
+import json
+import secrets
+import time
 from loguru import logger
 
+try:
+    import redis.asyncio as aioredis
+    from redis.connection import parse_url
+    from apscheduler.jobstores.redis import RedisJobStore
+except ImportError:
+    aioredis = None
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+
 from app.models.automation import DirectMessage, DirectMessageLog, DirectMessageType, DirectMessageStatus
 from app.models.social_account import SocialAccount
 from app.schemas.automation import (
-    DirectMessageCreate, DirectMessageUpdate, DirectMessageStatsResponse
+    DirectMessageCreate, DirectMessageUpdate, DirectMessageListItem, DirectMessageStatsResponse
 )
 
 
+DM_RATE_KEY_PREFIX = "dm:rl:"
+DM_RATE_WINDOW_SECONDS = 3600
+DM_REDIS_RETRY_SECONDS = 30  # Cooldown before trying Redis again after an error
+DM_SEND_CONCURRENCY = 5  # Platform calls in flight per bulk send
+DM_JOBS_KEY = "dm:jobs"
+DM_JOB_RUN_TIMES_KEY = "dm:jobs:run_times"
+DM_SCHEDULER_LOCK_KEY = "dm:jobs:leader"
+DM_SCHEDULER_LOCK_TTL_SECONDS = 30
+DM_SCHEDULER_POLL_SECONDS = 10  # Leader lock renewal and job store recheck interval
+
+# Extend or release the leader lock only while this process still holds it
+_RENEW_LOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('expire', KEYS[1], ARGV[2])
+end
+return 0
+"""
+_RELEASE_LOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+# Point lookups built once at import and executed with bound ids, so each runs
+# from the same compiled statement (and asyncpg prepared statement) every time
+_CAMPAIGN_BY_ID = select(DirectMessage).where(DirectMessage.id == bindparam("campaign_id"))
+_OWNED_CAMPAIGN = select(DirectMessage).where(
+    and_(DirectMessage.id == bindparam("campaign_id"), DirectMessage.user_id == bindparam("user_id"))
+).options(selectinload(DirectMessage.social_account))
+
+
+class DMSendRateLimiter:
+    """
+    Sliding one-hour window of sends per campaign, kept in a Redis sorted set
+    (dm:rl:{campaign_id}, scored by send time) so the check costs no database
+    read. While Redis is unreachable the last hour's DirectMessageLog rows are
+    counted instead, which every worker process sees; Redis is tried again
+    after a short cooldown.
+    """
+    
+    def __init__(self, redis_url: Optional[str] = None):
+        self.redis_available = aioredis is not None
+        self.redis_client = None
+        if self.redis_available:
+            try:
+                self.redis_client = aioredis.from_url(
+                    redis_url or settings.REDIS_URL, decode_responses=True
+                )
+            except (ValueError, AttributeError):
+                self.redis_available = False
+        self._redis_retry_at = 0.0
+    
+    async def try_acquire(self, db: AsyncSession, campaign_id: int, limit: int) -> bool:
+        """Record a send for the campaign if fewer than limit happened in the last hour"""
+        return await self.try_acquire_many(db, campaign_id, limit, 1) == 1
+    
+    async def try_acquire_many(self, db: AsyncSession, campaign_id: int, limit: int, count: int) -> int:
+        """Reserve up to count sends within the campaign's hourly limit, returning how many were granted"""
+        if self.redis_available and time.monotonic() >= self._redis_retry_at:
+            try:
+                return await self._acquire_in_redis(campaign_id, limit, count)
+            except (aioredis.RedisError, OSError) as e:
+                logger.warning(
+                    f"DM rate limiter Redis unavailable, counting sends in the database "
+                    f"for {DM_REDIS_RETRY_SECONDS}s: {e}"
+                )
+                self._redis_retry_at = time.monotonic() + DM_REDIS_RETRY_SECONDS
+        
+        recent_sends_query = select(func.count()).select_from(DirectMessageLog).where(
+            and_(
+                DirectMessageLog.direct_message_id == campaign_id,
+                DirectMessageLog.sent_at >= datetime.utcnow() - timedelta(seconds=DM_RATE_WINDOW_SECONDS)
+            )
+        )
+        recent_sends = (await db.execute(recent_sends_query)).scalar()
+        return max(0, min(count, limit - recent_sends))
+    
+    async def _acquire_in_redis(self, campaign_id: int, limit: int, count: int) -> int:
+        now = time.time()
+        key = f"{DM_RATE_KEY_PREFIX}{campaign_id}"
+        members = [f"{now}:{secrets.token_hex(4)}" for _ in range(count)]
+        # Add first, then count, so concurrent senders cannot both slip under the limit
+        async with self.redis_client.pipeline(transaction=True) as pipe:
+            pipe.zremrangebyscore(key, 0, now - DM_RATE_WINDOW_SECONDS)
+            pipe.zadd(key, dict.fromkeys(members, now))
+            pipe.zcard(key)
+            pipe.expire(key, DM_RATE_WINDOW_SECONDS)
+            _, _, total, _ = await pipe.execute()
+        granted = max(0, count - max(0, total - limit))
+        if granted < count:
+            await self.redis_client.zrem(key, *members[granted:])
+        return granted
+
+
+_dm_rate_limiter: Optional[DMSendRateLimiter] = None
+
+
+def get_dm_rate_limiter() -> DMSendRateLimiter:
+    global _dm_rate_limiter
+    if _dm_rate_limiter is None:
+        _dm_rate_limiter = DMSendRateLimiter()
+    return _dm_rate_limiter
+
+
+DM_STATS_KEY_PREFIX = "dm:stats:"
+DM_STATS_TTL_SECONDS = 30
+
+
+class DMStatsCache:
+    """
+    Short-lived copy of each user's DM stats (dm:stats:{user_id}) so dashboards
+    polling get_dm_stats don't re-run the aggregates every time. Entries are
+    dropped whenever the user's campaigns or send counts change. Falls back to
+    an in-process dict when Redis is unavailable.
+    """
+    
+    def __init__(self, redis_url: Optional[str] = None):
+        self.redis_available = aioredis is not None
+        self.redis_client = None
+        if self.redis_available:
+            try:
+                self.redis_client = aioredis.from_url(
+                    redis_url or settings.REDIS_URL, decode_responses=True
+                )
+            except (ValueError, AttributeError):
+                self.redis_available = False
+        # user_id -> (expires_at, serialized stats)
+        self._local: Dict[int, Tuple[float, str]] = {}
+    
+    async def get(self, user_id: int) -> Optional[DirectMessageStatsResponse]:
+        cached = None
+        if self.redis_available:
+            try:
+                cached = await self.redis_client.get(f"{DM_STATS_KEY_PREFIX}{user_id}")
+            except (aioredis.RedisError, OSError) as e:
+                logger.warning(f"DM stats cache Redis unavailable, using in-process cache: {e}")
+                self.redis_available = False
+        if not self.redis_available:
+            entry = self._local.get(user_id)
+            if entry and entry[0] > time.monotonic():
+                cached = entry[1]
+        return DirectMessageStatsResponse.model_validate_json(cached) if cached else None
+    
+    async def set(self, user_id: int, stats: DirectMessageStatsResponse) -> None:
+        payload = stats.model_dump_json()
+        if self.redis_available:
+            try:
+                await self.redis_client.set(
+                    f"{DM_STATS_KEY_PREFIX}{user_id}", payload, ex=DM_STATS_TTL_SECONDS
+                )
+                return
+            except (aioredis.RedisError, OSError) as e:
+                logger.warning(f"DM stats cache Redis unavailable, using in-process cache: {e}")
+                self.redis_available = False
+        self._local[user_id] = (time.monotonic() + DM_STATS_TTL_SECONDS, payload)
+    
+    async def invalidate(self, user_id: int) -> None:
+        if self.redis_available:
+            try:
+                await self.redis_client.delete(f"{DM_STATS_KEY_PREFIX}{user_id}")
+                return
+            except (aioredis.RedisError, OSError) as e:
+                logger.warning(f"DM stats cache Redis unavailable, using in-process cache: {e}")
+                self.redis_available = False
+        self._local.pop(user_id, None)
+
+
+_dm_stats_cache: Optional[DMStatsCache] = None
+
+
+def get_dm_stats_cache() -> DMStatsCache:
+    global _dm_stats_cache
+    if _dm_stats_cache is None:
+        _dm_stats_cache = DMStatsCache()
+    return _dm_stats_cache
+
+
+class DMSchedulerLeader:
+    """
+    Redis lock (dm:jobs:leader) choosing the one worker process that runs the
+    shared DM send jobs. APScheduler does not coordinate schedulers sharing a
+    job store, so every other process keeps its scheduler paused: it can still
+    add jobs to the store, and takes over if the leader stops renewing the lock.
+    """
+    
+    def __init__(self, scheduler: AsyncIOScheduler, redis_client: Any = None):
+        self.scheduler = scheduler
+        self.redis_client = redis_client or aioredis.from_url(settings.REDIS_URL, decode_responses=True)
+        self.token = secrets.token_hex(8)
+        self._task: Optional[asyncio.Task] = None
+    
+    @property
+    def is_leader(self) -> bool:
+        return self.scheduler.state != STATE_PAUSED
+    
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+    
+    async def stop(self) -> None:
+        """Stop contending and hand the lock to the next worker straight away"""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        try:
+            await self.redis_client.eval(_RELEASE_LOCK_SCRIPT, 1, DM_SCHEDULER_LOCK_KEY, self.token)
+        except (aioredis.RedisError, OSError) as e:
+            logger.warning(f"Could not release DM send scheduler lock: {e}")
+    
+    async def _run(self) -> None:
+        while True:
+            await self.poll()
+            await asyncio.sleep(DM_SCHEDULER_POLL_SECONDS)
+    
+    async def poll(self) -> None:
+        """Take, renew or give up the lock, resuming or pausing the scheduler to match"""
+        try:
+            if not self.is_leader:
+                if await self.redis_client.set(
+                    DM_SCHEDULER_LOCK_KEY, self.token, nx=True, ex=DM_SCHEDULER_LOCK_TTL_SECONDS
+                ):
+                    logger.info("DM send scheduler acquired the leader lock")
+                    self.scheduler.resume()
+            elif await self.redis_client.eval(
+                _RENEW_LOCK_SCRIPT, 1, DM_SCHEDULER_LOCK_KEY, self.token, DM_SCHEDULER_LOCK_TTL_SECONDS
+            ):
+                # Jobs added by other processes don't wake this scheduler on their own
+                self.scheduler.wakeup()
+            else:
+                logger.warning("DM send scheduler lost the leader lock, pausing")
+                self.scheduler.pause()
+        except (aioredis.RedisError, OSError) as e:
+            # The lock may lapse while Redis is unreachable, so stop running jobs
+            logger.warning(f"DM send scheduler lock unavailable: {e}")
+            if self.is_leader:
+                self.scheduler.pause()
+
+
+_dm_send_scheduler: Optional[AsyncIOScheduler] = None
+_dm_scheduler_leader: Optional[DMSchedulerLeader] = None
+# Held while starting the scheduler, so concurrent first callers open one job store
+_dm_send_scheduler_lock = asyncio.Lock()
+
+
+def _dm_job_store() -> Optional["RedisJobStore"]:
+    """Redis-backed store for pending sends, or None to keep them in memory.
+    
+    Connects synchronously, so call it off the event loop.
+    """
+    if aioredis is None:
+        return None
+    try:
+        jobstore = RedisJobStore(
+            jobs_key=DM_JOBS_KEY,
+            run_times_key=DM_JOB_RUN_TIMES_KEY,
+            socket_connect_timeout=2,
+            **parse_url(settings.REDIS_URL)
+        )
+        jobstore.redis.ping()
+        return jobstore
+    except (ValueError, aioredis.RedisError, OSError) as e:
+        logger.warning(f"DM send jobs Redis unavailable, keeping pending sends in memory: {e}")
+        return None
+
+
+async def get_dm_send_scheduler() -> AsyncIOScheduler:
+    """Scheduler that runs delayed campaign sends, started on first use.
+    
+    Pending sends are stored in Redis so they survive a restart and are shared
+    by all worker processes; only the DMSchedulerLeader runs them, picking up
+    any that fell due while no process was running. Without Redis each process
+    keeps and runs its own sends in memory.
+    """
+    global _dm_send_scheduler, _dm_scheduler_leader
+    async with _dm_send_scheduler_lock:
+        if _dm_send_scheduler is None:
+            jobstore = await asyncio.to_thread(_dm_job_store)
+            scheduler = AsyncIOScheduler()
+            if jobstore is None:
+                scheduler.start()
+            else:
+                scheduler.add_jobstore(jobstore)
+                scheduler.start(paused=True)
+                _dm_scheduler_leader = DMSchedulerLeader(scheduler)
+                _dm_scheduler_leader.start()
+            _dm_send_scheduler = scheduler
+    return _dm_send_scheduler
+
+
+async def shutdown_dm_send_scheduler() -> None:
+    """Stop the send scheduler, leaving stored jobs for the next leader"""
+    global _dm_send_scheduler, _dm_scheduler_leader
+    if _dm_scheduler_leader is not None:
+        await _dm_scheduler_leader.stop()
+        _dm_scheduler_leader = None
+    if _dm_send_scheduler is not None:
+        _dm_send_scheduler.shutdown(wait=False)
+        _dm_send_scheduler = None
+
+
+async def _send_scheduled_dm(campaign_id: int, recipient_id: str, recipient_username: Optional[str]) -> None:
+    """Scheduler job: send one campaign message in its own session"""
+    async with AsyncSessionLocal() as db:
+        try:
+            await DirectMessageService(db).send_direct_message(campaign_id, recipient_id, recipient_username)
+        except ValueError as e:
+            logger.warning(f"Skipped scheduled DM for campaign {campaign_id}: {e}")
+
+
+async def _send_scheduled_dm_batch(campaign_id: int, recipients: List[Dict[str, str]]) -> None:
+    """Scheduler job: send a campaign to all recipients at once in its own session"""
+    async with AsyncSessionLocal() as db:
+        try:
+            await DirectMessageService(db).send_direct_messages_bulk(campaign_id, recipients)
+        except ValueError as e:
+            logger.warning(f"Skipped scheduled DMs for campaign {campaign_id}: {e}")
+
+
+def _encode_cursor(row_id: int) -> str:
+    """Opaque keyset cursor pointing just past the row with this id"""
+    return base64.urlsafe_b64encode(json.dumps({"i": row_id}).encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> int:
+    """Row id from a cursor produced by _encode_cursor"""
+    try:
+        return int(json.loads(base64.urlsafe_b64decode(cursor.encode()))["i"])
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError("Invalid pagination cursor") from e
+
+
 class DirectMessageService:
     """Service for automated direct messaging functionality"""
     
-    def __init__(self, db: AsyncSession):
+    def __init__(
+        self, 
+        db: AsyncSession, 
+        rate_limiter: Optional[DMSendRateLimiter] = None,
+        stats_cache: Optional[DMStatsCache] = None
+    ):
         self.db = db
+        self.rate_limiter = rate_limiter or get_dm_rate_limiter()
+        self.stats_cache = stats_cache or get_dm_stats_cache()
     
     async def create_dm_campaign(self, dm_data: DirectMessageCreate, user_id: int) -> DirectMessage:
         """Create a new direct message campaign"""
@@ -36,43 +393,83 @@ class DirectMessageService:
         if not social_account:
             raise ValueError("Social account not found or not owned by user")
         
-        dm_campaign = DirectMessage(
+        # RETURNING hands back server defaults like created_at with the insert,
+        # so no refresh SELECT is needed after the commit
+        query = insert(DirectMessage).values(
             **dm_data.model_dump(),
             user_id=user_id
-        )
+        ).returning(DirectMessage)
         
-        self.db.add(dm_campaign)
+        result = await self.db.execute(query)
+        dm_campaign = result.scalar_one()
         await self.db.commit()
-        await self.db.refresh(dm_campaign)
+        await self.stats_cache.invalidate(user_id)
         
         logger.info(f"Created DM campaign {dm_campaign.id} for user {user_id}")
         return dm_campaign
     
-    async def get_dm_campaign(self, campaign_id: int, user_id: int) -> Optional[DirectMessage]:
-        """Get a direct message campaign by ID"""
-        
-        query = select(DirectMessage).where(
-            and_(DirectMessage.id == campaign_id, DirectMessage.user_id == user_id)
-        ).options(
-            selectinload(DirectMessage.social_account),
-            selectinload(DirectMessage.message_logs)
-        )
+    async def get_dm_campaign_summary(self, campaign_id: int, user_id: int) -> Optional[DirectMessage]:
+        """Get a direct message campaign by ID, without its message logs"""
         
-        result = await self.db.execute(query)
+        result = await self.db.execute(_OWNED_CAMPAIGN, {"campaign_id": campaign_id, "user_id": user_id})
         return result.scalar_one_or_none()
     
+    async def get_dm_campaign_with_logs(
+        self, 
+        campaign_id: int, 
+        user_id: int, 
+        limit: int = 50
+    ) -> Optional[DirectMessage]:
+        """Get a campaign with only its most recent `limit` message logs loaded.
+        
+        The full history is available page by page through get_dm_logs.
+        """
+        
+        campaign = await self.get_dm_campaign_summary(campaign_id, user_id)
+        if not campaign:
+            return None
+        
+        logs_query = select(DirectMessageLog).where(
+            DirectMessageLog.direct_message_id == campaign_id
+        ).order_by(desc(DirectMessageLog.sent_at), desc(DirectMessageLog.id)).limit(limit)
+        logs_result = await self.db.execute(logs_query)
+        
+        # Populate the relationship as loaded so nothing lazy-loads the rest
+        set_committed_value(campaign, "message_logs", list(logs_result.scalars()))
+        return campaign
+    
     async def list_dm_campaigns(
         self, 
         user_id: int, 
         social_account_id: Optional[int] = None,
         message_type: Optional[DirectMessageType] = None,
         is_active: Optional[bool] = None,
-        page: int = 1, 
+        cursor: Optional[str] = None, 
         size: int = 20
-    ) -> tuple[List[DirectMessage], int]:
-        """List user's direct message campaigns with filters"""
-        
-        query = select(DirectMessage).where(DirectMessage.user_id == user_id)
+    ) -> tuple[List[DirectMessageListItem], Optional[str]]:
+        """List user's direct message campaigns with filters, newest first.
+        
+        Only the listed columns are selected; message content and targeting
+        criteria stay in the database until a single campaign is opened.
+        Returns the page and a cursor for the next one (None on the last page).
+        """
+        
+        query = select(
+            DirectMessage.id,
+            DirectMessage.social_account_id,
+            SocialAccount.platform,
+            DirectMessage.message_type,
+            DirectMessage.subject,
+            DirectMessage.status,
+            DirectMessage.sent_count,
+            DirectMessage.success_count,
+            DirectMessage.failure_count,
+            DirectMessage.is_active,
+            DirectMessage.created_at,
+            DirectMessage.last_sent_at
+        ).join(SocialAccount, DirectMessage.social_account_id == SocialAccount.id).where(
+            DirectMessage.user_id == user_id
+        )
         
         # Apply filters
         if social_account_id:
@@ -84,19 +481,27 @@ class DirectMessageService:
         if is_active is not None:
             query = query.where(DirectMessage.is_active == is_active)
         
-        # Get total count
-        count_query = select(func.count()).select_from(query.subquery())
-        total_result = await self.db.execute(count_query)
-        total = total_result.scalar()
+        # Keyset pagination: continue strictly after the cursor row's sort key,
+        # read back from the row itself so the comparison uses stored values
+        if cursor:
+            anchor = select(DirectMessage.created_at, DirectMessage.id).where(
+                and_(DirectMessage.id == _decode_cursor(cursor), DirectMessage.user_id == user_id)
+            )
+            query = query.where(
+                tuple_(DirectMessage.created_at, DirectMessage.id) < anchor.scalar_subquery()
+            )
         
-        # Apply pagination and ordering
-        query = query.order_by(desc(DirectMessage.created_at)).offset((page - 1) * size).limit(size)
-        query = query.options(selectinload(DirectMessage.social_account))
+        # One extra row tells us whether another page exists
+        query = query.order_by(desc(DirectMessage.created_at), desc(DirectMessage.id)).limit(size + 1)
         
         result = await self.db.execute(query)
-        campaigns = list(result.scalars().all())
+        campaigns = [DirectMessageListItem(**row._mapping) for row in result]
+        if cursor and not campaigns:
+            await self._check_cursor_anchor(anchor)
         
-        return campaigns, total
+        if len(campaigns) > size:
+            return campaigns[:size], _encode_cursor(campaigns[size - 1].id)
+        return campaigns, None
     
     async def update_dm_campaign(
         self, 
@@ -106,16 +511,22 @@ class DirectMessageService:
     ) -> Optional[DirectMessage]:
         """Update a direct message campaign"""
         
-        campaign = await self.get_dm_campaign(campaign_id, user_id)
+        update_data = dm_data.model_dump(exclude_unset=True)
+        if not update_data:
+            return await self.get_dm_campaign_summary(campaign_id, user_id)
+        
+        # Update in place and read the row back in the same statement
+        query = update(DirectMessage).where(
+            and_(DirectMessage.id == campaign_id, DirectMessage.user_id == user_id)
+        ).values(**update_data).returning(DirectMessage)
+        
+        result = await self.db.execute(query, execution_options={"populate_existing": True})
+        campaign = result.scalar_one_or_none()
         if not campaign:
             return None
         
-        update_data = dm_data.model_dump(exclude_unset=True)
-        for field, value in update_data.items():
-            setattr(campaign, field, value)
-        
         await self.db.commit()
-        await self.db.refresh(campaign)
+        await self.stats_cache.invalidate(user_id)
         
         logger.info(f"Updated DM campaign {campaign_id} for user {user_id}")
         return campaign
@@ -123,12 +534,21 @@ class DirectMessageService:
     async def delete_dm_campaign(self, campaign_id: int, user_id: int) -> bool:
         """Delete a direct message campaign"""
         
-        campaign = await self.get_dm_campaign(campaign_id, user_id)
-        if not campaign:
+        owned = and_(DirectMessage.id == campaign_id, DirectMessage.user_id == user_id)
+        
+        # The foreign key has no ON DELETE CASCADE, so clear the logs first;
+        # both statements are scoped to the owner, so no ownership SELECT is needed
+        await self.db.execute(
+            delete(DirectMessageLog).where(
+                DirectMessageLog.direct_message_id.in_(select(DirectMessage.id).where(owned))
+            )
+        )
+        result = await self.db.execute(delete(DirectMessage).where(owned).returning(DirectMessage.id))
+        if result.scalar_one_or_none() is None:
             return False
         
-        await self.db.delete(campaign)
         await self.db.commit()
+        await self.stats_cache.invalidate(user_id)
         
         logger.info(f"Deleted DM campaign {campaign_id} for user {user_id}")
         return True
@@ -141,35 +561,76 @@ class DirectMessageService:
     ) -> DirectMessageLog:
         """Send a direct message to a specific recipient"""
         
-        campaign_query = select(DirectMessage).where(DirectMessage.id == campaign_id)
-        campaign_result = await self.db.execute(campaign_query)
-        campaign = campaign_result.scalar_one_or_none()
+        campaign = await self._get_active_campaign(campaign_id)
         
-        if not campaign or not campaign.is_active:
-            raise ValueError("Campaign not found or not active")
+        # Check rate limits (rough hourly limit over a sliding one-hour window)
+        if not await self.rate_limiter.try_acquire(self.db, campaign_id, campaign.max_sends_per_day // 24):
+            raise ValueError("Rate limit exceeded for this campaign")
         
-        # Check rate limits
-        current_hour = datetime.utcnow().replace(minute=0, second=0, microsecond=0)
-        recent_sends_query = select(func.count()).select_from(DirectMessageLog).where(
-            and_(
-                DirectMessageLog.direct_message_id == campaign_id,
-                DirectMessageLog.sent_at >= current_hour
-            )
-        )
-        recent_sends_result = await self.db.execute(recent_sends_query)
-        recent_sends = recent_sends_result.scalar()
+        log_values = await self._deliver(campaign, recipient_id, recipient_username)
+        message_logs = await self._record_sends(campaign, [log_values])
+        return message_logs[0]
+    
+    async def send_direct_messages_bulk(
+        self, 
+        campaign_id: int, 
+        recipients: List[Dict[str, str]]
+    ) -> List[DirectMessageLog]:
+        """Send a campaign message to many recipients and record them in one commit.
         
-        if recent_sends >= campaign.max_sends_per_day // 24:  # Rough hourly limit
-            raise ValueError("Rate limit exceeded for this campaign")
+        Recipients past the campaign's hourly limit are skipped.
+        """
+        
+        campaign = await self._get_active_campaign(campaign_id)
         
-        # Create message log entry
-        message_log = DirectMessageLog(
-            direct_message_id=campaign_id,
-            recipient_id=recipient_id,
-            recipient_username=recipient_username,
-            sent_content=campaign.message_content,
-            status=DirectMessageStatus.PENDING
+        granted = await self.rate_limiter.try_acquire_many(
+            self.db, campaign_id, campaign.max_sends_per_day // 24, len(recipients)
         )
+        if granted < len(recipients):
+            logger.warning(
+                f"Rate limit reached for campaign {campaign_id}, "
+                f"skipping {len(recipients) - granted} recipients"
+            )
+        allowed = recipients[:granted]
+        
+        if not allowed:
+            return []
+        
+        semaphore = asyncio.Semaphore(DM_SEND_CONCURRENCY)
+        
+        async def deliver(recipient: Dict[str, str]) -> Dict[str, Any]:
+            async with semaphore:
+                return await self._deliver(campaign, recipient['id'], recipient.get('username'))
+        
+        pending_logs = await asyncio.gather(*(deliver(recipient) for recipient in allowed))
+        return await self._record_sends(campaign, pending_logs)
+    
+    async def _get_active_campaign(self, campaign_id: int) -> DirectMessage:
+        campaign_result = await self.db.execute(_CAMPAIGN_BY_ID, {"campaign_id": campaign_id})
+        campaign = campaign_result.scalar_one_or_none()
+        
+        if not campaign or not campaign.is_active:
+            raise ValueError("Campaign not found or not active")
+        return campaign
+    
+    async def _deliver(
+        self, 
+        campaign: DirectMessage, 
+        recipient_id: str, 
+        recipient_username: Optional[str]
+    ) -> Dict[str, Any]:
+        """Send one message to the platform and return the values for its log row"""
+        
+        # Every row carries the same keys so a batch can go out as one executemany
+        log_values = {
+            "direct_message_id": campaign.id,
+            "recipient_id": recipient_id,
+            "recipient_username": recipient_username,
+            "sent_content": campaign.message_content,
+            "status": DirectMessageStatus.PENDING,
+            "platform_message_id": None,
+            "error_message": None
+        }
         
         try:
             # Here would be the actual platform API call
@@ -177,62 +638,79 @@ class DirectMessageService:
             success = await self._send_message_to_platform(campaign, recipient_id, campaign.message_content)
             
             if success:
-                message_log.status = DirectMessageStatus.SENT
-                message_log.platform_message_id = f"msg_{campaign_id}_{recipient_id}_{int(datetime.utcnow().timestamp())}"
-                
-                # Update campaign statistics
-                campaign.sent_count += 1
-                campaign.success_count += 1
-                campaign.last_sent_at = datetime.utcnow()
+                log_values["status"] = DirectMessageStatus.SENT
+                log_values["platform_message_id"] = f"msg_{campaign.id}_{recipient_id}_{int(datetime.utcnow().timestamp())}"
             else:
-                message_log.status = DirectMessageStatus.FAILED
-                message_log.error_message = "Platform API error"
-                campaign.failure_count += 1
+                log_values["status"] = DirectMessageStatus.FAILED
+                log_values["error_message"] = "Platform API error"
         
         except Exception as e:
-            message_log.status = DirectMessageStatus.FAILED
-            message_log.error_message = str(e)
-            campaign.failure_count += 1
-            logger.error(f"Failed to send DM from campaign {campaign_id}: {e}")
+            log_values["status"] = DirectMessageStatus.FAILED
+            log_values["error_message"] = str(e)
+            logger.error(f"Failed to send DM from campaign {campaign.id}: {e}")
+        
+        return log_values
+    
+    async def _record_sends(
+        self, 
+        campaign: DirectMessage, 
+        pending_logs: List[Dict[str, Any]]
+    ) -> List[DirectMessageLog]:
+        """Insert the log rows and bump the campaign counters in a single commit"""
+        
+        sent = sum(1 for log in pending_logs if log["status"] == DirectMessageStatus.SENT)
+        failed = len(pending_logs) - sent
+        
+        # Update campaign statistics in the database rather than on the loaded
+        # object, so concurrent sends for the same campaign don't lose counts
+        counters = {}
+        if sent:
+            counters.update(
+                sent_count=DirectMessage.sent_count + sent,
+                success_count=DirectMessage.success_count + sent,
+                last_sent_at=func.now()
+            )
+        if failed:
+            counters["failure_count"] = DirectMessage.failure_count + failed
+        await self.db.execute(
+            update(DirectMessage).where(DirectMessage.id == campaign.id).values(**counters),
+            execution_options={"synchronize_session": False}
+        )
         
-        self.db.add(message_log)
+        result = await self.db.scalars(insert(DirectMessageLog).returning(DirectMessageLog), pending_logs)
+        message_logs = result.all()
         await self.db.commit()
-        await self.db.refresh(message_log)
         
-        return message_log
+        if sent:
+            await self.stats_cache.invalidate(campaign.user_id)
+        
+        return message_logs
     
     async def get_dm_stats(self, user_id: int) -> DirectMessageStatsResponse:
         """Get direct message statistics for user"""
         
-        # Total campaigns
-        total_query = select(func.count()).select_from(DirectMessage).where(DirectMessage.user_id == user_id)
-        total_result = await self.db.execute(total_query)
-        total_campaigns = total_result.scalar()
+        cached = await self.stats_cache.get(user_id)
+        if cached is not None:
+            return cached
         
-        # Active campaigns
-        active_query = select(func.count()).select_from(DirectMessage).where(
-            and_(DirectMessage.user_id == user_id, DirectMessage.is_active == True)
-        )
-        active_result = await self.db.execute(active_query)
-        active_campaigns = active_result.scalar()
-        
-        # Total sent messages
-        sent_query = select(func.sum(DirectMessage.sent_count)).where(DirectMessage.user_id == user_id)
-        sent_result = await self.db.execute(sent_query)
-        total_sent = sent_result.scalar() or 0
-        
-        # Success rate
-        success_query = select(func.sum(DirectMessage.success_count)).where(DirectMessage.user_id == user_id)
-        success_result = await self.db.execute(success_query)
-        total_success = success_result.scalar() or 0
+        # Campaign counts and send totals in a single pass over the user's campaigns
+        totals_query = select(
+            func.count(DirectMessage.id),
+            func.count(DirectMessage.id).filter(DirectMessage.is_active == True),
+            func.coalesce(func.sum(DirectMessage.sent_count), 0),
+            func.coalesce(func.sum(DirectMessage.success_count), 0)
+        ).where(DirectMessage.user_id == user_id)
+        totals_result = await self.db.execute(totals_query)
+        total_campaigns, active_campaigns, total_sent, total_success = totals_result.one()
         
         success_rate = (total_success / total_sent * 100) if total_sent > 0 else 0
         
         # Recent sends (last 24 hours)
         yesterday = datetime.utcnow() - timedelta(days=1)
-        recent_query = select(func.count()).select_from(DirectMessageLog).join(DirectMessage).where(
+        user_campaigns = select(DirectMessage.id).where(DirectMessage.user_id == user_id)
+        recent_query = select(func.count()).select_from(DirectMessageLog).where(
             and_(
-                DirectMessage.user_id == user_id,
+                DirectMessageLog.direct_message_id.in_(user_campaigns),
                 DirectMessageLog.sent_at >= yesterday,
                 DirectMessageLog.status == DirectMessageStatus.SENT
             )
@@ -240,23 +718,25 @@ class DirectMessageService:
         recent_result = await self.db.execute(recent_query)
         recent_sends = recent_result.scalar()
         
-        return DirectMessageStatsResponse(
+        stats = DirectMessageStatsResponse(
             total_campaigns=total_campaigns,
             active_campaigns=active_campaigns,
             total_sent=total_sent,
             success_rate=round(success_rate, 2),
             recent_sends=recent_sends
         )
+        await self.stats_cache.set(user_id, stats)
+        return stats
     
     async def get_dm_logs(
         self, 
         user_id: int, 
         campaign_id: Optional[int] = None,
         status: Optional[DirectMessageStatus] = None,
-        page: int = 1, 
+        cursor: Optional[str] = None, 
         size: int = 20
-    ) -> tuple[List[DirectMessageLog], int]:
-        """Get direct message sending logs"""
+    ) -> tuple[List[DirectMessageLog], Optional[str]]:
+        """Get direct message sending logs, newest first, with the next page's cursor"""
         
         query = select(DirectMessageLog).join(DirectMessage).where(DirectMessage.user_id == user_id)
         
@@ -266,49 +746,80 @@ class DirectMessageService:
         if status:
             query = query.where(DirectMessageLog.status == status)
         
-        # Get total count
-        count_query = select(func.count()).select_from(query.subquery())
-        total_result = await self.db.execute(count_query)
-        total = total_result.scalar()
+        if cursor:
+            anchor = select(DirectMessageLog.sent_at, DirectMessageLog.id).join(DirectMessage).where(
+                and_(DirectMessageLog.id == _decode_cursor(cursor), DirectMessage.user_id == user_id)
+            )
+            query = query.where(
+                tuple_(DirectMessageLog.sent_at, DirectMessageLog.id) < anchor.scalar_subquery()
+            )
         
-        # Apply pagination and ordering
-        query = query.order_by(desc(DirectMessageLog.sent_at)).offset((page - 1) * size).limit(size)
+        query = query.order_by(desc(DirectMessageLog.sent_at), desc(DirectMessageLog.id)).limit(size + 1)
         
         result = await self.db.execute(query)
-        logs = list(result.scalars().all())
+        logs = result.scalars().all()
+        if cursor and not logs:
+            await self._check_cursor_anchor(anchor)
         
-        return logs, total
+        if len(logs) > size:
+            return logs[:size], _encode_cursor(logs[size - 1].id)
+        return logs, None
+    
+    async def _check_cursor_anchor(self, anchor) -> None:
+        """Reject a cursor whose row was deleted or belongs to another user.
+        
+        Its sort key then reads as NULL and matches nothing, which would
+        otherwise look like the end of the listing.
+        """
+        if (await self.db.execute(anchor)).first() is None:
+            raise ValueError("Pagination cursor no longer points to a row; start again from the first page")
     
     async def process_dm_triggers(self, user_id: int) -> None:
         """Process automated DM triggers (called by background task)"""
         
-        # Get active campaigns
+        # Get active campaigns. Keep the literal is_active == True predicate:
+        # it is what lets the partial ix_direct_messages_active_user index match
         campaigns_query = select(DirectMessage).where(
             and_(DirectMessage.user_id == user_id, DirectMessage.is_active == True)
         )
         campaigns_result = await self.db.execute(campaigns_query)
         campaigns = list(campaigns_result.scalars().all())
         
-        for campaign in campaigns:
-            try:
-                # Check if it's time to send based on triggers
-                should_send = await self._check_dm_triggers(campaign)
-                
-                if should_send:
-                    # Get target recipients based on criteria
-                    recipients = await self._get_target_recipients(campaign)
-                    
-                    # Send messages (with rate limiting)
-                    for recipient in recipients[:campaign.max_sends_per_day]:
-                        await asyncio.sleep(campaign.send_delay_minutes * 60)  # Respect delay
-                        await self.send_direct_message(
-                            campaign.id, 
-                            recipient['id'], 
-                            recipient.get('username')
-                        )
-                        
-            except Exception as e:
-                logger.error(f"Error processing DM campaign {campaign.id}: {e}")
+        # Campaigns only enqueue their sends, so they can be dispatched together
+        await asyncio.gather(*(self._dispatch_campaign(campaign) for campaign in campaigns))
+    
+    async def _dispatch_campaign(self, campaign: DirectMessage) -> None:
+        """Schedule a triggered campaign's sends, spaced by its send delay"""
+        try:
+            # Check if it's time to send based on triggers
+            if not await self._check_dm_triggers(campaign):
+                return
+            
+            # Get target recipients based on criteria
+            recipients = (await self._get_target_recipients(campaign))[:campaign.max_sends_per_day]
+            scheduler = await get_dm_send_scheduler()
+            
+            # Without a delay there is nothing to space out: send the whole
+            # batch together and record it in one commit
+            if not campaign.send_delay_minutes:
+                if recipients:
+                    scheduler.add_job(_send_scheduled_dm_batch, args=[campaign.id, recipients])
+                return
+            
+            # Each send runs as its own job at now + (i + 1) * delay instead of
+            # sleeping here, so one slow campaign no longer holds up the rest
+            now = datetime.now(timezone.utc)
+            delay = timedelta(minutes=campaign.send_delay_minutes)
+            for i, recipient in enumerate(recipients):
+                scheduler.add_job(
+                    _send_scheduled_dm,
+                    trigger=DateTrigger(run_date=now + (i + 1) * delay),
+                    args=[campaign.id, recipient['id'], recipient.get('username')],
+                    misfire_grace_time=None
+                )
+        
+        except Exception as e:
+            logger.error(f"Error processing DM campaign {campaign.id}: {e}")
     
     async def _send_message_to_platform(
         self, 
@@ -4,50 +4,338 @@ Enhanced AI meme generator with trending analysis and brand relevance
 
 import asyncio
 import base64
+import functools
 import io
-import json
+import logging
 import os
 import random
+import secrets
 import tempfile
-from typing import List, Dict, Any, Optional, Union
+import time
+from types import MappingProxyType
+from typing import List, Dict, Any, Mapping, Optional, Sequence, Union
 from pathlib import Path
 import httpx
+import numpy as np
+import orjson
 try:
     import openai
 except ImportError:
     openai = None
 from PIL import Image, ImageDraw, ImageFont, ImageFilter, ImageEnhance, ImageOps
+from sqlalchemy import select, insert, update, and_, or_
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
 from datetime import datetime, timedelta
 
 from app.core.config import settings
+from app.core.llm_cache import get_llm_cache
+from app.core.openai_client import get_openai_client
 from app.models.content import Content, ContentType, ContentStatus
 from app.models.social_account import SocialPlatform as Platform
 
+logger = logging.getLogger(__name__)
+
+MEME_GENERATION_CONCURRENCY = 8  # Memes generated at once; each makes several OpenAI calls
+MEME_FONT_PATH = "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf"
+BRAND_ALIGNMENT_CACHE_TTL = 7 * 24 * 3600  # Seconds; a text's fit with a voice doesn't drift
+ALIGNMENT_TEXT_MAX_CHARS = 512
+BRAND_ALIGNMENT_BREAKER_SECONDS = 30  # Pause scoring this long once OpenAI retries are exhausted
+MEME_TEMPLATE_DIR = Path(__file__).parent.parent / "assets" / "meme_templates"
+
+
+# Meme copy model; JSON mode guarantees a parseable object reply
+MEME_TEXT_MODEL = "gpt-4o-mini"
+JSON_OBJECT_FORMAT = {"type": "json_object"}
+
+_TOPIC_ANALYSIS_SYSTEM_PROMPT = (
+    "Rate a topic's meme potential. Return strictly JSON: "
+    '{"trending_score": 0-1, "humor_potential": 0-1, "relatability": 0-1, '
+    '"meme_angles": [str], "recommended_formats": [str], "timing": str}. '
+    "recommended_formats use: choice_comparison, distraction, reaction, "
+    "situation_commentary, progression, opinion."
+)
+
+_SERIES_PLAN_SYSTEM_PROMPT = (
+    "Plan a meme series on a theme in the given voice for the platform. "
+    'Return strictly JSON: {"concepts": [{"topic": str, "target_audience": str}], '
+    '"schedule": {"frequency": str, "optimal_times": ["HH:MM"]}, '
+    '"engagement": {"hashtags": [str], "engagement_tactics": [str]}} '
+    "with exactly the requested number of concepts, each a distinct angle on the theme."
+)
+
+_MEME_TEXT_SYSTEM_PROMPT = (
+    "Write short, punchy meme text in the given voice for the platform and "
+    "audience. Return strictly JSON: {schema}"
+)
+
+# Smallest caption font size per platform; others use 32
+_MIN_FONT_SIZES: Mapping[Platform, int] = MappingProxyType({
+    Platform.TIKTOK: 40,
+    Platform.INSTAGRAM: 36
+})
+
+_PROGRESSION_LEVELS = ("level_1", "level_2", "level_3", "level_4")
+
+# JSON reply shape per meme format type
+_MEME_TEXT_SCHEMAS: Mapping[str, str] = MappingProxyType({
+    "choice_comparison": '{"rejection_text": str, "approval_text": str}',
+    "progression": '{"levels": [str, str, str, str]}',
+    "default": '{"top_text": str, "bottom_text": str}'
+})
+
+# One Batch API request covers what the interactive path spreads over three calls
+_BATCH_MEME_SYSTEM_PROMPT = (
+    "Rate a topic's meme potential, write short, punchy meme text in the given "
+    "voice for the platform and audience, and rate how well that text fits the "
+    "brand voice. Return strictly JSON: "
+    '{{"trending_score": 0-1, "humor_potential": 0-1, "relatability": 0-1, '
+    '"brand_alignment": 1-5, "text": {schema}}}'
+)
+MEME_BATCH_ENDPOINT = "/v1/chat/completions"
+MEME_BATCH_COMPLETION_WINDOW = "24h"
+MEME_BATCH_FAILED_STATUSES = frozenset({"failed", "expired", "cancelled"})
+MEME_BATCH_UNRENDERED_STATUSES = frozenset({"pending", "rendering"})
+MEME_BATCH_CLAIM_TIMEOUT = 15 * 60  # Seconds before another poll may retake a stalled render
+
+# Brand alignment is rated 1-5 (5 = perfect fit) and mapped onto 0.0-1.0;
+# LLMs grade discrete classes more consistently than they emit floats
+_BRAND_ALIGNMENT_SYSTEM_PROMPT = (
+    "Rate how well meme text fits the brand voice in tone, messaging and "
+    "appropriateness, from 1 (misaligned) to 5 (perfect fit). "
+    "Reply with exactly one digit 1-5."
+)
+_BRAND_ALIGNMENT_BATCH_SYSTEM_PROMPT = (
+    "Rate how well each numbered meme text fits the brand voice in tone, "
+    "messaging and appropriateness, from 1 (misaligned) to 5 (perfect fit). "
+    'Return strictly JSON: {"scores": [1-5]} with one score per text, in order.'
+)
+# o200k_base (gpt-4o-mini) token ids for the digits 1-5, forcing a one-token rating
+_RATING_LOGIT_BIAS = {"16": 100, "17": 100, "18": 100, "19": 100, "20": 100}
+
+# Errors that survive the client's own retries and signal an OpenAI outage
+_OPENAI_OUTAGE_ERRORS = (
+    (openai.RateLimitError, openai.APIConnectionError, openai.InternalServerError) if openai else ()
+)
+
+# Read-only lookup tables, shared safely across requests and coroutines
+_EMPTY_MAPPING: Mapping[str, Any] = MappingProxyType({})
+
+_TRENDING_FORMATS: Mapping[Platform, Sequence[Mapping[str, Any]]] = MappingProxyType({
+    Platform.TIKTOK: (
+        MappingProxyType({
+            "name": "drake_pointing",
+            "popularity": 0.9,
+            "format_type": "choice_comparison",
+            "template": "drake_template.jpg",
+            "description": "Drake pointing meme for comparing two options"
+        }),
+        MappingProxyType({
+            "name": "distracted_boyfriend",
+            "popularity": 0.8,
+            "format_type": "distraction",
+            "template": "distracted_boyfriend.jpg",
+            "description": "Distracted boyfriend meme for showing preference"
+        }),
+        MappingProxyType({
+            "name": "woman_yelling_cat",
+            "popularity": 0.85,
+            "format_type": "reaction",
+            "template": "woman_cat.jpg",
+            "description": "Woman yelling at cat reaction meme"
+        })
+    ),
+    Platform.INSTAGRAM: (
+        MappingProxyType({
+            "name": "this_is_fine",
+            "popularity": 0.87,
+            "format_type": "situation_commentary",
+            "template": "this_is_fine.jpg",
+            "description": "This is fine dog meme for ironic situations"
+        }),
+        MappingProxyType({
+            "name": "expanding_brain",
+            "popularity": 0.82,
+            "format_type": "progression",
+            "template": "expanding_brain.jpg",
+            "description": "Expanding brain meme for showing progression"
+        })
+    ),
+    Platform.TWITTER: (
+        MappingProxyType({
+            "name": "hot_takes",
+            "popularity": 0.9,
+            "format_type": "opinion",
+            "template": "hot_takes.jpg",
+            "description": "Hot takes format for controversial opinions"
+        }),
+    )
+})
+
+_FORMAT_VOICE_COMPATIBILITY: Mapping[str, Mapping[str, float]] = MappingProxyType({
+    "professional": MappingProxyType({
+        "choice_comparison": 0.8,
+        "progression": 0.9,
+        "situation_commentary": 0.7,
+        "reaction": 0.6
+    }),
+    "casual": MappingProxyType({
+        "reaction": 0.9,
+        "distraction": 0.8,
+        "situation_commentary": 0.8,
+        "choice_comparison": 0.7
+    }),
+    "humorous": MappingProxyType({
+        "reaction": 0.95,
+        "situation_commentary": 0.9,
+        "distraction": 0.85,
+        "choice_comparison": 0.8
+    }),
+    "educational": MappingProxyType({
+        "progression": 0.9,
+        "choice_comparison": 0.8,
+        "situation_commentary": 0.7,
+        "reaction": 0.6
+    })
+})
+
+# Encoder per platform; Twitter takes WebP in-feed, the rest get JPEG
+_MEME_IMAGE_FORMATS: Mapping[Platform, str] = MappingProxyType({
+    Platform.TWITTER: "WEBP"
+})
+_MEME_IMAGE_SUFFIXES: Mapping[str, str] = MappingProxyType({"JPEG": ".jpg", "WEBP": ".webp"})
+# Quality 88 with 4:2:0 chroma is visually lossless for memes and skips the
+# extra optimize/progressive encoder passes
+_MEME_SAVE_OPTIONS: Mapping[str, Mapping[str, Any]] = MappingProxyType({
+    "JPEG": MappingProxyType({"quality": 88, "optimize": False, "progressive": False, "subsampling": 2}),
+    "WEBP": MappingProxyType({"quality": 85})
+})
+
+# Colour adjustment applied before posting; other platforms post the meme as rendered
+_PLATFORM_ENHANCEMENTS: Mapping[Platform, tuple] = MappingProxyType({
+    Platform.TIKTOK: (ImageEnhance.Color, 1.2),
+    Platform.INSTAGRAM: (ImageEnhance.Contrast, 1.1)
+})
+
+# Viral score bonus per platform; others get 0.05
+_VIRAL_PLATFORM_BONUS: Mapping[Platform, float] = MappingProxyType({
+    Platform.TIKTOK: 0.1,
+    Platform.TWITTER: 0.08,
+    Platform.INSTAGRAM: 0.06
+})
+
+_MEME_IMAGE_SPECS: Mapping[Platform, Mapping[str, Any]] = MappingProxyType({
+    Platform.TIKTOK: MappingProxyType({"dimensions": (1080, 1080)}),  # Square for TikTok
+    Platform.INSTAGRAM: MappingProxyType({"dimensions": (1080, 1080)}),  # Square for posts
+    Platform.TWITTER: MappingProxyType({"dimensions": (1200, 675)}),  # 16:9 for Twitter
+    Platform.LINKEDIN: MappingProxyType({"dimensions": (1200, 627)}),  # Professional format
+    Platform.YOUTUBE: MappingProxyType({"dimensions": (1280, 720)})  # 16:9 for thumbnails
+})
+
+
+# Monotonic time until which brand alignment scoring is skipped; process-wide,
+# since the service is instantiated per request
+_alignment_breaker_open_until = 0.0
+
+
+def _alignment_breaker_open() -> bool:
+    return time.monotonic() < _alignment_breaker_open_until
+
+
+def _trip_alignment_breaker(error: Exception) -> None:
+    global _alignment_breaker_open_until
+    logger.warning(
+        "OpenAI unavailable after retries, skipping brand alignment scoring for %ss: %s",
+        BRAND_ALIGNMENT_BREAKER_SECONDS, error
+    )
+    _alignment_breaker_open_until = time.monotonic() + BRAND_ALIGNMENT_BREAKER_SECONDS
+
+
+@functools.lru_cache(maxsize=32)
+def _load_meme_font(size: int) -> ImageFont.ImageFont:
+    """Caption font at the given size, parsed from disk once per size"""
+    try:
+        return ImageFont.truetype(MEME_FONT_PATH, size)
+    except OSError:
+        return ImageFont.load_default()
+
+
+# Decoded template files keyed by name. The set is small and static, and
+# _render_text copies the template before drawing, so these are shared as-is.
+_template_images: Dict[str, Image.Image] = {}
+
+
+@functools.lru_cache(maxsize=32)
+def _generated_meme_template(format_type: str, width: int, height: int) -> Image.Image:
+    """Blank template for a format, painted once per format and size"""
+    # Templates are painted straight into a pixel array rather than with
+    # per-line ImageDraw calls
+    canvas = np.full((height, width, 3), 255, dtype=np.uint8)
+    
+    if format_type == "choice_comparison":
+        # Create two-panel template (Drake style)
+        # Draw dividing line
+        canvas[height//2:height//2 + 2] = 0
+        
+        # Add placeholder areas
+        _outline_box(canvas, 10, 10, width//2 - 10, height//2 - 10)
+        _outline_box(canvas, 10, height//2 + 10, width//2 - 10, height - 10)
+        
+    elif format_type == "progression":
+        # Create four-panel template (Brain expanding style)
+        # Draw grid
+        canvas[:, width//2:width//2 + 2] = 0
+        canvas[height//2:height//2 + 2] = 0
+        
+    else:
+        # Standard template with top and bottom text areas
+        # Add gradient from blue at the top towards white at the bottom
+        intensity = (np.arange(height) * 255 // height).astype(np.uint8)
+        canvas[:, :, 0] = intensity[:, np.newaxis]
+        canvas[:, :, 1] = intensity[:, np.newaxis]
+    
+    return Image.fromarray(canvas, "RGB")
+
+
+def _outline_box(canvas: np.ndarray, x0: int, y0: int, x1: int, y1: int, width: int = 2):
+    """Paint a gray rectangle outline (inclusive corners) into an RGB array"""
+    gray = (128, 128, 128)
+    canvas[y0:y0 + width, x0:x1 + 1] = gray
+    canvas[y1 - width + 1:y1 + 1, x0:x1 + 1] = gray
+    canvas[y0:y1 + 1, x0:x0 + width] = gray
+    canvas[y0:y1 + 1, x1 - width + 1:x1 + 1] = gray
+
 
 class EnhancedMemeGeneratorService:
     """Enhanced AI-powered meme generator with trending analysis and brand relevance"""
     
     def __init__(self, db: AsyncSession):
         self.db = db
-        self.openai_client = openai.AsyncOpenAI(api_key=settings.OPENAI_API_KEY) if settings.OPENAI_API_KEY else None
+        self.openai_client = get_openai_client() if settings.OPENAI_API_KEY else None
         self.temp_dir = Path(settings.UPLOAD_DIR) / "memes"
         self.temp_dir.mkdir(parents=True, exist_ok=True)
         
         # Initialize meme templates and trending data
         self._trending_formats = {}
         self._brand_voice_cache = {}
+        self._generation_semaphore = asyncio.Semaphore(MEME_GENERATION_CONCURRENCY)
+        self.llm_cache = get_llm_cache()
     
     async def generate_trending_meme(self, 
                                    topic: str, 
                                    brand_voice: str = "casual",
                                    platform: Platform = Platform.INSTAGRAM,
                                    target_audience: str = "general",
-                                   include_brand_elements: bool = True) -> Dict[str, Any]:
-        """Generate meme using current trending formats and topics"""
+                                   include_brand_elements: bool = True,
+                                   score_brand_alignment: bool = True) -> Dict[str, Any]:
+        """
+        Generate meme using current trending formats and topics. With
+        score_brand_alignment=False, brand_alignment is left as None for a
+        caller that scores several memes in one request.
+        """
         try:
             # Get current trending meme formats
-            trending_formats = await self._get_trending_meme_formats(platform)
+            trending_formats = self._get_trending_meme_formats(platform)
             
             # Analyze topic for meme potential
             topic_analysis = await self._analyze_topic_for_memes(topic, platform, target_audience)
@@ -62,14 +350,14 @@ class EnhancedMemeGeneratorService:
                 topic, selected_format, brand_voice, platform, target_audience
             )
             
-            # Create meme image
-            meme_image = await self._create_meme_image(
-                selected_format, meme_text, platform, include_brand_elements
+            # Render the meme while brand alignment and alternatives are worked out
+            alignment_steps = (
+                [self._calculate_brand_alignment(meme_text, brand_voice)] if score_brand_alignment else []
             )
-            
-            # Add viral enhancement effects
-            enhanced_meme = await self._enhance_for_virality(
-                meme_image["path"], platform, topic_analysis
+            enhanced_meme, alternative_versions, *brand_alignment = await asyncio.gather(
+                self._render_meme(selected_format, meme_text, platform, include_brand_elements, topic_analysis),
+                self._generate_alternative_versions(selected_format, topic, brand_voice, platform),
+                *alignment_steps
             )
             
             return {
@@ -78,11 +366,9 @@ class EnhancedMemeGeneratorService:
                 "text_content": meme_text,
                 "viral_score": enhanced_meme["viral_score"],
                 "trending_relevance": topic_analysis["trending_score"],
-                "brand_alignment": await self._calculate_brand_alignment(meme_text, brand_voice),
+                "brand_alignment": brand_alignment[0] if brand_alignment else None,
                 "platform_optimizations": enhanced_meme["optimizations"],
-                "alternative_versions": await self._generate_alternative_versions(
-                    selected_format, topic, brand_voice, platform
-                )
+                "alternative_versions": alternative_versions
             }
             
         except Exception as e:
@@ -95,22 +381,30 @@ class EnhancedMemeGeneratorService:
                                           count: int = 5) -> Dict[str, Any]:
         """Generate multiple brand-relevant memes based on current trends"""
         try:
-            memes = []
-            
-            for trend in current_trends[:count]:
-                # Analyze trend for brand relevance
-                relevance_analysis = await self._analyze_brand_trend_relevance(
-                    brand_info, trend, platform
-                )
-                
-                if relevance_analysis["relevance_score"] > 0.6:
+            async def generate_for_trend(trend: str) -> Optional[Dict[str, Any]]:
+                async with self._generation_semaphore:
+                    # Analyze trend for brand relevance
+                    relevance_analysis = await self._analyze_brand_trend_relevance(
+                        brand_info, trend, platform
+                    )
+                    
+                    if relevance_analysis["relevance_score"] <= 0.6:
+                        return None
+                    
                     # Generate brand-aligned meme
-                    meme_result = await self._generate_brand_aligned_meme(
+                    return await self._generate_brand_aligned_meme(
                         trend, brand_info, platform, relevance_analysis
                     )
-                    
-                    if "error" not in meme_result:
-                        memes.append(meme_result)
+            
+            results = await asyncio.gather(
+                *(generate_for_trend(trend) for trend in current_trends[:count]),
+                return_exceptions=True
+            )
+            memes = [
+                meme_result for meme_result in results
+                if meme_result and not isinstance(meme_result, BaseException) and "error" not in meme_result
+            ]
+            await self._score_brand_alignment(memes, brand_info.get("voice", "casual"))
             
             # Rank memes by potential impact
             ranked_memes = await self._rank_memes_by_impact(memes, brand_info, platform)
@@ -133,43 +427,338 @@ class EnhancedMemeGeneratorService:
                                brand_voice: str = "casual") -> Dict[str, Any]:
         """Create a series of related memes around a theme"""
         try:
-            # Develop series concept
-            series_concept = await self._develop_meme_series_concept(
-                theme, series_count, platform, brand_voice
+            # Plan concepts, posting schedule and engagement in one request
+            series_plan = await self._plan_series(theme, series_count, platform, brand_voice)
+            
+            async def generate_for_concept(concept: Dict[str, Any]) -> Dict[str, Any]:
+                async with self._generation_semaphore:
+                    # Generate individual meme
+                    return await self.generate_trending_meme(
+                        concept["topic"], 
+                        brand_voice, 
+                        platform,
+                        concept.get("target_audience", "general"),
+                        score_brand_alignment=False
+                    )
+            
+            concepts = series_plan["concepts"]
+            results = await asyncio.gather(
+                *(generate_for_concept(concept) for concept in concepts),
+                return_exceptions=True
             )
             
             meme_series = []
-            
-            for i, concept in enumerate(series_concept["concepts"]):
-                # Generate individual meme
-                meme_result = await self.generate_trending_meme(
-                    concept["topic"], 
-                    brand_voice, 
-                    platform,
-                    concept.get("target_audience", "general")
-                )
-                
-                if "error" not in meme_result:
+            for i, (concept, meme_result) in enumerate(zip(concepts, results)):
+                if not isinstance(meme_result, BaseException) and "error" not in meme_result:
                     meme_result["series_position"] = i + 1
                     meme_result["series_theme"] = theme
                     meme_result["concept"] = concept
                     meme_series.append(meme_result)
+            await self._score_brand_alignment(meme_series, brand_voice)
             
             return {
                 "meme_series": meme_series,
                 "series_theme": theme,
-                "series_concept": series_concept,
-                "posting_schedule": await self._suggest_series_posting_schedule(
-                    meme_series, platform
-                ),
-                "engagement_strategy": await self._develop_series_engagement_strategy(
-                    meme_series, platform
-                )
+                "series_concept": {"concepts": concepts},
+                "posting_schedule": series_plan["schedule"],
+                "engagement_strategy": series_plan["engagement"]
             }
             
         except Exception as e:
             return {"error": f"Meme series creation failed: {str(e)}"}
     
+    async def generate_brand_relevant_memes_batch(self,
+                                                user_id: int,
+                                                brand_info: Dict[str, Any],
+                                                current_trends: List[str],
+                                                platform: Platform = Platform.INSTAGRAM,
+                                                count: int = 5,
+                                                urgent: bool = False) -> Dict[str, Any]:
+        """
+        Queue brand-relevant meme copy on the OpenAI Batch API, which is cheaper
+        but may take up to 24h, and save a draft Content row per meme. Call
+        complete_brand_meme_batch to render them once the batch has finished.
+        Urgent requests go through generate_brand_relevant_memes instead.
+        """
+        if urgent or not self.openai_client:
+            return await self.generate_brand_relevant_memes(brand_info, current_trends, platform, count)
+        
+        try:
+            brand_voice = brand_info.get("voice", "casual")
+            audience = brand_info.get("target_audience", "general")
+            trends = current_trends[:count]
+            relevance = await asyncio.gather(
+                *(self._analyze_brand_trend_relevance(brand_info, trend, platform) for trend in trends)
+            )
+            
+            # Topic analysis arrives with the batch output, so rank formats on popularity and voice
+            selected_format = dict(await self._select_optimal_format(
+                self._get_trending_meme_formats(platform), {}, brand_voice
+            ))
+            format_type = selected_format.get("format_type", "reaction")
+            system_prompt = _BATCH_MEME_SYSTEM_PROMPT.format(
+                schema=_MEME_TEXT_SCHEMAS.get(format_type, _MEME_TEXT_SCHEMAS["default"])
+            )
+            
+            drafts = []
+            lines = []
+            for trend, analysis in zip(trends, relevance):
+                if analysis["relevance_score"] <= 0.6:
+                    continue
+                custom_id = f"meme-{len(drafts)}"
+                lines.append(orjson.dumps({
+                    "custom_id": custom_id,
+                    "method": "POST",
+                    "url": MEME_BATCH_ENDPOINT,
+                    "body": {
+                        "model": MEME_TEXT_MODEL,
+                        "messages": [
+                            {"role": "system", "content": system_prompt},
+                            {"role": "user", "content": self._meme_text_prompt(
+                                trend, selected_format, brand_voice, platform, audience
+                            )}
+                        ],
+                        "temperature": 0.8,
+                        "max_tokens": 300,
+                        "response_format": JSON_OBJECT_FORMAT
+                    }
+                }))
+                drafts.append({
+                    "created_by": user_id,
+                    "title": f"Meme: {trend}"[:200],
+                    "content_type": ContentType.IMAGE,
+                    "status": ContentStatus.DRAFT,
+                    "ai_generated": True,
+                    "ai_metadata": {
+                        "source": "meme_batch",
+                        "custom_id": custom_id,
+                        "trend": trend,
+                        "format": selected_format,
+                        "brand_voice": brand_voice,
+                        "platform": platform.value,
+                        "relevance": analysis,
+                        "status": "pending"
+                    }
+                })
+            
+            if not drafts:
+                return {
+                    "batch_id": None,
+                    "status": "completed",
+                    "pending_memes": [],
+                    "trends_analyzed": len(current_trends)
+                }
+            
+            batch_file = await self.openai_client.files.create(
+                file=("brand_memes.jsonl", b"\n".join(lines)),
+                purpose="batch"
+            )
+            batch = await self.openai_client.batches.create(
+                input_file_id=batch_file.id,
+                endpoint=MEME_BATCH_ENDPOINT,
+                completion_window=MEME_BATCH_COMPLETION_WINDOW
+            )
+            
+            for draft in drafts:
+                draft["ai_metadata"]["meme_batch_id"] = batch.id
+            result = await self.db.execute(
+                insert(Content).returning(Content.id, Content.title), drafts
+            )
+            pending_memes = [{"content_id": row.id, "title": row.title} for row in result]
+            await self.db.commit()
+            
+            return {
+                "batch_id": batch.id,
+                "status": batch.status,
+                "pending_memes": pending_memes,
+                "trends_analyzed": len(current_trends)
+            }
+            
+        except Exception as e:
+            await self.db.rollback()
+            return {"error": f"Brand meme batch submission failed: {str(e)}"}
+    
+    async def complete_brand_meme_batch(self, user_id: int, batch_id: str) -> Dict[str, Any]:
+        """Poll a brand meme batch and render its memes once OpenAI has finished it"""
+        try:
+            drafts = (await self.db.execute(
+                select(Content)
+                .where(
+                    Content.created_by == user_id,
+                    Content.ai_metadata["meme_batch_id"].as_string() == batch_id
+                )
+                .order_by(Content.id)
+            )).scalars().all()
+            if not drafts:
+                return {"error": f"Meme batch {batch_id} not found"}
+            
+            pending = [
+                draft for draft in drafts
+                if draft.ai_metadata.get("status") in MEME_BATCH_UNRENDERED_STATUSES
+            ]
+            if pending:
+                if not self.openai_client:
+                    return {"error": "OpenAI client is not configured"}
+                
+                batch = await self.openai_client.batches.retrieve(batch_id)
+                if batch.status in MEME_BATCH_FAILED_STATUSES:
+                    for draft in pending:
+                        self._mark_batch_meme(draft, batch.status)
+                    await self.db.commit()
+                    return {"batch_id": batch_id, "status": batch.status, "brand_memes": []}
+                
+                if batch.status != "completed":
+                    return {
+                        "batch_id": batch_id,
+                        "status": batch.status,
+                        "pending_memes": len(pending)
+                    }
+                
+                claimed = await self._claim_batch_memes(pending)
+                if claimed:
+                    replies = {}
+                    if batch.output_file_id:
+                        output = await self.openai_client.files.content(batch.output_file_id)
+                        replies = self._parse_batch_output(output.text)
+                    
+                    results = await asyncio.gather(
+                        *(self._render_batch_meme(draft, replies.get(draft.ai_metadata["custom_id"]))
+                          for draft in claimed),
+                        return_exceptions=True
+                    )
+                    for draft, result in zip(claimed, results):
+                        if isinstance(result, BaseException):
+                            self._mark_batch_meme(draft, "failed", error=str(result))
+                    await self.db.commit()
+                
+                if len(claimed) < len(pending):
+                    # A concurrent poll is rendering the rest
+                    return {
+                        "batch_id": batch_id,
+                        "status": "rendering",
+                        "pending_memes": len(pending) - len(claimed)
+                    }
+            
+            memes = [
+                draft.ai_metadata["meme"] for draft in drafts
+                if draft.ai_metadata.get("status") == "completed"
+            ]
+            platform = Platform(drafts[0].ai_metadata["platform"])
+            ranked_memes = await self._rank_memes_by_impact(memes, {}, platform)
+            
+            return {
+                "batch_id": batch_id,
+                "status": "completed",
+                "brand_memes": ranked_memes,
+                "memes_created": len(ranked_memes),
+                "top_recommendation": ranked_memes[0] if ranked_memes else None
+            }
+            
+        except Exception as e:
+            await self.db.rollback()
+            return {"error": f"Brand meme batch completion failed: {str(e)}"}
+    
+    async def _claim_batch_memes(self, drafts: List[Content]) -> List[Content]:
+        """Mark drafts as rendering unless another poll already has, so each meme renders once"""
+        now = time.time()
+        status = Content.ai_metadata["status"].as_string()
+        claimable = or_(
+            status == "pending",
+            and_(
+                status == "rendering",
+                Content.ai_metadata["claimed_at"].as_float() < now - MEME_BATCH_CLAIM_TIMEOUT
+            )
+        )
+        claimed = []
+        for draft in drafts:
+            metadata = {**draft.ai_metadata, "status": "rendering", "claimed_at": now}
+            # The WHERE is rechecked under the row lock, so only one poll's UPDATE matches
+            result = await self.db.execute(
+                update(Content)
+                .where(Content.id == draft.id, claimable)
+                .values(ai_metadata=metadata)
+                .returning(Content.id)
+                .execution_options(synchronize_session=False)
+            )
+            if result.first() is not None:
+                set_committed_value(draft, "ai_metadata", metadata)
+                claimed.append(draft)
+        # Commit before rendering so concurrent polls see the claims
+        await self.db.commit()
+        return claimed
+    
+    async def _render_batch_meme(self, draft: Content, reply: Optional[str]) -> None:
+        """Render one batch meme from its JSON reply and record it on the draft"""
+        if reply is None:
+            self._mark_batch_meme(draft, "failed", error="No response in batch output")
+            return
+        
+        metadata = draft.ai_metadata
+        format_info = metadata["format"]
+        platform = Platform(metadata["platform"])
+        try:
+            parsed = orjson.loads(reply)
+        except orjson.JSONDecodeError:
+            parsed = {}
+        if not isinstance(parsed, dict):
+            parsed = {}
+        
+        text_fields = parsed.get("text")
+        meme_text = self._meme_text_from_fields(
+            text_fields if isinstance(text_fields, dict) else {}, format_info
+        )
+        topic_analysis = {
+            "trending_score": parsed.get("trending_score", 0.7),
+            "humor_potential": parsed.get("humor_potential", 0.8),
+            "relatability": parsed.get("relatability", 0.75)
+        }
+        try:
+            brand_alignment = self._alignment_from_rating(parsed["brand_alignment"])
+        except (KeyError, TypeError, ValueError):
+            brand_alignment = 0.75
+        
+        async with self._generation_semaphore:
+            enhanced_meme = await self._render_meme(
+                format_info, meme_text, platform, True, topic_analysis
+            )
+        
+        draft.file_path = enhanced_meme["path"]
+        self._mark_batch_meme(draft, "completed", meme={
+            "content_id": draft.id,
+            "trend": metadata["trend"],
+            "meme_path": enhanced_meme["path"],
+            "format_used": format_info["name"],
+            "text_content": meme_text,
+            "viral_score": enhanced_meme["viral_score"],
+            "trending_relevance": topic_analysis["trending_score"],
+            "brand_alignment": brand_alignment,
+            "platform_optimizations": enhanced_meme["optimizations"]
+        })
+    
+    @staticmethod
+    def _mark_batch_meme(draft: Content, status: str, **details: Any) -> None:
+        # Reassign rather than mutate, since plain JSON columns don't track in-place changes
+        draft.ai_metadata = {**draft.ai_metadata, "status": status, **details}
+        if status != "completed":
+            draft.status = ContentStatus.FAILED
+    
+    @staticmethod
+    def _parse_batch_output(output: str) -> Dict[str, str]:
+        """Map each successful Batch API output line's custom_id to its message content"""
+        replies = {}
+        for line_number, line in enumerate(output.splitlines(), 1):
+            if not line.strip():
+                continue
+            # A bad line only loses its own meme, which then renders as failed
+            try:
+                record = orjson.loads(line)
+                response = record.get("response") or {}
+                if response.get("status_code") == 200:
+                    replies[record["custom_id"]] = response["body"]["choices"][0]["message"]["content"]
+            except (orjson.JSONDecodeError, AttributeError, KeyError, IndexError, TypeError) as e:
+                logger.warning("Skipping malformed meme batch output line %d: %r", line_number, e)
+        return replies
+    
     async def generate_reactive_meme(self, 
                                    current_event: str, 
                                    brand_perspective: str,
@@ -177,17 +766,16 @@ class EnhancedMemeGeneratorService:
                                    urgency: str = "high") -> Dict[str, Any]:
         """Generate reactive meme for current events or trending topics"""
         try:
-            # Analyze event for meme potential and brand safety
-            event_analysis = await self._analyze_event_for_memes(
-                current_event, brand_perspective, platform
+            # Analyze event for meme potential and brand safety, and get
+            # real-time trending formats
+            event_analysis, trending_formats = await asyncio.gather(
+                self._analyze_event_for_memes(current_event, brand_perspective, platform),
+                self._get_realtime_trending_formats(platform)
             )
             
             if event_analysis["brand_safety_score"] < 0.7:
                 return {"error": "Event not suitable for brand meme creation due to safety concerns"}
             
-            # Get real-time trending formats
-            trending_formats = await self._get_realtime_trending_formats(platform)
-            
             # Generate reactive meme content
             reactive_content = await self._generate_reactive_meme_content(
                 current_event, brand_perspective, event_analysis, urgency
@@ -229,14 +817,11 @@ class EnhancedMemeGeneratorService:
                 meme_concept, trend_analysis, platform
             )
             
-            # Predict engagement potential
-            engagement_prediction = await self._predict_meme_engagement(
-                meme_concept, concept_score, platform
-            )
-            
-            # Generate improvement suggestions
-            improvements = await self._suggest_concept_improvements(
-                meme_concept, concept_score, platform
+            # Predict engagement potential and generate improvement suggestions,
+            # which both build only on the concept score
+            engagement_prediction, improvements = await asyncio.gather(
+                self._predict_meme_engagement(meme_concept, concept_score, platform),
+                self._suggest_concept_improvements(meme_concept, concept_score, platform)
             )
             
             return {
@@ -254,62 +839,10 @@ class EnhancedMemeGeneratorService:
             return {"error": f"Meme performance analysis failed: {str(e)}"}
     
     # Trending analysis methods
-    async def _get_trending_meme_formats(self, platform: Platform) -> List[Dict[str, Any]]:
+    def _get_trending_meme_formats(self, platform: Platform) -> Sequence[Mapping[str, Any]]:
         """Get currently trending meme formats for platform"""
         # In production, this would connect to trending APIs or analyze recent content
-        
-        trending_formats = {
-            Platform.TIKTOK: [
-                {
-                    "name": "drake_pointing",
-                    "popularity": 0.9,
-                    "format_type": "choice_comparison",
-                    "template": "drake_template.jpg",
-                    "description": "Drake pointing meme for comparing two options"
-                },
-                {
-                    "name": "distracted_boyfriend",
-                    "popularity": 0.8,
-                    "format_type": "distraction",
-                    "template": "distracted_boyfriend.jpg",
-                    "description": "Distracted boyfriend meme for showing preference"
-                },
-                {
-                    "name": "woman_yelling_cat",
-                    "popularity": 0.85,
-                    "format_type": "reaction",
-                    "template": "woman_cat.jpg",
-                    "description": "Woman yelling at cat reaction meme"
-                }
-            ],
-            Platform.INSTAGRAM: [
-                {
-                    "name": "this_is_fine",
-                    "popularity": 0.87,
-                    "format_type": "situation_commentary",
-                    "template": "this_is_fine.jpg",
-                    "description": "This is fine dog meme for ironic situations"
-                },
-                {
-                    "name": "expanding_brain",
-                    "popularity": 0.82,
-                    "format_type": "progression",
-                    "template": "expanding_brain.jpg",
-                    "description": "Expanding brain meme for showing progression"
-                }
-            ],
-            Platform.TWITTER: [
-                {
-                    "name": "hot_takes",
-                    "popularity": 0.9,
-                    "format_type": "opinion",
-                    "template": "hot_takes.jpg",
-                    "description": "Hot takes format for controversial opinions"
-                }
-            ]
-        }
-        
-        return trending_formats.get(platform, trending_formats[Platform.INSTAGRAM])
+        return _TRENDING_FORMATS.get(platform, _TRENDING_FORMATS[Platform.INSTAGRAM])
     
     async def _analyze_topic_for_memes(self, topic: str, platform: Platform, audience: str) -> Dict[str, Any]:
         """Analyze topic for meme creation potential"""
@@ -322,33 +855,23 @@ class EnhancedMemeGeneratorService:
             }
         
         try:
-            prompt = f"""
-            Analyze this topic for meme creation potential: "{topic}"
-            
-            Platform: {platform.value}
-            Target audience: {audience}
-            
-            Provide analysis on:
-            1. Current trending relevance (0-1 score)
-            2. Humor potential (0-1 score) 
-            3. Relatability factor (0-1 score)
-            4. Potential meme angles and approaches
-            5. Recommended meme formats
-            6. Timing considerations
-            
-            Return as JSON format.
-            """
+            prompt = f'Topic: "{topic}"\nPlatform: {platform.value}\nAudience: {audience}'
             
             response = await self.openai_client.chat.completions.create(
-                model="gpt-4",
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.7
+                model=MEME_TEXT_MODEL,
+                messages=[
+                    {"role": "system", "content": _TOPIC_ANALYSIS_SYSTEM_PROMPT},
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=0.7,
+                max_tokens=300,
+                response_format=JSON_OBJECT_FORMAT
             )
             
             try:
-                analysis = json.loads(response.choices[0].message.content)
+                analysis = orjson.loads(response.choices[0].message.content)
                 return analysis
-            except:
+            except (orjson.JSONDecodeError, TypeError):
                 return {
                     "trending_score": 0.7,
                     "humor_potential": 0.8,
@@ -375,91 +898,45 @@ class EnhancedMemeGeneratorService:
                 "template": None
             }
         
-        # Score each format based on compatibility
-        format_scores = []
+        # Score each format on popularity, topic fit and brand voice compatibility
+        # in a single pass; max keeps the first format on ties
+        recommended = topic_analysis.get("recommended_formats", [])
+        voice_compatibility = _FORMAT_VOICE_COMPATIBILITY.get(brand_voice, _EMPTY_MAPPING)
         
-        for format_info in trending_formats:
+        def format_score(format_info: Mapping[str, Any]) -> float:
             score = format_info["popularity"]
-            
-            # Adjust score based on topic analysis
-            if format_info["format_type"] in topic_analysis.get("recommended_formats", []):
+            if format_info["format_type"] in recommended:
                 score += 0.2
-            
-            # Adjust for brand voice compatibility
-            voice_compatibility = self._calculate_format_voice_compatibility(format_info, brand_voice)
-            score *= voice_compatibility
-            
-            format_scores.append((score, format_info))
-        
-        # Return highest scoring format
-        format_scores.sort(key=lambda x: x[0], reverse=True)
-        return format_scores[0][1]
-    
-    def _calculate_format_voice_compatibility(self, format_info: Dict, brand_voice: str) -> float:
-        """Calculate how well a meme format aligns with brand voice"""
-        voice_format_compatibility = {
-            "professional": {
-                "choice_comparison": 0.8,
-                "progression": 0.9,
-                "situation_commentary": 0.7,
-                "reaction": 0.6
-            },
-            "casual": {
-                "reaction": 0.9,
-                "distraction": 0.8,
-                "situation_commentary": 0.8,
-                "choice_comparison": 0.7
-            },
-            "humorous": {
-                "reaction": 0.95,
-                "situation_commentary": 0.9,
-                "distraction": 0.85,
-                "choice_comparison": 0.8
-            },
-            "educational": {
-                "progression": 0.9,
-                "choice_comparison": 0.8,
-                "situation_commentary": 0.7,
-                "reaction": 0.6
-            }
-        }
+            return score * voice_compatibility.get(format_info.get("format_type", "reaction"), 0.7)
         
-        format_type = format_info.get("format_type", "reaction")
-        return voice_format_compatibility.get(brand_voice, {}).get(format_type, 0.7)
+        return max(trending_formats, key=format_score)
     
     # Meme text generation
     async def _generate_meme_text(self, topic: str, format_info: Dict, brand_voice: str, platform: Platform, audience: str) -> Dict[str, Any]:
         """Generate meme text content using AI"""
         if not self.openai_client:
             return {
-                "top_text": f"When you think about {topic}",
-                "bottom_text": "It's actually pretty interesting",
+                "top_text": f"WHEN YOU THINK ABOUT {topic.upper()}",
+                "bottom_text": "IT'S ACTUALLY PRETTY INTERESTING",
                 "format_specific": {}
             }
         
         try:
-            prompt = f"""
-            Create meme text for the "{format_info['name']}" format about: {topic}
-            
-            Format type: {format_info['format_type']}
-            Brand voice: {brand_voice}
-            Platform: {platform.value}
-            Target audience: {audience}
-            
-            Requirements:
-            - Match the meme format structure
-            - Use appropriate {brand_voice} tone
-            - Make it relatable to {audience}
-            - Keep text concise and punchy
-            - Ensure it's {platform.value}-appropriate
-            
-            Return structured text for the meme format.
-            """
+            format_type = format_info.get("format_type", "reaction")
+            system_prompt = _MEME_TEXT_SYSTEM_PROMPT.format(
+                schema=_MEME_TEXT_SCHEMAS.get(format_type, _MEME_TEXT_SCHEMAS["default"])
+            )
+            prompt = self._meme_text_prompt(topic, format_info, brand_voice, platform, audience)
             
             response = await self.openai_client.chat.completions.create(
-                model="gpt-4",
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.8
+                model=MEME_TEXT_MODEL,
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=0.8,
+                max_tokens=150,
+                response_format=JSON_OBJECT_FORMAT
             )
             
             # Parse meme text based on format
@@ -471,46 +948,75 @@ class EnhancedMemeGeneratorService:
             
         except Exception as e:
             return {
-                "top_text": f"When {topic}",
-                "bottom_text": "Happens",
+                "top_text": f"WHEN {topic.upper()}",
+                "bottom_text": "HAPPENS",
                 "error": str(e)
             }
     
+    @staticmethod
+    def _meme_text_prompt(topic: str, format_info: Mapping[str, Any], brand_voice: str, platform: Platform, audience: str) -> str:
+        """User prompt carrying the variables for a meme text request"""
+        return (
+            f'Format: {format_info["name"]} ({format_info.get("format_type", "reaction")})\n'
+            f'Topic: {topic}\nVoice: {brand_voice}\nPlatform: {platform.value}\nAudience: {audience}'
+        )
+    
     def _parse_meme_text_for_format(self, ai_response: str, format_info: Dict) -> Dict[str, Any]:
-        """Parse AI response into format-specific meme text structure"""
+        """Parse AI JSON response into format-specific meme text structure"""
+        try:
+            parsed = orjson.loads(ai_response)
+        except (orjson.JSONDecodeError, TypeError):
+            parsed = {}
+        if not isinstance(parsed, dict):
+            parsed = {}
+        meme_text = self._meme_text_from_fields(parsed, format_info)
+        if format_info.get("format_type", "reaction") not in ("choice_comparison", "progression"):
+            meme_text["top_text"] = meme_text["top_text"] or (ai_response or "")[:50].upper()
+        return meme_text
+    
+    def _meme_text_from_fields(self, parsed: Dict[str, Any], format_info: Dict) -> Dict[str, Any]:
+        """Build the format-specific meme text structure from parsed JSON fields"""
         format_type = format_info.get("format_type", "reaction")
         
         if format_type == "choice_comparison":
             # Drake format: two options
-            lines = ai_response.split('\n')
+            rejection = parsed.get("rejection_text") or "Not this"
+            approval = parsed.get("approval_text") or "This instead"
             return {
-                "top_text": lines[0] if lines else "Option 1",
-                "bottom_text": lines[1] if len(lines) > 1 else "Option 2",
+                "top_text": rejection,
+                "bottom_text": approval,
                 "format_specific": {
-                    "rejection_text": lines[0] if lines else "Not this",
-                    "approval_text": lines[1] if len(lines) > 1 else "This instead"
+                    "rejection_text": rejection,
+                    "approval_text": approval
                 }
             }
         elif format_type == "progression":
             # Expanding brain format: multiple levels
-            lines = ai_response.split('\n')
+            levels = parsed.get("levels")
+            if not isinstance(levels, list):
+                levels = []
+            defaults = ("Basic level", "Intermediate level", "Advanced level", "Galaxy brain level")
             return {
                 "format_specific": {
-                    "level_1": lines[0] if lines else "Basic level",
-                    "level_2": lines[1] if len(lines) > 1 else "Intermediate level",
-                    "level_3": lines[2] if len(lines) > 2 else "Advanced level",
-                    "level_4": lines[3] if len(lines) > 3 else "Galaxy brain level"
+                    level: levels[i] if i < len(levels) and levels[i] else default
+                    for i, (level, default) in enumerate(zip(_PROGRESSION_LEVELS, defaults))
                 }
             }
         else:
-            # Standard top/bottom text format
-            lines = ai_response.split('\n')
+            # Standard top/bottom text format, uppercased here once rather than on every render
             return {
-                "top_text": lines[0] if lines else ai_response[:50],
-                "bottom_text": lines[1] if len(lines) > 1 else ""
+                "top_text": (parsed.get("top_text") or "").upper(),
+                "bottom_text": (parsed.get("bottom_text") or "").upper()
             }
     
     # Meme image creation
+    async def _render_meme(self, format_info: Dict, meme_text: Dict, platform: Platform, include_brand: bool, topic_analysis: Dict) -> Dict[str, Any]:
+        """Create the meme image and add viral enhancement effects"""
+        meme_image = await self._create_meme_image(format_info, meme_text, platform, include_brand)
+        return await self._enhance_for_virality(
+            meme_image["path"], platform, topic_analysis, meme_image.get("image")
+        )
+    
     async def _create_meme_image(self, format_info: Dict, meme_text: Dict, platform: Platform, include_brand: bool) -> Dict[str, Any]:
         """Create the meme image with text overlay"""
         try:
@@ -529,77 +1035,64 @@ class EnhancedMemeGeneratorService:
                 branded_meme = meme_with_text
             
             # Save final meme
-            filename = f"meme_{format_info['name']}_{int(asyncio.get_event_loop().time())}.jpg"
+            # Unique per call, since memes of the same format can now render concurrently
+            image_format = _MEME_IMAGE_FORMATS.get(platform, "JPEG")
+            filename = (
+                f"meme_{format_info['name']}_{time.time_ns()}_{secrets.token_hex(4)}"
+                f"{_MEME_IMAGE_SUFFIXES[image_format]}"
+            )
             meme_path = self.temp_dir / filename
-            branded_meme.save(meme_path, "JPEG", quality=95)
+            await asyncio.to_thread(
+                branded_meme.save, meme_path, image_format, **_MEME_SAVE_OPTIONS[image_format]
+            )
             
             return {
                 "path": str(meme_path),
                 "format": format_info["name"],
-                "dimensions": branded_meme.size
+                "dimensions": branded_meme.size,
+                "image": branded_meme  # Lets enhancement skip decoding the file just written
             }
             
         except Exception as e:
             return {"error": f"Meme image creation failed: {str(e)}"}
     
     async def _get_meme_template(self, format_info: Dict, platform: Platform) -> Image.Image:
-        """Get or generate meme template image"""
+        """Get or generate meme template image (cached and shared; copy before drawing)"""
         template_name = format_info.get("template")
         
         if template_name and template_name != "custom_text":
+            template = _template_images.get(template_name)
+            if template is not None:
+                return template
             # Try to load existing template
-            template_path = Path(__file__).parent.parent / "assets" / "meme_templates" / template_name
+            template_path = MEME_TEMPLATE_DIR / template_name
             if template_path.exists():
-                return Image.open(template_path)
+                template = await asyncio.to_thread(self._open_image, template_path)
+                _template_images[template_name] = template
+                return template
         
         # Generate basic template based on format
         specs = self._get_platform_image_specs(platform)
         width, height = specs["dimensions"]
-        
-        if format_info["format_type"] == "choice_comparison":
-            # Create two-panel template (Drake style)
-            template = Image.new('RGB', (width, height), color='white')
-            draw = ImageDraw.Draw(template)
-            
-            # Draw dividing line
-            draw.line([(0, height//2), (width, height//2)], fill='black', width=2)
-            
-            # Add placeholder areas
-            draw.rectangle([10, 10, width//2-10, height//2-10], outline='gray', width=2)
-            draw.rectangle([10, height//2+10, width//2-10, height-10], outline='gray', width=2)
-            
-        elif format_info["format_type"] == "progression":
-            # Create four-panel template (Brain expanding style)
-            template = Image.new('RGB', (width, height), color='white')
-            draw = ImageDraw.Draw(template)
-            
-            # Draw grid
-            draw.line([(width//2, 0), (width//2, height)], fill='black', width=2)
-            draw.line([(0, height//2), (width, height//2)], fill='black', width=2)
-            
-        else:
-            # Standard template with top and bottom text areas
-            template = Image.new('RGB', (width, height), color='white')
-            draw = ImageDraw.Draw(template)
-            
-            # Add gradient or pattern
-            for y in range(height):
-                color_intensity = int(255 * (y / height))
-                draw.line([(0, y), (width, y)], fill=(color_intensity, color_intensity, 255))
-        
-        return template
+        return _generated_meme_template(format_info["format_type"], width, height)
+    
+    @staticmethod
+    def _open_image(path: Union[str, Path]) -> Image.Image:
+        """Open and fully decode an image (blocking; run it in a thread)"""
+        img = Image.open(path)
+        img.load()
+        return img
     
     async def _add_text_to_template(self, template: Image.Image, meme_text: Dict, format_info: Dict, platform: Platform) -> Image.Image:
         """Add text overlays to meme template"""
+        # Copying and rasterising text is CPU-bound PIL work, kept off the event loop
+        return await asyncio.to_thread(self._render_text, template, meme_text, format_info, platform)
+    
+    def _render_text(self, template: Image.Image, meme_text: Dict, format_info: Dict, platform: Platform) -> Image.Image:
         img = template.copy()
         draw = ImageDraw.Draw(img)
         
-        # Try to load font
-        try:
-            font_size = self._calculate_font_size(img.size, platform)
-            font = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", font_size)
-        except:
-            font = ImageFont.load_default()
+        font = _load_meme_font(self._calculate_font_size(img.size, platform))
         
         format_type = format_info.get("format_type", "reaction")
         
@@ -619,15 +1112,14 @@ class EnhancedMemeGeneratorService:
         """Add standard top and bottom text to meme"""
         width, height = img.size
         
+        # Text is already uppercased when the meme text is generated
         # Add top text
         if meme_text.get("top_text"):
-            top_text = meme_text["top_text"].upper()
-            self._draw_outlined_text(draw, top_text, (width//2, height//8), font, anchor="mm")
+            self._draw_outlined_text(draw, meme_text["top_text"], (width//2, height//8), font, anchor="mm")
         
         # Add bottom text
         if meme_text.get("bottom_text"):
-            bottom_text = meme_text["bottom_text"].upper()
-            self._draw_outlined_text(draw, bottom_text, (width//2, height*7//8), font, anchor="mm")
+            self._draw_outlined_text(draw, meme_text["bottom_text"], (width//2, height*7//8), font, anchor="mm")
     
     def _add_choice_comparison_text(self, img: Image.Image, draw: ImageDraw.Draw, text_data: Dict, font):
         """Add text for choice comparison format (Drake style)"""
@@ -651,120 +1143,146 @@ class EnhancedMemeGeneratorService:
         """Add text for progression format (Expanding brain style)"""
         width, height = img.size
         
-        positions = [
+        positions = (
             (width*3//4, height//4),      # Top right
             (width*3//4, height*3//4),    # Bottom right
             (width//4, height//4),        # Top left
             (width//4, height*3//4)       # Bottom left
-        ]
-        
-        levels = ["level_1", "level_2", "level_3", "level_4"]
+        )
         
-        for i, level in enumerate(levels):
-            if text_data.get(level) and i < len(positions):
-                self._draw_outlined_text(
-                    draw, text_data[level], 
-                    positions[i], font, anchor="mm"
-                )
+        for level, position in zip(_PROGRESSION_LEVELS, positions):
+            text = text_data.get(level)
+            if text:
+                self._draw_outlined_text(draw, text, position, font, anchor="mm")
     
     def _draw_outlined_text(self, draw: ImageDraw.Draw, text: str, position: tuple, font, anchor="mm"):
         """Draw text with black outline for better readability"""
-        x, y = position
-        
-        # Draw outline
-        for adj_x in range(-2, 3):
-            for adj_y in range(-2, 3):
-                draw.text((x + adj_x, y + adj_y), text, font=font, fill='black', anchor=anchor)
-        
-        # Draw main text
-        draw.text((x, y), text, font=font, fill='white', anchor=anchor)
+        # Pillow strokes the glyph outlines in the same pass as the fill
+        draw.text(position, text, font=font, fill='white', anchor=anchor, stroke_width=2, stroke_fill='black')
     
-    def _calculate_font_size(self, image_size: tuple, platform: Platform) -> int:
+    @staticmethod
+    def _calculate_font_size(image_size: tuple, platform: Platform) -> int:
         """Calculate appropriate font size based on image dimensions"""
-        width, height = image_size
-        base_size = min(width, height) // 20
-        
-        # Platform-specific adjustments
-        if platform == Platform.TIKTOK:
-            return max(40, base_size)
-        elif platform == Platform.INSTAGRAM:
-            return max(36, base_size)
-        else:
-            return max(32, base_size)
+        return max(_MIN_FONT_SIZES.get(platform, 32), min(image_size) // 20)
     
-    def _get_platform_image_specs(self, platform: Platform) -> Dict[str, Any]:
+    def _get_platform_image_specs(self, platform: Platform) -> Mapping[str, Any]:
         """Get platform-specific image specifications for memes"""
-        specs = {
-            Platform.TIKTOK: {"dimensions": (1080, 1080)},  # Square for TikTok
-            Platform.INSTAGRAM: {"dimensions": (1080, 1080)},  # Square for posts
-            Platform.TWITTER: {"dimensions": (1200, 675)},  # 16:9 for Twitter
-            Platform.LINKEDIN: {"dimensions": (1200, 627)},  # Professional format
-            Platform.YOUTUBE: {"dimensions": (1280, 720)}  # 16:9 for thumbnails
-        }
-        
-        return specs.get(platform, specs[Platform.INSTAGRAM])
+        return _MEME_IMAGE_SPECS.get(platform, _MEME_IMAGE_SPECS[Platform.INSTAGRAM])
     
     # Brand alignment methods
     async def _calculate_brand_alignment(self, meme_text: Dict, brand_voice: str) -> float:
         """Calculate how well the meme aligns with brand voice"""
-        if not self.openai_client:
+        if not self.openai_client or _alignment_breaker_open():
             return 0.75  # Default alignment score
         
         try:
-            # Combine all text content
-            all_text = " ".join([
-                meme_text.get("top_text", ""),
-                meme_text.get("bottom_text", ""),
-                str(meme_text.get("format_specific", {}))
-            ])
-            
-            prompt = f"""
-            Analyze this meme text for brand voice alignment:
-            
-            Text: "{all_text}"
-            Target brand voice: {brand_voice}
-            
-            Rate alignment from 0.0 to 1.0 where:
-            - 1.0 = Perfect alignment with brand voice
-            - 0.0 = Completely misaligned
-            
-            Consider tone, messaging, appropriateness, and brand consistency.
-            Return only a number between 0.0 and 1.0.
-            """
-            
-            response = await self.openai_client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.3
+            prompt = f'Text: "{self._alignment_text(meme_text)}"\nVoice: {brand_voice}'
+            
+            # Memes often repeat the same text for the same voice, so exact
+            # repeats reuse the cached score. Semantic matching stays off: a
+            # one-word change of caption or voice can change the score.
+            content = await self.llm_cache.complete(
+                self.openai_client,
+                ttl=BRAND_ALIGNMENT_CACHE_TTL,
+                semantic=False,
+                model=MEME_TEXT_MODEL,
+                messages=[
+                    {"role": "system", "content": _BRAND_ALIGNMENT_SYSTEM_PROMPT},
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=0,
+                max_tokens=1,
+                logit_bias=_RATING_LOGIT_BIAS
             )
             
             try:
-                score = float(response.choices[0].message.content.strip())
-                return max(0.0, min(1.0, score))
-            except:
+                return self._alignment_from_rating(content)
+            except (TypeError, ValueError):
+                logger.warning("Unparseable brand alignment rating %r", content)
                 return 0.75
                 
+        except _OPENAI_OUTAGE_ERRORS as e:
+            _trip_alignment_breaker(e)
+            return 0.75
         except Exception:
+            logger.exception("Brand alignment scoring failed")
             return 0.75
     
+    async def _calculate_brand_alignment_batch(self, meme_texts: List[Dict], brand_voice: str) -> List[float]:
+        """Score several memes against one brand voice in a single request"""
+        if len(meme_texts) == 1:
+            return [await self._calculate_brand_alignment(meme_texts[0], brand_voice)]
+        if not self.openai_client or not meme_texts or _alignment_breaker_open():
+            return [0.75] * len(meme_texts)  # Default alignment score
+        
+        try:
+            numbered = "\n".join(
+                f'{i}. "{self._alignment_text(meme_text)}"' for i, meme_text in enumerate(meme_texts, 1)
+            )
+            content = await self.llm_cache.complete(
+                self.openai_client,
+                ttl=BRAND_ALIGNMENT_CACHE_TTL,
+                semantic=False,
+                model=MEME_TEXT_MODEL,
+                messages=[
+                    {"role": "system", "content": _BRAND_ALIGNMENT_BATCH_SYSTEM_PROMPT},
+                    {"role": "user", "content": f"Voice: {brand_voice}\nTexts:\n{numbered}"}
+                ],
+                temperature=0,
+                max_tokens=20 + 3 * len(meme_texts),
+                response_format=JSON_OBJECT_FORMAT
+            )
+            
+            scores = orjson.loads(content)["scores"]
+            if len(scores) != len(meme_texts):
+                logger.warning("Expected %d brand alignment ratings, got %d", len(meme_texts), len(scores))
+                return [0.75] * len(meme_texts)
+            return [self._alignment_from_rating(score) for score in scores]
+            
+        except _OPENAI_OUTAGE_ERRORS as e:
+            _trip_alignment_breaker(e)
+            return [0.75] * len(meme_texts)
+        except Exception:
+            logger.exception("Batch brand alignment scoring failed")
+            return [0.75] * len(meme_texts)
+    
+    async def _score_brand_alignment(self, memes: List[Dict[str, Any]], brand_voice: str) -> None:
+        """Fill in brand_alignment for generated memes that were left unscored"""
+        unscored = [
+            meme for meme in memes
+            if meme.get("brand_alignment") is None and meme.get("text_content") is not None
+        ]
+        if not unscored:
+            return
+        scores = await self._calculate_brand_alignment_batch(
+            [meme["text_content"] for meme in unscored], brand_voice
+        )
+        for meme, score in zip(unscored, scores):
+            meme["brand_alignment"] = score
+    
+    @staticmethod
+    def _alignment_from_rating(rating: Any) -> float:
+        """Map a 1-5 alignment rating onto 0.0-1.0"""
+        return (min(5, max(1, round(float(rating)))) - 1) / 4.0
+    
+    @staticmethod
+    def _alignment_text(meme_text: Dict) -> str:
+        """Combine all text content of a meme for alignment scoring"""
+        # Join the text values alone rather than str() of the dict, whose
+        # quotes, braces and key names roughly double the prompt tokens
+        parts = [meme_text.get("top_text"), meme_text.get("bottom_text")]
+        for value in (meme_text.get("format_specific") or _EMPTY_MAPPING).values():
+            if isinstance(value, (str, int, float)) and value not in parts:
+                parts.append(str(value))
+        return " ".join(filter(None, parts))[:ALIGNMENT_TEXT_MAX_CHARS]
+    
     # Enhancement and optimization
-    async def _enhance_for_virality(self, meme_path: str, platform: Platform, topic_analysis: Dict) -> Dict[str, Any]:
+    async def _enhance_for_virality(self, meme_path: str, platform: Platform, topic_analysis: Dict,
+                                    image: Optional[Image.Image] = None) -> Dict[str, Any]:
         """Enhance meme for viral potential"""
         try:
             # Apply platform-specific optimizations
-            img = Image.open(meme_path)
-            
-            # Enhance colors for platform
-            if platform == Platform.TIKTOK:
-                enhancer = ImageEnhance.Color(img)
-                img = enhancer.enhance(1.2)
-            elif platform == Platform.INSTAGRAM:
-                enhancer = ImageEnhance.Contrast(img)
-                img = enhancer.enhance(1.1)
-            
-            # Save enhanced version
-            enhanced_path = meme_path.replace(".jpg", "_enhanced.jpg")
-            img.save(enhanced_path, "JPEG", quality=95)
+            enhanced_path = await asyncio.to_thread(self._apply_platform_enhancement, meme_path, platform, image)
             
             # Calculate viral score
             viral_score = self._calculate_viral_score(topic_analysis, platform)
@@ -782,28 +1300,36 @@ class EnhancedMemeGeneratorService:
                 "error": str(e)
             }
     
-    def _calculate_viral_score(self, topic_analysis: Dict, platform: Platform) -> float:
-        """Calculate potential viral score for meme"""
-        base_score = 0.5
-        
-        # Add trending relevance
-        base_score += topic_analysis.get("trending_score", 0) * 0.3
-        
-        # Add humor potential
-        base_score += topic_analysis.get("humor_potential", 0) * 0.2
-        
-        # Add relatability
-        base_score += topic_analysis.get("relatability", 0) * 0.2
+    def _apply_platform_enhancement(self, meme_path: str, platform: Platform,
+                                    image: Optional[Image.Image] = None) -> str:
+        enhancement = _PLATFORM_ENHANCEMENTS.get(platform)
+        if enhancement is None:
+            # Nothing to adjust, so the saved meme is already the final image
+            return meme_path
         
-        # Platform-specific bonus
-        platform_bonus = {
-            Platform.TIKTOK: 0.1,
-            Platform.TWITTER: 0.08,
-            Platform.INSTAGRAM: 0.06
-        }.get(platform, 0.05)
-        
-        base_score += platform_bonus
+        # Enhance colors for platform, from the in-memory meme when the caller has it
+        img = image if image is not None else Image.open(meme_path)
+        enhancer, factor = enhancement
+        img = enhancer(img).enhance(factor)
         
+        # Save enhanced version
+        path = Path(meme_path)
+        image_format = Image.registered_extensions()[path.suffix]
+        enhanced_path = str(path.with_name(f"{path.stem}_enhanced{path.suffix}"))
+        img.save(enhanced_path, image_format, **_MEME_SAVE_OPTIONS[image_format])
+        return enhanced_path
+    
+    def _calculate_viral_score(self, topic_analysis: Dict, platform: Platform) -> float:
+        """Calculate potential viral score for meme"""
+        # Base score plus weighted trending relevance, humor and relatability,
+        # plus the platform-specific bonus
+        base_score = (
+            0.5
+            + topic_analysis.get("trending_score", 0) * 0.3
+            + topic_analysis.get("humor_potential", 0) * 0.2
+            + topic_analysis.get("relatability", 0) * 0.2
+            + _VIRAL_PLATFORM_BONUS.get(platform, 0.05)
+        )
         return min(1.0, base_score)
     
     # Alternative versions and brand methods (placeholder implementations)
@@ -832,7 +1358,8 @@ class EnhancedMemeGeneratorService:
             brand_info.get("voice", "casual"), 
             platform,
             brand_info.get("target_audience", "general"),
-            include_brand_elements=True
+            include_brand_elements=True,
+            score_brand_alignment=False
         )
     
     async def _rank_memes_by_impact(self, memes: List[Dict], brand_info: Dict, platform: Platform) -> List[Dict[str, Any]]:
@@ -847,27 +1374,61 @@ class EnhancedMemeGeneratorService:
         return meme_image
     
     # Additional helper methods would be implemented here for the remaining functionality
-    async def _develop_meme_series_concept(self, theme: str, count: int, platform: Platform, brand_voice: str) -> Dict[str, Any]:
-        """Develop concept for meme series"""
+    async def _plan_series(self, theme: str, count: int, platform: Platform, brand_voice: str) -> Dict[str, Any]:
+        """Plan series concepts, posting schedule and engagement strategy in one request"""
+        plan = self._default_series_plan(theme, count)
+        if not self.openai_client:
+            return plan
+        
+        try:
+            response = await self.openai_client.chat.completions.create(
+                model=MEME_TEXT_MODEL,
+                messages=[
+                    {"role": "system", "content": _SERIES_PLAN_SYSTEM_PROMPT},
+                    {"role": "user", "content": (
+                        f'Theme: "{theme}"\nConcepts: {count}\n'
+                        f"Platform: {platform.value}\nVoice: {brand_voice}"
+                    )}
+                ],
+                temperature=0.7,
+                max_tokens=150 + 40 * count,
+                response_format=JSON_OBJECT_FORMAT
+            )
+            parsed = orjson.loads(response.choices[0].message.content)
+        except Exception:
+            logger.exception("Meme series planning failed")
+            return plan
+        if not isinstance(parsed, dict):
+            logger.warning("Unexpected meme series plan %r", parsed)
+            return plan
+        
+        # Keep the defaults for anything missing or malformed in the reply
+        concepts = [
+            concept for concept in parsed.get("concepts") or []
+            if isinstance(concept, dict) and concept.get("topic")
+        ][:count]
+        plan["concepts"][:len(concepts)] = concepts
+        for key in ("schedule", "engagement"):
+            if isinstance(parsed.get(key), dict):
+                plan[key] = {**plan[key], **parsed[key]}
+        return plan
+    
+    @staticmethod
+    def _default_series_plan(theme: str, count: int) -> Dict[str, Any]:
+        """Series plan used without OpenAI, and to fill gaps in its reply"""
         return {
             "concepts": [
                 {"topic": f"{theme} - part {i+1}", "target_audience": "general"} 
                 for i in range(count)
-            ]
-        }
-    
-    async def _suggest_series_posting_schedule(self, meme_series: List[Dict], platform: Platform) -> Dict[str, Any]:
-        """Suggest optimal posting schedule for meme series"""
-        return {
-            "frequency": "daily",
-            "optimal_times": ["12:00", "18:00", "20:00"]
-        }
-    
-    async def _develop_series_engagement_strategy(self, meme_series: List[Dict], platform: Platform) -> Dict[str, Any]:
-        """Develop engagement strategy for meme series"""
-        return {
-            "hashtags": ["#memeseries", "#trending"],
-            "engagement_tactics": ["ask_questions", "encourage_shares"]
+            ],
+            "schedule": {
+                "frequency": "daily",
+                "optimal_times": ["12:00", "18:00", "20:00"]
+            },
+            "engagement": {
+                "hashtags": ["#memeseries", "#trending"],
+                "engagement_tactics": ["ask_questions", "encourage_shares"]
+            }
         }
     
     # Additional methods for reactive memes, event analysis, etc. would be implemented similarly
@@ -15,6 +15,9 @@ from app.core.config import settings
 from app.core.database import create_tables
 from app.core.rate_limiting import rate_limit_middleware
 from app.api.main import api_router
+from app.core.openai_client import close_openai_client
+from app.services.direct_message_service import get_dm_send_scheduler, shutdown_dm_send_scheduler
+from app.services.content_processing import shutdown_scene_detection_pool
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -28,9 +31,14 @@ async def lifespan(app: FastAPI):
     logger.info("Starting Social Media Management Bot...")
     await create_tables()
     logger.info("Database tables created successfully")
+    # Resume DM campaign sends left pending by the previous run
+    await get_dm_send_scheduler()
     yield
     # Shutdown
     logger.info("Shutting down Social Media Management Bot...")
+    await shutdown_dm_send_scheduler()
+    shutdown_scene_detection_pool()
+    await close_openai_client()
 
 
 def create_application() -> FastAPI:
@@ -53,6 +61,8 @@ def create_application() -> FastAPI:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        # Cursor-paginated list endpoints return the next page's cursor here
+        expose_headers=["X-Next-Cursor"],
     )
 
     # Security middleware
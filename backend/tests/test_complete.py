@@ -42,6 +42,16 @@ class TestVideoProcessingService:
         assert service is not None
         assert service.groq_client is not None
     
+    def test_parse_frame_rate(self):
+        """Test ffprobe frame rate parsing"""
+        from app.services.content_processing import VideoProcessingService
+        
+        assert VideoProcessingService._parse_frame_rate('30/1') == 30.0
+        assert abs(VideoProcessingService._parse_frame_rate('30000/1001') - 29.97) < 0.01
+        assert VideoProcessingService._parse_frame_rate('25') == 25.0
+        assert VideoProcessingService._parse_frame_rate('0/0') == 30.0
+        assert VideoProcessingService._parse_frame_rate('__import__("os")') == 30.0
+    
     def test_detect_scenes(self):
         """Test scene detection algorithm"""
         from app.services.content_processing import VideoProcessingService
@@ -86,6 +96,16 @@ class TestImageProcessingService:
         platforms = ['instagram', 'tiktok', 'youtube', 'facebook', 'twitter']
         for platform in platforms:
             assert platform in platforms
+    
+    def test_resize_crop_exact_target(self):
+        """Test fused center crop + resize hits the exact target shape"""
+        import numpy as np
+        from app.services.content_processing import ImageProcessingService
+        
+        img = np.zeros((1080, 1920, 3), dtype=np.uint8)
+        for target in [(1080, 1080), (1080, 1920), (1200, 628), (1200, 675)]:
+            out = ImageProcessingService._resize_crop(img, *target)
+            assert out.shape == (target[1], target[0], 3)
 
 
 class TestAIGenerationService:
@@ -0,0 +1,399 @@
+"""
+Tests for the direct message service
+"""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+import pytest_asyncio
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from redis import exceptions as redis_exceptions
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+import app.models  # noqa: F401  (registers every table on Base.metadata)
+from app.core.database import Base
+from app.models.automation import DirectMessage, DirectMessageLog, DirectMessageStatus, DirectMessageType
+from app.models.social_account import SocialAccount, SocialPlatform
+from app.services import direct_message_service
+from app.services.direct_message_service import (
+    DM_SCHEDULER_LOCK_KEY, DMSchedulerLeader, DMSendRateLimiter, DMStatsCache, DirectMessageService,
+    _decode_cursor, _encode_cursor
+)
+
+
+class FakeRedis:
+    """Just enough of redis.asyncio for the scheduler leader lock"""
+
+    def __init__(self):
+        self.values = {}
+
+    async def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.values:
+            return None
+        self.values[key] = value
+        return True
+
+    async def eval(self, script, numkeys, key, token, *args):
+        # Both lock scripts act only while the caller still holds the lock
+        if self.values.get(key) != token:
+            return 0
+        if "'del'" in script:
+            del self.values[key]
+        return 1
+
+
+@pytest_asyncio.fixture
+async def schedulers():
+    started = []
+
+    def start():
+        scheduler = AsyncIOScheduler()
+        scheduler.start(paused=True)
+        started.append(scheduler)
+        return scheduler
+
+    yield start
+    for scheduler in started:
+        scheduler.shutdown(wait=False)
+
+
+@pytest.mark.asyncio
+async def test_only_one_worker_runs_scheduled_sends(schedulers):
+    redis = FakeRedis()
+    first = DMSchedulerLeader(schedulers(), redis)
+    second = DMSchedulerLeader(schedulers(), redis)
+
+    await first.poll()
+    await second.poll()
+    await first.poll()
+
+    assert first.is_leader
+    assert not second.is_leader
+    assert redis.values[DM_SCHEDULER_LOCK_KEY] == first.token
+
+
+@pytest.mark.asyncio
+async def test_next_worker_takes_over_released_lock(schedulers):
+    redis = FakeRedis()
+    first = DMSchedulerLeader(schedulers(), redis)
+    second = DMSchedulerLeader(schedulers(), redis)
+    await first.poll()
+
+    await first.stop()
+    await second.poll()
+
+    assert second.is_leader
+    assert redis.values[DM_SCHEDULER_LOCK_KEY] == second.token
+
+
+@pytest.mark.asyncio
+async def test_leader_pauses_when_lock_expired_and_taken(schedulers):
+    redis = FakeRedis()
+    leader = DMSchedulerLeader(schedulers(), redis)
+    await leader.poll()
+
+    redis.values[DM_SCHEDULER_LOCK_KEY] = "another-worker"
+    await leader.poll()
+
+    assert not leader.is_leader
+
+
+@pytest_asyncio.fixture
+async def session_factory(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'dm.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await engine.dispose()
+
+
+@pytest_asyncio.fixture
+async def db(session_factory):
+    async with session_factory() as session:
+        yield session
+
+
+def local_limiter():
+    limiter = DMSendRateLimiter()
+    limiter.redis_available = False
+    return limiter
+
+
+def local_stats_cache():
+    stats_cache = DMStatsCache()
+    stats_cache.redis_available = False
+    return stats_cache
+
+
+def make_service(db):
+    return DirectMessageService(db, rate_limiter=local_limiter(), stats_cache=local_stats_cache())
+
+
+async def add_campaigns(db, user_id, count, **values):
+    """Insert campaigns on one social account, returning their ids in insertion order"""
+    account_id = (await db.execute(
+        insert(SocialAccount).values(
+            user_id=user_id, platform=SocialPlatform.INSTAGRAM,
+            platform_user_id=f"ig-{user_id}", username=f"user{user_id}"
+        ).returning(SocialAccount.id)
+    )).scalar_one()
+    rows = [
+        {
+            "user_id": user_id,
+            "social_account_id": account_id,
+            "message_type": values.get("message_type", DirectMessageType.WELCOME),
+            "message_content": "Welcome!",
+            "is_active": values.get("is_active", True),
+            "max_sends_per_day": values.get("max_sends_per_day", 48),
+            "send_delay_minutes": values.get("send_delay_minutes", 0),
+        }
+        for _ in range(count)
+    ]
+    ids = list((await db.scalars(insert(DirectMessage).returning(DirectMessage.id), rows)).all())
+    await db.commit()
+    return ids
+
+
+async def read_all_pages(fetch, size):
+    ids, cursor, pages = [], None, 0
+    while True:
+        items, cursor = await fetch(cursor, size)
+        ids.extend(item.id for item in items)
+        pages += 1
+        if cursor is None:
+            return ids, pages
+
+
+def test_cursor_round_trip_and_rejects_garbage():
+    assert _decode_cursor(_encode_cursor(42)) == 42
+    for cursor in ("not-base64!", _encode_cursor(1)[:-4], "e30="):
+        with pytest.raises(ValueError):
+            _decode_cursor(cursor)
+
+
+@pytest.mark.asyncio
+async def test_campaign_pages_cover_every_row_once_newest_first(db):
+    # Rows inserted together share created_at, so the id tie-breaker decides the order
+    ids = await add_campaigns(db, 1, 5)
+    await add_campaigns(db, 2, 3)
+    service = make_service(db)
+
+    listed, pages = await read_all_pages(
+        lambda cursor, size: service.list_dm_campaigns(1, cursor=cursor, size=size), 2
+    )
+
+    assert listed == sorted(ids, reverse=True)
+    assert pages == 3
+
+
+@pytest.mark.asyncio
+async def test_campaign_filters_apply_on_every_page(db):
+    welcome = await add_campaigns(db, 1, 3)
+    await add_campaigns(db, 1, 2, message_type=DirectMessageType.FOLLOW_UP)
+    await add_campaigns(db, 1, 2, is_active=False)
+    service = make_service(db)
+
+    listed, _ = await read_all_pages(
+        lambda cursor, size: service.list_dm_campaigns(
+            1, message_type=DirectMessageType.WELCOME, is_active=True, cursor=cursor, size=size
+        ),
+        1,
+    )
+
+    assert listed == sorted(welcome, reverse=True)
+
+
+@pytest.mark.asyncio
+async def test_last_page_has_no_cursor(db):
+    await add_campaigns(db, 1, 2)
+    campaigns, cursor = await make_service(db).list_dm_campaigns(1, size=2)
+
+    assert len(campaigns) == 2
+    assert cursor is None
+
+
+@pytest.mark.asyncio
+async def test_cursor_to_a_deleted_campaign_is_rejected(db):
+    await add_campaigns(db, 1, 3)
+    service = make_service(db)
+    campaigns, cursor = await service.list_dm_campaigns(1, size=1)
+
+    assert await service.delete_dm_campaign(campaigns[0].id, 1)
+    with pytest.raises(ValueError):
+        await service.list_dm_campaigns(1, cursor=cursor, size=1)
+
+
+@pytest.mark.asyncio
+async def test_cursor_from_another_user_is_rejected(db):
+    await add_campaigns(db, 1, 2)
+    await add_campaigns(db, 2, 2)
+    service = make_service(db)
+    _, cursor = await service.list_dm_campaigns(1, size=1)
+
+    with pytest.raises(ValueError):
+        await service.list_dm_campaigns(2, cursor=cursor, size=1)
+
+
+@pytest.mark.asyncio
+async def test_log_pages_follow_sent_at_then_id_within_filters(db):
+    first, second = await add_campaigns(db, 1, 2)
+    other_user = (await add_campaigns(db, 2, 1))[0]
+    now = datetime.now(timezone.utc)
+
+    def log(campaign_id, minutes_ago, status=DirectMessageStatus.SENT):
+        return {
+            "direct_message_id": campaign_id, "recipient_id": "r", "sent_content": "hi",
+            "status": status, "sent_at": now - timedelta(minutes=minutes_ago),
+        }
+
+    rows = [log(first, 5), log(first, 5), log(first, 1), log(first, 3, DirectMessageStatus.FAILED),
+            log(second, 2), log(other_user, 0)]
+    log_ids = list((await db.scalars(insert(DirectMessageLog).returning(DirectMessageLog.id), rows)).all())
+    await db.commit()
+    service = make_service(db)
+
+    everything, _ = await read_all_pages(
+        lambda cursor, size: service.get_dm_logs(1, cursor=cursor, size=size), 2
+    )
+    sent_for_first, _ = await read_all_pages(
+        lambda cursor, size: service.get_dm_logs(
+            1, campaign_id=first, status=DirectMessageStatus.SENT, cursor=cursor, size=size
+        ),
+        1,
+    )
+
+    assert everything == [log_ids[2], log_ids[4], log_ids[3], log_ids[1], log_ids[0]]
+    assert sent_for_first == [log_ids[2], log_ids[1], log_ids[0]]
+
+    # Deleting the campaign removes the log the cursor points at
+    _, cursor = await service.get_dm_logs(1, campaign_id=first, size=1)
+    assert await service.delete_dm_campaign(first, 1)
+    with pytest.raises(ValueError):
+        await service.get_dm_logs(1, campaign_id=first, cursor=cursor, size=1)
+
+
+class FailingRedis:
+    """Redis client whose connection is down, counting the attempts made"""
+
+    def __init__(self):
+        self.attempts = 0
+
+    def pipeline(self, transaction=True):
+        self.attempts += 1
+        raise redis_exceptions.ConnectionError("connection refused")
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_counts_last_hours_logs_without_redis(db):
+    campaign_id, other_id = await add_campaigns(db, 1, 2)
+    now = datetime.utcnow()
+    await db.execute(insert(DirectMessageLog), [
+        {"direct_message_id": campaign_id, "recipient_id": "r", "sent_content": "hi",
+         "status": DirectMessageStatus.SENT, "sent_at": now - timedelta(minutes=minutes_ago)}
+        for minutes_ago in (5, 30, 90)
+    ])
+    await db.commit()
+    limiter = local_limiter()
+
+    assert await limiter.try_acquire_many(db, campaign_id, 3, 5) == 1
+    assert not await limiter.try_acquire(db, campaign_id, 2)
+    assert await limiter.try_acquire_many(db, other_id, 3, 5) == 3
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_retries_redis_after_cooldown(db, monkeypatch):
+    campaign_id = (await add_campaigns(db, 1, 1))[0]
+    clock = [1_000.0]
+    monkeypatch.setattr(direct_message_service.time, "monotonic", lambda: clock[0])
+    limiter = DMSendRateLimiter()
+    limiter.redis_client = FailingRedis()
+    limiter.redis_available = True
+
+    assert await limiter.try_acquire(db, campaign_id, 1)
+    assert await limiter.try_acquire(db, campaign_id, 1)
+    assert limiter.redis_client.attempts == 1
+
+    clock[0] += direct_message_service.DM_REDIS_RETRY_SECONDS
+    assert await limiter.try_acquire(db, campaign_id, 1)
+    assert limiter.redis_client.attempts == 2
+
+
+@pytest.mark.asyncio
+async def test_bulk_send_stops_at_the_hourly_limit(db):
+    # 48 sends per day allows 2 per hour
+    campaign_id = (await add_campaigns(db, 1, 1, max_sends_per_day=48))[0]
+    service = make_service(db)
+
+    logs = await service.send_direct_messages_bulk(
+        campaign_id, [{"id": "a"}, {"id": "b"}, {"id": "c"}]
+    )
+
+    assert sorted(log.recipient_id for log in logs) == ["a", "b"]
+    campaign = (await db.execute(select(DirectMessage).where(DirectMessage.id == campaign_id))).scalar_one()
+    await db.refresh(campaign)
+    assert (campaign.sent_count, campaign.success_count) == (2, 2)
+    with pytest.raises(ValueError):
+        await service.send_direct_message(campaign_id, "d")
+
+
+@pytest.mark.asyncio
+async def test_triggered_campaign_schedules_spaced_sends_that_record_logs(
+    session_factory, db, schedulers, monkeypatch
+):
+    campaign_id = (await add_campaigns(db, 1, 1, send_delay_minutes=10))[0]
+    scheduler = schedulers()
+
+    async def get_scheduler():
+        return scheduler
+
+    async def triggered(campaign):
+        return True
+
+    async def recipients(campaign):
+        return [{"id": "a", "username": "amy"}, {"id": "b"}]
+
+    monkeypatch.setattr(direct_message_service, "get_dm_send_scheduler", get_scheduler)
+    monkeypatch.setattr(direct_message_service, "AsyncSessionLocal", session_factory)
+    monkeypatch.setattr(direct_message_service, "get_dm_rate_limiter", local_limiter)
+    monkeypatch.setattr(direct_message_service, "get_dm_stats_cache", local_stats_cache)
+    service = make_service(db)
+    monkeypatch.setattr(service, "_check_dm_triggers", triggered)
+    monkeypatch.setattr(service, "_get_target_recipients", recipients)
+
+    await service.process_dm_triggers(1)
+
+    jobs = sorted(scheduler.get_jobs(), key=lambda job: job.trigger.run_date)
+    assert [job.args for job in jobs] == [(campaign_id, "a", "amy"), (campaign_id, "b", None)]
+    assert jobs[1].trigger.run_date - jobs[0].trigger.run_date == timedelta(minutes=10)
+
+    # Run the stored jobs as the scheduler would once they fall due
+    for job in jobs:
+        await job.func(*job.args)
+    logs, _ = await service.get_dm_logs(1)
+    assert sorted((log.recipient_id, log.status) for log in logs) == [
+        ("a", DirectMessageStatus.SENT), ("b", DirectMessageStatus.SENT)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_first_calls_start_one_scheduler(monkeypatch):
+    opened = []
+
+    def job_store():
+        opened.append(object())
+        return None
+
+    monkeypatch.setattr(direct_message_service, "_dm_job_store", job_store)
+    monkeypatch.setattr(direct_message_service, "_dm_send_scheduler", None)
+    try:
+        first, second = await asyncio.gather(
+            direct_message_service.get_dm_send_scheduler(),
+            direct_message_service.get_dm_send_scheduler(),
+        )
+        assert first is second
+        assert len(opened) == 1
+    finally:
+        await direct_message_service.shutdown_dm_send_scheduler()
@@ -0,0 +1,143 @@
+"""
+Tests for the two-tier LLM response cache
+"""
+
+import types
+
+import pytest
+
+from app.core import llm_cache
+from app.core.llm_cache import LLMCache
+
+
+class FakeOpenAI:
+    """Minimal AsyncOpenAI stand-in that counts completion calls"""
+
+    def __init__(self, embedding):
+        self.completion_calls = 0
+        self._embedding = embedding
+        self.chat = types.SimpleNamespace(completions=types.SimpleNamespace(create=self._create))
+        self.embeddings = types.SimpleNamespace(create=self._embed)
+
+    async def _create(self, **request):
+        self.completion_calls += 1
+        message = types.SimpleNamespace(content=f"response {self.completion_calls}")
+        return types.SimpleNamespace(choices=[types.SimpleNamespace(message=message)])
+
+    async def _embed(self, model, input):
+        return types.SimpleNamespace(data=[types.SimpleNamespace(embedding=self._embedding(input))])
+
+
+@pytest.fixture
+def cache():
+    cache = LLMCache()
+    cache.redis_available = False
+    return cache
+
+
+@pytest.mark.asyncio
+async def test_exact_match_skips_api_call(cache):
+    client = FakeOpenAI(lambda text: [1.0, 0.0])
+    request = dict(model="gpt-3.5-turbo", messages=[{"role": "user", "content": "hi"}], temperature=0.7)
+
+    first = await cache.complete(client, ttl=60, semantic=False, **request)
+    second = await cache.complete(client, ttl=60, semantic=False, **request)
+
+    assert first == second == "response 1"
+    assert client.completion_calls == 1
+
+
+@pytest.mark.asyncio
+async def test_semantic_match_reuses_similar_prompt(cache):
+    # Prompts mentioning "gym" embed to the same direction
+    client = FakeOpenAI(lambda text: [1.0, 0.0] if "gym" in text else [0.0, 1.0])
+
+    def request(content):
+        return dict(model="gpt-3.5-turbo", messages=[{"role": "user", "content": content}], temperature=0.7)
+
+    assert await cache.complete(client, ttl=60, semantic=True, **request("gym deals")) == "response 1"
+    assert await cache.complete(client, ttl=60, semantic=True, **request("gym  deals!")) == "response 1"
+    assert await cache.complete(client, ttl=60, semantic=True, **request("pizza")) == "response 2"
+    assert client.completion_calls == 2
+
+
+@pytest.mark.asyncio
+async def test_semantic_match_is_opt_in(cache):
+    embedded = []
+    client = FakeOpenAI(lambda text: embedded.append(text) or [1.0, 0.0])
+
+    def request(content):
+        return dict(model="gpt-4o-mini", messages=[{"role": "user", "content": content}], temperature=0)
+
+    assert await cache.complete(client, ttl=60, **request("topic A")) == "response 1"
+    assert await cache.complete(client, ttl=60, **request("topic B")) == "response 2"
+    assert embedded == []
+
+
+@pytest.mark.asyncio
+async def test_semantic_match_ignores_shared_system_prompt(cache):
+    embedded = []
+    client = FakeOpenAI(lambda text: embedded.append(text) or ([1.0, 0.0] if "gym" in text else [0.0, 1.0]))
+
+    def request(system, content):
+        return dict(
+            model="gpt-4o-mini",
+            messages=[{"role": "system", "content": system}, {"role": "user", "content": content}],
+            temperature=0,
+        )
+
+    assert await cache.complete(client, ttl=60, semantic=True, **request("Rate it.", "gym")) == "response 1"
+    # Same user content under a different system prompt is a different question
+    assert await cache.complete(client, ttl=60, semantic=True, **request("Tag it.", "gym")) == "response 2"
+    assert embedded == ["gym", "gym"]
+
+
+@pytest.mark.asyncio
+async def test_output_parameters_are_part_of_the_key(cache):
+    client = FakeOpenAI(lambda text: [1.0, 0.0])
+    request = dict(model="gpt-4o-mini", messages=[{"role": "user", "content": "hi"}], temperature=0)
+
+    assert await cache.complete(client, ttl=60, **request) == "response 1"
+    assert await cache.complete(client, ttl=60, max_tokens=1, **request) == "response 2"
+    assert await cache.complete(client, ttl=60, response_format={"type": "json_object"}, **request) == "response 3"
+    assert await cache.complete(client, ttl=60, max_tokens=1, **request) == "response 2"
+
+
+class FlakyRedis:
+    """Redis stand-in that refuses connections until brought back up"""
+
+    def __init__(self):
+        self.up = False
+        self.values = {}
+
+    async def get(self, key):
+        if not self.up:
+            raise ConnectionError("connection refused")
+        return self.values.get(key)
+
+    async def set(self, key, value, ex=None):
+        if not self.up:
+            raise ConnectionError("connection refused")
+        self.values[key] = value
+
+
+@pytest.mark.asyncio
+async def test_redis_is_retried_after_an_outage(monkeypatch):
+    clock = [1_000.0]
+    monkeypatch.setattr(llm_cache.time, "monotonic", lambda: clock[0])
+    cache = LLMCache()
+    cache.redis_client = FlakyRedis()
+    cache.redis_available = True
+    client = FakeOpenAI(lambda text: [1.0, 0.0])
+    request = dict(model="gpt-3.5-turbo", messages=[{"role": "user", "content": "hi"}])
+
+    # During the outage responses are cached in-process
+    assert await cache.complete(client, ttl=60, **request) == "response 1"
+    assert await cache.complete(client, ttl=60, **request) == "response 1"
+    assert client.completion_calls == 1
+
+    cache.redis_client.up = True
+    clock[0] += llm_cache.REDIS_RETRY_SECONDS
+    assert await cache.complete(client, ttl=60, **request) == "response 2"
+    assert list(cache.redis_client.values.values()) == ["response 2"]
+    assert cache._local == {}
@@ -0,0 +1,181 @@
+"""
+Tests for brand meme generation through the OpenAI Batch API
+"""
+
+import asyncio
+import json
+import types
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+import app.models  # noqa: F401  (registers every table on Base.metadata)
+from app.core.database import Base
+from app.models.content import Content, ContentStatus
+from app.models.social_account import SocialPlatform
+from app.services.enhanced_meme_generator_service import EnhancedMemeGeneratorService
+
+
+class FakeOpenAI:
+    """Minimal AsyncOpenAI stand-in for the files and batches endpoints"""
+
+    def __init__(self):
+        self.uploaded = None
+        self.batch_status = "in_progress"
+        self.output = None
+        self.files = types.SimpleNamespace(create=self._upload, content=self._download)
+        self.batches = types.SimpleNamespace(create=self._create_batch, retrieve=self._retrieve_batch)
+
+    async def _upload(self, file, purpose):
+        self.uploaded = file[1].decode()
+        return types.SimpleNamespace(id="file-in")
+
+    async def _download(self, file_id):
+        return types.SimpleNamespace(text=self.output)
+
+    async def _create_batch(self, input_file_id, endpoint, completion_window):
+        return types.SimpleNamespace(id="batch_1", status="validating")
+
+    async def _retrieve_batch(self, batch_id):
+        return types.SimpleNamespace(id=batch_id, status=self.batch_status, output_file_id="file-out")
+
+    def finish(self, custom_ids):
+        """Complete the batch with a successful reply for each custom_id"""
+        self.batch_status = "completed"
+        self.output = "\n".join(output_line(custom_id) for custom_id in custom_ids)
+
+
+def output_line(custom_id):
+    reply = {
+        "trending_score": 0.9,
+        "humor_potential": 0.8,
+        "relatability": 0.7,
+        "brand_alignment": 5,
+        "text": {"top_text": f"top {custom_id}", "bottom_text": "bottom"},
+    }
+    body = {"choices": [{"message": {"content": json.dumps(reply)}}]}
+    return json.dumps({"custom_id": custom_id, "response": {"status_code": 200, "body": body}})
+
+
+@pytest_asyncio.fixture
+async def sessions(tmp_path):
+    # A file database, so separate sessions see each other's commits
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'memes.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    opened = []
+
+    def open_session():
+        opened.append(AsyncSession(engine, expire_on_commit=False))
+        return opened[-1]
+
+    yield open_session
+    for session in opened:
+        await session.close()
+    await engine.dispose()
+
+
+def make_service(sessions, client, renders):
+    service = EnhancedMemeGeneratorService(sessions())
+    service.openai_client = client
+
+    async def render_meme(format_info, meme_text, platform, include_brand, topic_analysis):
+        renders.append(meme_text["top_text"])
+        await asyncio.sleep(0)
+        return {"path": f"uploads/memes/{len(renders)}.jpg", "viral_score": 0.8, "optimizations": []}
+
+    service._render_meme = render_meme
+    return service
+
+
+async def submit(service, trends=("coffee", "tea", "cocoa")):
+    return await service.generate_brand_relevant_memes_batch(
+        1, {"voice": "humorous"}, list(trends), SocialPlatform.TWITTER, 5
+    )
+
+
+@pytest.mark.asyncio
+async def test_submit_uploads_one_request_per_meme_and_saves_drafts(sessions):
+    client = FakeOpenAI()
+    service = make_service(sessions, client, [])
+
+    result = await submit(service)
+
+    requests = [json.loads(line) for line in client.uploaded.splitlines()]
+    assert [r["custom_id"] for r in requests] == ["meme-0", "meme-1", "meme-2"]
+    assert all(r["url"] == "/v1/chat/completions" for r in requests)
+    assert "coffee" in requests[0]["body"]["messages"][1]["content"]
+
+    drafts = (await service.db.execute(select(Content).order_by(Content.id))).scalars().all()
+    assert result["batch_id"] == "batch_1"
+    assert [m["content_id"] for m in result["pending_memes"]] == [d.id for d in drafts]
+    assert all(d.status == ContentStatus.DRAFT for d in drafts)
+    assert {d.ai_metadata["meme_batch_id"] for d in drafts} == {"batch_1"}
+    assert {d.ai_metadata["status"] for d in drafts} == {"pending"}
+
+
+@pytest.mark.asyncio
+async def test_poll_waits_until_batch_completes(sessions):
+    client = FakeOpenAI()
+    renders = []
+    service = make_service(sessions, client, renders)
+    await submit(service)
+
+    result = await service.complete_brand_meme_batch(1, "batch_1")
+
+    assert result == {"batch_id": "batch_1", "status": "in_progress", "pending_memes": 3}
+    assert renders == []
+    assert "error" in await service.complete_brand_meme_batch(2, "batch_1")
+
+
+@pytest.mark.asyncio
+async def test_completed_batch_renders_replies_and_fails_bad_lines(sessions):
+    client = FakeOpenAI()
+    service = make_service(sessions, client, [])
+    await submit(service)
+    client.finish(["meme-0", "meme-2"])
+    client.output += "\n{not json\n" + json.dumps({"custom_id": "meme-1", "response": None})
+
+    result = await service.complete_brand_meme_batch(1, "batch_1")
+
+    assert result["status"] == "completed"
+    assert sorted(m["text_content"]["top_text"] for m in result["brand_memes"]) == ["TOP MEME-0", "TOP MEME-2"]
+    assert result["top_recommendation"]["brand_alignment"] == 1.0
+    drafts = (await service.db.execute(select(Content).order_by(Content.id))).scalars().all()
+    assert [d.ai_metadata["status"] for d in drafts] == ["completed", "failed", "completed"]
+    assert drafts[1].status == ContentStatus.FAILED
+
+
+@pytest.mark.asyncio
+async def test_concurrent_polls_render_each_meme_once(sessions):
+    client = FakeOpenAI()
+    renders = []
+    await submit(make_service(sessions, client, renders))
+    client.finish(["meme-0", "meme-1", "meme-2"])
+
+    first, second = await asyncio.gather(
+        make_service(sessions, client, renders).complete_brand_meme_batch(1, "batch_1"),
+        make_service(sessions, client, renders).complete_brand_meme_batch(1, "batch_1"),
+    )
+
+    assert sorted(renders) == ["TOP MEME-0", "TOP MEME-1", "TOP MEME-2"]
+    final = await make_service(sessions, client, renders).complete_brand_meme_batch(1, "batch_1")
+    assert final["memes_created"] == 3
+    assert len(renders) == 3
+
+
+def test_parse_batch_output_skips_malformed_lines():
+    output = "\n".join([
+        output_line("meme-0"),
+        "{truncated",
+        json.dumps({"custom_id": "meme-1", "response": {"status_code": 200, "body": {"choices": []}}}),
+        json.dumps({"custom_id": "meme-2", "response": {"status_code": 500, "body": {}}}),
+        "",
+    ])
+
+    replies = EnhancedMemeGeneratorService._parse_batch_output(output)
+
+    assert list(replies) == ["meme-0"]
+    assert json.loads(replies["meme-0"])["brand_alignment"] == 5